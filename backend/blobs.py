@@ -0,0 +1,214 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Content-addressed blob storage for the Universal Deep Research Backend (UDR-B).
+
+The raw page contents of search results make up most of the research artifacts,
+and the same page is recorded several times per session (in the raw and the
+filtered search responses, the topic search results, the relevant segments and
+all_results). This module stores every page content once, compressed, in a file
+named after its SHA-256 digest, and replaces the raw_content of the artifact
+records with a reference to that file (dehydrate_item), which is resolved again
+when the records are loaded (rehydrate_item).
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from typing import Any, Dict, List, Tuple
+
+RAW_CONTENT_KEY = "raw_content"
+BLOB_REFERENCE_KEY = "raw_content_blob"
+
+_EXTENSIONS = {"zstd": ".zst", "gzip": ".gz"}
+
+
+def _zstandard_available() -> bool:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def build_blobs_directory(filepath: str) -> str:
+    """
+    Returns the blob directory of an artifact file; all artifact files of a
+    directory share it, so pages found in several sessions are stored once.
+    """
+    return os.path.join(os.path.dirname(filepath), "blobs")
+
+
+class BlobStore:
+    """
+    Stores texts in compressed files named after the SHA-256 digest of the text.
+
+    Blobs are compressed with zstd if requested and the zstandard package is
+    installed, and with gzip otherwise. Blobs are read by their file extension,
+    so a directory may contain blobs of both kinds. Storing a text that is
+    already stored is skipped.
+    """
+
+    def __init__(self, directory: str, compression: str = "gzip") -> None:
+        self.directory = directory
+        if compression == "zstd" and not _zstandard_available():
+            compression = "gzip"
+        self.compression = compression
+
+    @staticmethod
+    def digest(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _path(self, digest: str, compression: str) -> str:
+        return os.path.join(
+            self.directory, digest[:2], digest + _EXTENSIONS[compression]
+        )
+
+    def _find(self, digest: str) -> Tuple[str, str] | None:
+        for compression in _EXTENSIONS:
+            path = self._path(digest, compression)
+            if os.path.exists(path):
+                return path, compression
+        return None
+
+    def contains(self, digest: str) -> bool:
+        return self._find(digest) is not None
+
+    def put(self, text: str, digest: str | None = None) -> str:
+        """
+        Stores the text unless it is already stored.
+
+        Args:
+            text: The text to store
+            digest: The digest of the text, if already computed
+
+        Returns:
+            str: The digest under which the text is stored
+        """
+        digest = digest or self.digest(text)
+        if self.contains(digest):
+            return digest
+
+        data = text.encode("utf-8")
+        if self.compression == "zstd":
+            import zstandard
+
+            data = zstandard.ZstdCompressor(level=3).compress(data)
+        else:
+            data = gzip.compress(data, compresslevel=6)
+
+        path = self._path(digest, self.compression)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first, so that readers never see partial blobs
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "wb") as f:
+            f.write(data)
+        os.replace(temporary_path, path)
+        return digest
+
+    def get(self, digest: str) -> str:
+        """
+        Returns the text stored under the digest.
+
+        Raises:
+            FileNotFoundError: If no text is stored under the digest
+        """
+        found = self._find(digest)
+        if found is None:
+            raise FileNotFoundError(f"Blob {digest} not found in {self.directory}")
+        path, compression = found
+        with open(path, "rb") as f:
+            data = f.read()
+        if compression == "zstd":
+            import zstandard
+
+            data = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            data = gzip.decompress(data)
+        return data.decode("utf-8")
+
+
+def dehydrate_item(item: Any) -> Tuple[Any, List[Tuple[str, str]]]:
+    """
+    Replaces every non-empty raw_content string in the item (at any depth) with
+    a raw_content_blob reference to its digest. The item itself is not modified;
+    only the dictionaries and lists containing a raw_content are copied.
+
+    Args:
+        item: The JSON-serializable item
+
+    Returns:
+        Tuple[Any, List[Tuple[str, str]]]: The dehydrated item, and the (digest,
+        text) pairs that have to be stored in the blob store
+
+    Example:
+        item, blobs = dehydrate_item({"type": "all_results", "all_results": results})
+        for digest, text in blobs:
+            blob_store.put(text, digest)
+    """
+    blobs: List[Tuple[str, str]] = []
+    digests: Dict[str, str] = {}
+
+    def dehydrate(value: Any) -> Any:
+        if isinstance(value, dict):
+            dehydrated: Dict[str, Any] = {}
+            changed = False
+            for key, child in value.items():
+                if key == RAW_CONTENT_KEY and isinstance(child, str) and child:
+                    if child not in digests:
+                        digests[child] = BlobStore.digest(child)
+                        blobs.append((digests[child], child))
+                    dehydrated[BLOB_REFERENCE_KEY] = digests[child]
+                    changed = True
+                    continue
+                dehydrated[key] = dehydrate(child)
+                changed = changed or dehydrated[key] is not child
+            return dehydrated if changed else value
+        if isinstance(value, list):
+            dehydrated_list = [dehydrate(child) for child in value]
+            changed = any(new is not old for new, old in zip(dehydrated_list, value))
+            return dehydrated_list if changed else value
+        return value
+
+    return dehydrate(item), blobs
+
+
+def rehydrate_item(item: Any, blob_store: BlobStore) -> Any:
+    """
+    Resolves the raw_content_blob references of an item created by
+    dehydrate_item, in place (keeping the key order), and returns the item.
+    """
+    texts: Dict[str, str] = {}
+
+    def rehydrate(value: Any) -> None:
+        if isinstance(value, dict):
+            if BLOB_REFERENCE_KEY in value:
+                entries = list(value.items())
+                value.clear()
+                for key, child in entries:
+                    if key == BLOB_REFERENCE_KEY:
+                        if child not in texts:
+                            texts[child] = blob_store.get(child)
+                        key, child = RAW_CONTENT_KEY, texts[child]
+                    value[key] = child
+            for child in value.values():
+                rehydrate(child)
+        elif isinstance(value, list):
+            for child in value:
+                rehydrate(child)
+
+    rehydrate(item)
+    return item
@@ -0,0 +1,403 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Persistent caching utilities for the Universal Deep Research Backend (UDR-B).
+
+This module provides a small SQLite-backed key-value store with TTL expiry,
+size-based LRU eviction and hit/miss counters, shared by all sessions (and
+all workers) that use the same cache directory.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List
+
+from config import get_config
+
+# Get configuration
+config = get_config()
+
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Builds a stable, content-addressed cache key from the given parts.
+
+    The parts are serialized as JSON with sorted keys, so that dictionaries that
+    only differ in key order map to the same key.
+
+    Args:
+        *parts: JSON-serializable values identifying the cached computation
+
+    Returns:
+        str: Hex-encoded SHA-256 digest of the serialized parts
+
+    Example:
+        make_cache_key("model", {"temperature": 0.0}, [{"role": "user", "content": "Hi"}])
+    """
+    serialized = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class SqliteCache:
+    """
+    A persistent key-value store for JSON-serializable values.
+
+    Entries live in a namespace of a SQLite database file. Entries older than
+    ttl_seconds are treated as missing (0 disables expiry), and once the values
+    of a namespace exceed max_bytes, the least recently used entries are evicted.
+    The total size of the values of each namespace is maintained by triggers in
+    the database, so that writes do not have to sum up the sizes of all entries.
+
+    The methods block on SQLite (up to its 30 s busy timeout if another worker
+    holds the database); call them through asyncio.to_thread from coroutines.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        namespace: str,
+        max_bytes: int,
+        ttl_seconds: float = 0,
+    ) -> None:
+        self.path = path
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, created_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS entries_lru "
+                "ON entries (namespace, accessed_at)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS namespace_sizes ("
+                "namespace TEXT PRIMARY KEY, size INTEGER NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_size_insert "
+                "AFTER INSERT ON entries BEGIN "
+                "UPDATE namespace_sizes SET size = size + NEW.size "
+                "WHERE namespace = NEW.namespace; END"
+            )
+            self._connection.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_size_delete "
+                "AFTER DELETE ON entries BEGIN "
+                "UPDATE namespace_sizes SET size = size - OLD.size "
+                "WHERE namespace = OLD.namespace; END"
+            )
+            # entries written before the size of the namespace was tracked
+            self._connection.execute(
+                "INSERT OR IGNORE INTO namespace_sizes (namespace, size) "
+                "SELECT ?, COALESCE(SUM(size), 0) FROM entries WHERE namespace = ?",
+                (self.namespace, self.namespace),
+            )
+
+    def get(self, key: str) -> Any | None:
+        """
+        Returns the value stored under the key, or None if it is missing or expired.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT value, created_at FROM entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            expired = (
+                row is not None
+                and self.ttl_seconds
+                and row[1] + self.ttl_seconds < now
+            )
+            if expired:
+                self._connection.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                )
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._connection.execute(
+                "UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+            self.hits += 1
+        return json.loads(row[0])
+
+    def contains(self, key: str) -> bool:
+        """
+        Returns whether a non-expired value is stored under the key, without
+        loading it or counting a hit/miss.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT created_at FROM entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        if row is None:
+            return False
+        return not self.ttl_seconds or row[0] + self.ttl_seconds >= time.time()
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Stores the value under the key and evicts least recently used entries if
+        the namespace grew beyond its size limit.
+        """
+        serialized = json.dumps(value, ensure_ascii=False)
+        size = len(serialized.encode("utf-8"))
+        now = time.time()
+        with self._lock, self._connection:
+            # delete and insert (rather than replace), so that the size triggers fire
+            self._connection.execute(
+                "DELETE FROM entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            )
+            self._connection.execute(
+                "INSERT INTO entries "
+                "(namespace, key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, serialized, size, now, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        total_size = self._connection.execute(
+            "SELECT size FROM namespace_sizes WHERE namespace = ?",
+            (self.namespace,),
+        ).fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+
+        evicted_keys = []
+        for key, size in self._connection.execute(
+            "SELECT key, size FROM entries WHERE namespace = ? ORDER BY accessed_at",
+            (self.namespace,),
+        ):
+            if total_size <= self.max_bytes:
+                break
+            evicted_keys.append((self.namespace, key))
+            total_size -= size
+        self._connection.executemany(
+            "DELETE FROM entries WHERE namespace = ? AND key = ?", evicted_keys
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the hit/miss counters of this cache instance along with the
+        number and total size of the entries stored in its namespace.
+        """
+        with self._lock:
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries "
+                "WHERE namespace = ?",
+                (self.namespace,),
+            ).fetchone()
+        return {
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+
+class SearchCache:
+    """
+    Caches search responses by normalized search phrase.
+
+    The raw page contents of the results are stored separately, once per
+    (URL, content) pair, so that pages returned for several search phrases or
+    sessions are kept only once, and re-storing an already known page is skipped.
+    """
+
+    def __init__(self, responses: SqliteCache, pages: SqliteCache) -> None:
+        self.responses = responses
+        self.pages = pages
+
+    @staticmethod
+    def normalize_search_phrase(search_phrase: str) -> str:
+        return " ".join(search_phrase.lower().split())
+
+    def get(self, search_phrase: str) -> Dict[str, Any] | None:
+        """
+        Returns the cached search response for the search phrase, or None if the
+        phrase (or one of the pages of its results) is not cached.
+        """
+        response = self.responses.get(self.normalize_search_phrase(search_phrase))
+        if response is None:
+            return None
+
+        results = []
+        for result in response["results"]:
+            page_key = result.pop("page_key", None)
+            if page_key is not None:
+                raw_content = self.pages.get(page_key)
+                if raw_content is None:
+                    return None
+                result["raw_content"] = raw_content
+            results.append(result)
+        return {**response, "results": results}
+
+    def put(self, search_phrase: str, response: Dict[str, Any]) -> None:
+        """
+        Stores the search response for the search phrase.
+        """
+        results = []
+        for result in response["results"]:
+            raw_content = result.get("raw_content")
+            if not raw_content:
+                results.append(result)
+                continue
+            page_key = make_cache_key(result["url"], raw_content)
+            if not self.pages.contains(page_key):
+                self.pages.put(page_key, raw_content)
+            results.append(
+                {k: v for k, v in result.items() if k != "raw_content"}
+                | {"page_key": page_key}
+            )
+        self.responses.put(
+            self.normalize_search_phrase(search_phrase),
+            {**response, "results": results},
+        )
+
+
+_caches: Dict[str, SqliteCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str, max_mb: int, ttl_seconds: float = 0) -> SqliteCache:
+    """
+    Returns the process-wide cache of the given namespace, creating it if needed.
+
+    All namespaces share one database file in the configured cache directory.
+
+    Args:
+        namespace: Name of the cache (e.g. "completions")
+        max_mb: Size limit of the namespace in megabytes
+        ttl_seconds: Time to live of the entries in seconds (0 disables expiry)
+
+    Returns:
+        SqliteCache: The cache of the namespace
+    """
+    with _caches_lock:
+        if namespace not in _caches:
+            _caches[namespace] = SqliteCache(
+                os.path.join(config.cache.directory, "cache.sqlite3"),
+                namespace,
+                max_bytes=max_mb * 1024 * 1024,
+                ttl_seconds=ttl_seconds,
+            )
+        return _caches[namespace]
+
+
+def get_completion_cache() -> SqliteCache | None:
+    """
+    Returns the process-wide LLM completion cache, or None if it is disabled.
+
+    The completion cache is opt-in (COMPLETION_CACHE_ENABLED) because it returns
+    the stored completion for a repeated request instead of sampling a new one.
+    """
+    if not config.cache.completion_cache_enabled:
+        return None
+    return get_cache(
+        "completions",
+        config.cache.completion_cache_max_mb,
+        config.cache.completion_cache_ttl,
+    )
+
+
+def get_search_cache() -> SearchCache | None:
+    """
+    Returns the process-wide search cache, or None if it is disabled.
+
+    The search cache is opt-in (SEARCH_CACHE_ENABLED) because it returns the
+    stored results for a repeated search phrase instead of searching again.
+    """
+    if not config.cache.search_cache_enabled:
+        return None
+    return SearchCache(
+        get_cache(
+            "search_responses",
+            config.cache.search_cache_max_mb,
+            config.cache.search_cache_ttl,
+        ),
+        get_cache(
+            "pages",
+            config.cache.page_cache_max_mb,
+            config.cache.page_cache_ttl,
+        ),
+    )
+
+
+def get_segments_cache() -> SqliteCache | None:
+    """
+    Returns the process-wide cache of relevant segments extracted from search
+    results, or None if it is disabled.
+
+    The segments cache is opt-in (SEGMENTS_CACHE_ENABLED) because it returns the
+    stored extraction for a repeated page instead of sampling a new one.
+    """
+    if not config.cache.segments_cache_enabled:
+        return None
+    return get_cache(
+        "relevant_segments",
+        config.cache.segments_cache_max_mb,
+        config.cache.segments_cache_ttl,
+    )
+
+
+def get_routine_cache() -> SqliteCache | None:
+    """
+    Returns the process-wide cache of routines compiled by FrameV4, or None if it
+    is disabled.
+
+    The routine cache is opt-in (ROUTINE_CACHE_ENABLED) because it runs the
+    stored code for a resubmitted strategy instead of generating it again.
+    """
+    if not config.cache.routine_cache_enabled:
+        return None
+    return get_cache(
+        "compiled_routines",
+        config.cache.routine_cache_max_mb,
+        config.cache.routine_cache_ttl,
+    )
+
+
+def get_cache_stats() -> List[Dict[str, Any]]:
+    """
+    Returns the statistics of all caches used by this process so far.
+    """
+    with _caches_lock:
+        caches = list(_caches.values())
+    return [cache.stats() for cache in caches]
@@ -0,0 +1,101 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Research checkpoints for the Universal Deep Research Backend (UDR-B).
+
+This module reads back the research artifacts of an interrupted session, so that
+a resumed research run can reuse every step whose outcome was already recorded
+(the prompt analysis, the topics, the search phrases of a topic, the results of a
+search and the relevant segments of a search result) and only perform the
+missing ones.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import items
+
+
+@dataclass
+class ResearchCheckpoint:
+    """The recorded outcomes of the research steps of a session."""
+
+    prompt: str | None = None
+    prompt_valid: bool | None = None
+    task_prompt: str | None = None
+    format_prompt: str | None = None
+    topics: List[str] | None = None
+    # topic -> search phrases
+    search_phrases: Dict[str, List[str]] = field(default_factory=dict)
+    # (topic, search phrase) -> search results
+    search_results: Dict[tuple[str, str], List[Dict[str, Any]]] = field(
+        default_factory=dict
+    )
+    # (topic, search phrase, URL) -> relevant segments, labeled with the source
+    # index of the interrupted run
+    relevant_segments: Dict[tuple[str, str, str], List[str]] = field(
+        default_factory=dict
+    )
+    completed: bool = False
+
+    @classmethod
+    def load(cls, filepath: str) -> "ResearchCheckpoint":
+        """
+        Reads the checkpoint from the research artifacts of a session.
+
+        The artifacts file is repaired first (see items.repair_artifacts), so that
+        the resumed run can append to it.
+
+        Args:
+            filepath: Path to the research artifacts file of the session
+
+        Returns:
+            ResearchCheckpoint: The checkpoint (empty if there are no artifacts)
+
+        Example:
+            checkpoint = ResearchCheckpoint.load(
+                "instances/key.research_artifacts.jsonl"
+            )
+            if checkpoint.completed:
+                ...
+        """
+        items.repair_artifacts(filepath)
+
+        checkpoint = cls()
+        for item in items.iter_items(filepath):
+            item_type: str | None = item.get("type")
+            if item_type == "prompt":
+                checkpoint.prompt = item["prompt"]
+            elif item_type == "prompt_validity":
+                checkpoint.prompt_valid = item["valid"]
+            elif item_type == "task_prompt":
+                checkpoint.task_prompt = item["task_prompt"]
+            elif item_type == "format_prompt":
+                checkpoint.format_prompt = item["format_prompt"]
+            elif item_type == "topics":
+                checkpoint.topics = item["topics"]
+            elif item_type == "topic_search_phrases":
+                checkpoint.search_phrases[item["topic"]] = item["search_phrases"]
+            elif item_type == "topic_search_results":
+                search_key = (item["topic"], item["search_phrase"])
+                checkpoint.search_results[search_key] = item["results"]
+            elif item_type == "topic_search_result_relevant_segments":
+                url: str = item["search_result"]["url"]
+                result_key = (item["topic"], item["search_phrase"], url)
+                checkpoint.relevant_segments[result_key] = item["relevant_segments"]
+            elif item_type == "all_results":
+                # the aggregated artifacts are written last, in one go
+                checkpoint.completed = True
+        return checkpoint
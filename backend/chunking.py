@@ -0,0 +1,146 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Token counting and chunking utilities for the Universal Deep Research Backend (UDR-B).
+
+This module splits long documents (e.g. raw search result pages) into windows
+that fit a token budget, so that they can be sent to a language model piece by
+piece instead of overflowing its context window.
+"""
+
+import functools
+import math
+import re
+from typing import Any, List
+
+from config import get_config
+
+# Get configuration
+config = get_config()
+
+_WORD_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+@functools.lru_cache(maxsize=None)
+def load_tokenizer(name: str) -> Any:
+    """
+    Loads (once) the Hugging Face tokenizer of the given name.
+    """
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(name)
+
+
+def count_tokens(text: str) -> int:
+    """
+    Counts the tokens of the given text.
+
+    If a tokenizer is configured (TOKENIZER), it is used to count the tokens
+    exactly. Otherwise the count is estimated locally from the number of words
+    and punctuation marks and the length of the text.
+
+    Args:
+        text: The text to count the tokens of
+
+    Returns:
+        int: The (estimated) number of tokens
+
+    Example:
+        count_tokens("Hello, world!")  # 4
+    """
+    if config.research.tokenizer:
+        tokenizer = load_tokenizer(config.research.tokenizer)
+        return len(tokenizer.encode(text, add_special_tokens=False))
+    return max(len(_WORD_PATTERN.findall(text)), math.ceil(len(text) / 4))
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """
+    Splits the text into its non-empty lines (the paragraphs of a page's raw content).
+    """
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def split_long_paragraph(paragraph: str, window_tokens: int) -> List[str]:
+    """
+    Splits a paragraph that does not fit a window into word-aligned pieces that do.
+    """
+    pieces: List[str] = []
+    words: List[str] = []
+    size = 0
+    for word in paragraph.split():
+        # counting word by word slightly overestimates the tokens of the piece
+        word_size = count_tokens(word)
+        if words and size + word_size > window_tokens:
+            pieces.append(" ".join(words))
+            words = []
+            size = 0
+        words.append(word)
+        size += word_size
+    if words:
+        pieces.append(" ".join(words))
+    return pieces
+
+
+def split_into_windows(
+    text: str, window_tokens: int, max_tokens: int | None = None
+) -> List[str]:
+    """
+    Splits the text into windows of at most window_tokens tokens.
+
+    Windows are packed from whole paragraphs; only paragraphs that are longer
+    than a window on their own are split further. If max_tokens is given, the
+    text is truncated after that many tokens.
+
+    Args:
+        text: The text to split
+        window_tokens: The token budget of a single window
+        max_tokens: Optional token budget of the whole text
+
+    Returns:
+        List[str]: The windows, in the order of the text
+
+    Example:
+        windows = split_into_windows(raw_content, window_tokens=4096, max_tokens=32768)
+    """
+    windows: List[str] = []
+    window: List[str] = []
+    window_size = 0
+    total_size = 0
+    for paragraph in split_paragraphs(text):
+        paragraph_size = count_tokens(paragraph)
+        pieces = (
+            [(paragraph, paragraph_size)]
+            if paragraph_size <= window_tokens
+            else [
+                (piece, count_tokens(piece))
+                for piece in split_long_paragraph(paragraph, window_tokens)
+            ]
+        )
+        for piece, piece_size in pieces:
+            if max_tokens is not None and total_size + piece_size > max_tokens:
+                if window:
+                    windows.append("\n".join(window))
+                return windows
+            if window and window_size + piece_size > window_tokens:
+                windows.append("\n".join(window))
+                window = []
+                window_size = 0
+            window.append(piece)
+            window_size += piece_size
+            total_size += piece_size
+    if window:
+        windows.append("\n".join(window))
+    return windows
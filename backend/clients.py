@@ -19,13 +19,20 @@ This module provides client creation and management for:
 - Large Language Models (OpenAI, NVIDIA, local vLLM)
 - Web search (Tavily API)
 - Configuration-based client setup
+- Process-wide sharing of clients and their connection pools
 """
 
-from typing import Any, Dict, List, Literal, TypedDict
+import asyncio
+import inspect
+import os
+import threading
+from typing import Any, AsyncGenerator, Callable, Dict, List, Literal, Tuple, TypedDict
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
 from tavily import TavilyClient
 
+from cache import get_completion_cache, make_cache_key
 from config import get_config
 
 # Get configuration
@@ -82,12 +89,22 @@ MODEL_CONFIGS: Dict[str, ModelConfig] = {
 DEFAULT_MODEL = config.model.default_model
 
 
+# key file path -> (modification time, API key)
+_api_key_cache: Dict[str, Tuple[float, str]] = {}
+
+# (client kind, base URL, API key) -> client
+_client_registry: Dict[Tuple[str, str, str], Any] = {}
+_client_registry_lock = threading.Lock()
+
+
 def get_api_key(api_type: ApiType) -> str:
     """
     Get the API key for the specified API type.
 
     This function reads API keys from configuration-specified files.
     The file paths can be customized via environment variables.
+    Keys are cached and only re-read when the modification time of the
+    key file changes.
 
     Args:
         api_type: The type of API to get the key for ("nvdev", "openai", "tavily")
@@ -114,8 +131,7 @@ def get_api_key(api_type: ApiType) -> str:
         raise ValueError(f"Unknown API type: {api_type}")
 
     try:
-        with open(key_file, "r") as file:
-            return file.read().strip()
+        key_file_mtime = os.stat(key_file).st_mtime
     except FileNotFoundError:
         raise FileNotFoundError(
             f"API key file not found for {api_type}. "
@@ -123,6 +139,33 @@ def get_api_key(api_type: ApiType) -> str:
             f"See README.md for configuration instructions."
         )
 
+    # the key file is only re-read when it has been modified since the last read
+    cached = _api_key_cache.get(key_file)
+    if cached is not None and cached[0] == key_file_mtime:
+        return cached[1]
+
+    with open(key_file, "r") as file:
+        api_key = file.read().strip()
+    _api_key_cache[key_file] = (key_file_mtime, api_key)
+    return api_key
+
+
+def http_limits() -> httpx.Limits:
+    """
+    Build the connection limits for the HTTP connection pools of the API clients.
+
+    Every client talks to a single host, so the limits of its pool are the
+    per-host limits.
+
+    Returns:
+        httpx.Limits: Limits based on the HTTP configuration
+    """
+    return httpx.Limits(
+        max_connections=config.http.max_connections_per_host,
+        max_keepalive_connections=config.http.pool_size,
+        keepalive_expiry=config.http.keepalive_expiry,
+    )
+
 
 def create_lm_client(model_config: ModelConfig | None = None) -> OpenAI:
     """
@@ -146,7 +189,39 @@ def create_lm_client(model_config: ModelConfig | None = None) -> OpenAI:
     model_config = model_config or MODEL_CONFIGS[DEFAULT_MODEL]
     api_key = get_api_key(model_config["api_type"])
 
-    return OpenAI(base_url=model_config["base_url"], api_key=api_key)
+    return OpenAI(
+        base_url=model_config["base_url"],
+        api_key=api_key,
+        http_client=DefaultHttpxClient(limits=http_limits()),
+    )
+
+
+def create_async_lm_client(model_config: ModelConfig | None = None) -> AsyncOpenAI:
+    """
+    Create an AsyncOpenAI client instance with the specified configuration.
+
+    This is the asyncio counterpart of create_lm_client; requests made through
+    the returned client do not block the event loop while waiting for the model.
+
+    Args:
+        model_config: Optional model configuration to override defaults.
+                     If None, uses the default model from configuration.
+
+    Returns:
+        AsyncOpenAI: Configured AsyncOpenAI client instance
+
+    Example:
+        >>> client = create_async_lm_client()
+        >>> response = await client.chat.completions.create(...)
+    """
+    model_config = model_config or MODEL_CONFIGS[DEFAULT_MODEL]
+    api_key = get_api_key(model_config["api_type"])
+
+    return AsyncOpenAI(
+        base_url=model_config["base_url"],
+        api_key=api_key,
+        http_client=DefaultAsyncHttpxClient(limits=http_limits()),
+    )
 
 
 def create_tavily_client() -> TavilyClient:
@@ -170,6 +245,147 @@ def create_tavily_client() -> TavilyClient:
     return TavilyClient(api_key=api_key)
 
 
+def get_shared_client(kind: str, base_url: str, api_key: str, factory) -> Any:
+    """
+    Get a client from the process-wide client registry, creating it if needed.
+
+    Clients are shared per (kind, base URL, API key) so that requests of all
+    sessions reuse the same warm connection pool. A changed API key gets a client
+    of its own; the client of the previous key is not closed, since requests of
+    other sessions may still be using it, but close_shared_clients closes it
+    along with the others.
+
+    Args:
+        kind: The kind of the client (e.g. "openai", "async_openai", "tavily")
+        base_url: The base URL the client talks to
+        api_key: The API key the client should use
+        factory: Callable creating a new client when none is registered
+
+    Returns:
+        Any: The shared client
+    """
+    with _client_registry_lock:
+        key = (kind, base_url, api_key)
+        if key not in _client_registry:
+            _client_registry[key] = factory()
+        return _client_registry[key]
+
+
+async def close_shared_clients() -> None:
+    """
+    Closes the connection pools of all clients in the client registry and
+    empties it (e.g. when the server shuts down).
+    """
+    with _client_registry_lock:
+        clients = list(_client_registry.values())
+        _client_registry.clear()
+    for client in clients:
+        close = getattr(client, "close", None)
+        if close is None:
+            continue
+        # AsyncOpenAI clients close asynchronously, OpenAI and httpx clients synchronously
+        closing = close()
+        if inspect.isawaitable(closing):
+            await closing
+
+
+def get_async_lm_client(model_config: ModelConfig | None = None) -> AsyncOpenAI:
+    """
+    Get the shared AsyncOpenAI client for the specified model configuration.
+
+    Args:
+        model_config: Optional model configuration to override defaults.
+                     If None, uses the default model from configuration.
+
+    Returns:
+        AsyncOpenAI: Shared AsyncOpenAI client instance
+    """
+    model_config = model_config or MODEL_CONFIGS[DEFAULT_MODEL]
+    return get_shared_client(
+        "async_openai",
+        model_config["base_url"],
+        get_api_key(model_config["api_type"]),
+        lambda: create_async_lm_client(model_config),
+    )
+
+
+def get_tavily_client() -> TavilyClient:
+    """
+    Get the shared Tavily client.
+
+    Returns:
+        TavilyClient: Shared Tavily client instance
+
+    Raises:
+        FileNotFoundError: If the Tavily API key file is not found
+    """
+    return get_shared_client(
+        "tavily", "tavily", get_api_key("tavily"), create_tavily_client
+    )
+
+
+def get_shared_http_client() -> httpx.Client:
+    """
+    Get the shared, pooled HTTP client for OpenAI-compatible clients that are
+    constructed elsewhere (e.g. frame.clients.OpenAIClient).
+
+    Returns:
+        httpx.Client: Shared HTTP client instance
+    """
+    return get_shared_client(
+        "http", "", "", lambda: DefaultHttpxClient(limits=http_limits())
+    )
+
+
+def prepare_messages(
+    messages: List[Dict[str, Any]], model_config: ModelConfig
+) -> List[Dict[str, Any]]:
+    """
+    Adapt the messages to the requirements of the given model configuration.
+
+    Models flagged as "retarded" do not take a system prompt; for these, the
+    system prompt is merged into the first user message and replaced by a
+    "detailed thinking off" system message.
+
+    Args:
+        messages: List of messages for the completion
+        model_config: The model configuration the messages are meant for
+
+    Returns:
+        List[Dict[str, Any]]: The messages to send to the model
+    """
+    if "retarded" in model_config and model_config["retarded"]:
+        if messages[0]["role"] == "system":
+            first_message = messages[0]
+            messages = [msg for msg in messages if msg["role"] != "system"]
+            messages[0]["content"] = (
+                first_message["content"] + "\n\n" + messages[0]["content"]
+            )
+            messages.insert(0, {"role": "system", "content": "detailed thinking off"})
+    return messages
+
+
+def make_completion_cache_key(
+    messages: List[Dict[str, Any]], model_config: ModelConfig
+) -> str:
+    """
+    Build the completion cache key of a request.
+
+    The key covers everything that influences the completion: the endpoint,
+    the completion configuration (model, sampling parameters) and the messages.
+
+    Args:
+        messages: List of messages for the completion
+        model_config: The model configuration used for the completion
+
+    Returns:
+        str: The cache key
+    """
+    return make_cache_key(
+        model_config["base_url"], model_config["completion_config"], messages
+    )
+
+
 def get_completion(
     client: OpenAI,
     messages: List[Dict[str, Any]],
@@ -180,7 +396,8 @@ def get_completion(
 
     This function handles both streaming and non-streaming completions,
     with special handling for certain model configurations that require
-    specific message formatting.
+    specific message formatting. If the completion cache is enabled, repeated
+    requests are answered from the cache.
 
     Args:
         client: OpenAI client instance
@@ -199,16 +416,14 @@ def get_completion(
         "Hello! How can I help you today?"
     """
     model_config = model_config or MODEL_CONFIGS[DEFAULT_MODEL]
+    messages = prepare_messages(messages, model_config)
 
-    # Handle special model configurations
-    if "retarded" in model_config and model_config["retarded"]:
-        if messages[0]["role"] == "system":
-            first_message = messages[0]
-            messages = [msg for msg in messages if msg["role"] != "system"]
-            messages[0]["content"] = (
-                first_message["content"] + "\n\n" + messages[0]["content"]
-            )
-            messages.insert(0, {"role": "system", "content": "detailed thinking off"})
+    completion_cache = get_completion_cache()
+    if completion_cache is not None:
+        cache_key = make_completion_cache_key(messages, model_config)
+        cached = completion_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
     completion = client.chat.completions.create(
         messages=messages, **model_config["completion_config"]
@@ -223,6 +438,101 @@ def get_completion(
     else:
         ret = completion.choices[0].message.content
 
+    if completion_cache is not None:
+        completion_cache.put(cache_key, ret)
+    return ret
+
+
+async def stream_completion_async(
+    client: AsyncOpenAI,
+    messages: List[Dict[str, Any]],
+    model_config: ModelConfig | None = None,
+) -> AsyncGenerator[str, None]:
+    """
+    Stream a completion from the AsyncOpenAI client chunk by chunk.
+
+    Chunks are yielded as they arrive from a streaming response. A non-streaming
+    response, or a completion answered from the completion cache, is yielded as
+    a single chunk.
+
+    Args:
+        client: AsyncOpenAI client instance
+        messages: List of messages for the completion
+        model_config: Optional model configuration to override defaults.
+                     If None, uses the default model configuration.
+
+    Yields:
+        str: The chunks of the completion text
+
+    Example:
+        >>> async for chunk in stream_completion_async(client, messages):
+        ...     print(chunk, end="")
+    """
+    model_config = model_config or MODEL_CONFIGS[DEFAULT_MODEL]
+    messages = prepare_messages(messages, model_config)
+
+    completion_cache = get_completion_cache()
+    if completion_cache is not None:
+        cache_key = make_completion_cache_key(messages, model_config)
+        # the cache blocks on SQLite; keep it off the event loop
+        cached = await asyncio.to_thread(completion_cache.get, cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+    completion = await client.chat.completions.create(
+        messages=messages, **model_config["completion_config"]
+    )
+
+    # Handle streaming vs non-streaming responses
+    if model_config["completion_config"]["stream"]:
+        ret = ""
+        async for chunk in completion:
+            if chunk.choices[0].delta.content:
+                ret += chunk.choices[0].delta.content
+                yield chunk.choices[0].delta.content
+    else:
+        ret = completion.choices[0].message.content
+        yield ret
+
+    if completion_cache is not None:
+        await asyncio.to_thread(completion_cache.put, cache_key, ret)
+
+
+async def get_completion_async(
+    client: AsyncOpenAI,
+    messages: List[Dict[str, Any]],
+    model_config: ModelConfig | None = None,
+    on_delta: Callable[[str], None] | None = None,
+) -> str:
+    """
+    Get completion from the AsyncOpenAI client using the specified model configuration.
+
+    This is the asyncio counterpart of get_completion. The request and the
+    iteration over a streaming response are awaited, so other coroutines served
+    by the same event loop keep running while the completion is being produced.
+
+    Args:
+        client: AsyncOpenAI client instance
+        messages: List of messages for the completion
+        model_config: Optional model configuration to override defaults.
+                     If None, uses the default model configuration.
+        on_delta: Optional callback invoked with every chunk of the completion
+                  as it arrives
+
+    Returns:
+        str: The completion text
+
+    Example:
+        >>> client = create_async_lm_client()
+        >>> messages = [{"role": "user", "content": "Hello"}]
+        >>> response = await get_completion_async(client, messages)
+    """
+    ret = ""
+    async for chunk in stream_completion_async(client, messages, model_config):
+        ret += chunk
+        if on_delta is not None:
+            on_delta(chunk)
     return ret
 
 
@@ -79,6 +79,21 @@ class ModelConfig:
     )
 
 
+@dataclass
+class HTTPConfig:
+    """Connection pooling settings for the shared API clients."""
+
+    pool_size: int = field(
+        default_factory=lambda: int(os.getenv("HTTP_POOL_SIZE", "20"))
+    )
+    max_connections_per_host: int = field(
+        default_factory=lambda: int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "64"))
+    )
+    keepalive_expiry: float = field(
+        default_factory=lambda: float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    )
+
+
 @dataclass
 class SearchConfig:
     """Search configuration settings."""
@@ -107,6 +122,84 @@ class ResearchConfig:
     random_seed: int = field(
         default_factory=lambda: int(os.getenv("RANDOM_SEED", "42"))
     )
+    tokenizer: str = field(default_factory=lambda: os.getenv("TOKENIZER", ""))
+    extraction_window_tokens: int = field(
+        default_factory=lambda: int(os.getenv("EXTRACTION_WINDOW_TOKENS", "4096"))
+    )
+    max_document_tokens: int = field(
+        default_factory=lambda: int(os.getenv("MAX_DOCUMENT_TOKENS", "32768"))
+    )
+    prefilter_top_k: int = field(
+        default_factory=lambda: int(os.getenv("PREFILTER_TOP_K", "40"))
+    )
+    dedup_enabled: bool = field(
+        default_factory=lambda: os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+    )
+    dedup_max_distance: int = field(
+        default_factory=lambda: int(os.getenv("DEDUP_MAX_DISTANCE", "7"))
+    )
+    max_concurrent_topics: int = field(
+        default_factory=lambda: int(os.getenv("MAX_CONCURRENT_TOPICS", "2"))
+    )
+    max_concurrent_searches: int = field(
+        default_factory=lambda: int(os.getenv("MAX_CONCURRENT_SEARCHES", "4"))
+    )
+    max_concurrent_extractions: int = field(
+        default_factory=lambda: int(os.getenv("MAX_CONCURRENT_EXTRACTIONS", "4"))
+    )
+
+
+@dataclass
+class ReportingConfig:
+    """Reporting configuration settings."""
+
+    report_mode: str = field(
+        default_factory=lambda: os.getenv("REPORT_MODE", "auto")
+    )
+    section_max_tokens: int = field(
+        default_factory=lambda: int(os.getenv("SECTION_MAX_TOKENS", "8192"))
+    )
+    topic_max_tokens: int = field(
+        default_factory=lambda: int(os.getenv("TOPIC_MAX_TOKENS", "32768"))
+    )
+    max_concurrent_sections: int = field(
+        default_factory=lambda: int(os.getenv("MAX_CONCURRENT_SECTIONS", "4"))
+    )
+    format_pass: str = field(
+        default_factory=lambda: os.getenv("FORMAT_PASS", "auto")
+    )
+    stream_report: bool = field(
+        default_factory=lambda: os.getenv("STREAM_REPORT", "true").lower() == "true"
+    )
+    report_delta_interval: float = field(
+        default_factory=lambda: float(os.getenv("REPORT_DELTA_INTERVAL", "0.25"))
+    )
+    report_delta_max_chars: int = field(
+        default_factory=lambda: int(os.getenv("REPORT_DELTA_MAX_CHARS", "1024"))
+    )
+
+
+@dataclass
+class ArtifactsConfig:
+    """Artifact (JSONL) writing configuration settings."""
+
+    buffer_bytes: int = field(
+        default_factory=lambda: int(os.getenv("ARTIFACT_BUFFER_BYTES", "262144"))
+    )
+    flush_interval: float = field(
+        default_factory=lambda: float(os.getenv("ARTIFACT_FLUSH_INTERVAL", "1.0"))
+    )
+    background_writes: bool = field(
+        default_factory=lambda: os.getenv("ARTIFACT_BACKGROUND_WRITES", "true").lower()
+        == "true"
+    )
+    blobs_enabled: bool = field(
+        default_factory=lambda: os.getenv("ARTIFACT_BLOBS_ENABLED", "true").lower()
+        == "true"
+    )
+    blob_compression: str = field(
+        default_factory=lambda: os.getenv("ARTIFACT_BLOB_COMPRESSION", "gzip")
+    )
 
 
 @dataclass
@@ -139,6 +232,66 @@ class FrameConfig:
     interaction_level: str = field(
         default_factory=lambda: os.getenv("INTERACTION_LEVEL", "none")
     )
+    max_concurrent_errands: int = field(
+        default_factory=lambda: int(os.getenv("FRAME_MAX_CONCURRENT_ERRANDS", "4"))
+    )
+    templates_enabled: bool = field(
+        default_factory=lambda: os.getenv("FRAME_TEMPLATES_ENABLED", "true").lower()
+        == "true"
+    )
+
+
+@dataclass
+class CacheConfig:
+    """Persistent cache configuration settings."""
+
+    directory: str = field(default_factory=lambda: os.getenv("CACHE_DIR", "cache"))
+    completion_cache_enabled: bool = field(
+        default_factory=lambda: os.getenv("COMPLETION_CACHE_ENABLED", "false").lower()
+        == "true"
+    )
+    completion_cache_max_mb: int = field(
+        default_factory=lambda: int(os.getenv("COMPLETION_CACHE_MAX_MB", "512"))
+    )
+    completion_cache_ttl: float = field(
+        default_factory=lambda: float(os.getenv("COMPLETION_CACHE_TTL", "604800"))
+    )
+    search_cache_enabled: bool = field(
+        default_factory=lambda: os.getenv("SEARCH_CACHE_ENABLED", "false").lower()
+        == "true"
+    )
+    search_cache_max_mb: int = field(
+        default_factory=lambda: int(os.getenv("SEARCH_CACHE_MAX_MB", "64"))
+    )
+    search_cache_ttl: float = field(
+        default_factory=lambda: float(os.getenv("SEARCH_CACHE_TTL", "3600"))
+    )
+    page_cache_max_mb: int = field(
+        default_factory=lambda: int(os.getenv("PAGE_CACHE_MAX_MB", "1024"))
+    )
+    page_cache_ttl: float = field(
+        default_factory=lambda: float(os.getenv("PAGE_CACHE_TTL", "86400"))
+    )
+    segments_cache_enabled: bool = field(
+        default_factory=lambda: os.getenv("SEGMENTS_CACHE_ENABLED", "false").lower()
+        == "true"
+    )
+    segments_cache_max_mb: int = field(
+        default_factory=lambda: int(os.getenv("SEGMENTS_CACHE_MAX_MB", "128"))
+    )
+    segments_cache_ttl: float = field(
+        default_factory=lambda: float(os.getenv("SEGMENTS_CACHE_TTL", "86400"))
+    )
+    routine_cache_enabled: bool = field(
+        default_factory=lambda: os.getenv("ROUTINE_CACHE_ENABLED", "false").lower()
+        == "true"
+    )
+    routine_cache_max_mb: int = field(
+        default_factory=lambda: int(os.getenv("ROUTINE_CACHE_MAX_MB", "64"))
+    )
+    routine_cache_ttl: float = field(
+        default_factory=lambda: float(os.getenv("ROUTINE_CACHE_TTL", "604800"))
+    )
 
 
 @dataclass
@@ -148,10 +301,14 @@ class AppConfig:
     server: ServerConfig = field(default_factory=ServerConfig)
     cors: CORSConfig = field(default_factory=CORSConfig)
     model: ModelConfig = field(default_factory=ModelConfig)
+    http: HTTPConfig = field(default_factory=HTTPConfig)
     search: SearchConfig = field(default_factory=SearchConfig)
     research: ResearchConfig = field(default_factory=ResearchConfig)
+    reporting: ReportingConfig = field(default_factory=ReportingConfig)
+    artifacts: ArtifactsConfig = field(default_factory=ArtifactsConfig)
     logging: LoggingConfig = field(default_factory=LoggingConfig)
     frame: FrameConfig = field(default_factory=FrameConfig)
+    cache: CacheConfig = field(default_factory=CacheConfig)
 
     def __post_init__(self):
         """Ensure log directory exists."""
@@ -180,6 +337,11 @@ class AppConfig:
                 "top_p": self.model.top_p,
                 "max_tokens": self.model.max_tokens,
             },
+            "http": {
+                "pool_size": self.http.pool_size,
+                "max_connections_per_host": self.http.max_connections_per_host,
+                "keepalive_expiry": self.http.keepalive_expiry,
+            },
             "search": {
                 "tavily_api_key_file": self.search.tavily_api_key_file,
                 "max_search_results": self.search.max_search_results,
@@ -189,6 +351,32 @@ class AppConfig:
                 "max_search_phrases": self.research.max_search_phrases,
                 "mock_directory": self.research.mock_directory,
                 "random_seed": self.research.random_seed,
+                "tokenizer": self.research.tokenizer,
+                "extraction_window_tokens": self.research.extraction_window_tokens,
+                "max_document_tokens": self.research.max_document_tokens,
+                "prefilter_top_k": self.research.prefilter_top_k,
+                "dedup_enabled": self.research.dedup_enabled,
+                "dedup_max_distance": self.research.dedup_max_distance,
+                "max_concurrent_topics": self.research.max_concurrent_topics,
+                "max_concurrent_searches": self.research.max_concurrent_searches,
+                "max_concurrent_extractions": self.research.max_concurrent_extractions,
+            },
+            "reporting": {
+                "report_mode": self.reporting.report_mode,
+                "section_max_tokens": self.reporting.section_max_tokens,
+                "topic_max_tokens": self.reporting.topic_max_tokens,
+                "max_concurrent_sections": self.reporting.max_concurrent_sections,
+                "format_pass": self.reporting.format_pass,
+                "stream_report": self.reporting.stream_report,
+                "report_delta_interval": self.reporting.report_delta_interval,
+                "report_delta_max_chars": self.reporting.report_delta_max_chars,
+            },
+            "artifacts": {
+                "buffer_bytes": self.artifacts.buffer_bytes,
+                "flush_interval": self.artifacts.flush_interval,
+                "background_writes": self.artifacts.background_writes,
+                "blobs_enabled": self.artifacts.blobs_enabled,
+                "blob_compression": self.artifacts.blob_compression,
             },
             "logging": {
                 "log_dir": self.logging.log_dir,
@@ -200,6 +388,25 @@ class AppConfig:
                 "force_long_context": self.frame.force_long_context,
                 "max_iterations": self.frame.max_iterations,
                 "interaction_level": self.frame.interaction_level,
+                "max_concurrent_errands": self.frame.max_concurrent_errands,
+                "templates_enabled": self.frame.templates_enabled,
+            },
+            "cache": {
+                "directory": self.cache.directory,
+                "completion_cache_enabled": self.cache.completion_cache_enabled,
+                "completion_cache_max_mb": self.cache.completion_cache_max_mb,
+                "completion_cache_ttl": self.cache.completion_cache_ttl,
+                "search_cache_enabled": self.cache.search_cache_enabled,
+                "search_cache_max_mb": self.cache.search_cache_max_mb,
+                "search_cache_ttl": self.cache.search_cache_ttl,
+                "page_cache_max_mb": self.cache.page_cache_max_mb,
+                "page_cache_ttl": self.cache.page_cache_ttl,
+                "segments_cache_enabled": self.cache.segments_cache_enabled,
+                "segments_cache_max_mb": self.cache.segments_cache_max_mb,
+                "segments_cache_ttl": self.cache.segments_cache_ttl,
+                "routine_cache_enabled": self.cache.routine_cache_enabled,
+                "routine_cache_max_mb": self.cache.routine_cache_max_mb,
+                "routine_cache_ttl": self.cache.routine_cache_ttl,
             },
         }
 
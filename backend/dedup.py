@@ -0,0 +1,126 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Near-duplicate detection utilities for the Universal Deep Research Backend (UDR-B).
+
+This module fingerprints paragraphs with 64-bit SimHash and indexes the
+fingerprints, so that syndicated copies of the same paragraph (which differ only
+in a few words, punctuation or whitespace) can be found in constant time.
+"""
+
+import hashlib
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from ranking import tokenize
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 2
+MIN_WORDS = 8
+
+_BIT_SHIFTS = np.arange(FINGERPRINT_BITS, dtype=np.uint64)
+
+
+def simhash(text: str) -> int | None:
+    """
+    Computes the 64-bit SimHash fingerprint of the text over its word shingles.
+
+    Texts shorter than MIN_WORDS words are too short for a meaningful fingerprint
+    (e.g. navigation links) and are not fingerprinted.
+
+    Args:
+        text: The text to fingerprint
+
+    Returns:
+        int | None: The fingerprint, or None if the text is too short
+
+    Example:
+        simhash("Gold prices rose sharply in 1970 after the end of Bretton Woods.")
+    """
+    words: List[str] = tokenize(text)
+    if len(words) < MIN_WORDS:
+        return None
+
+    shingles = Counter(
+        " ".join(words[i : i + SHINGLE_SIZE])
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    )
+    hashes = np.array(
+        [
+            int.from_bytes(
+                hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(),
+                "little",
+            )
+            for shingle in shingles
+        ],
+        dtype=np.uint64,
+    )
+    weights = np.array(list(shingles.values()))
+    bits = (hashes[:, None] >> _BIT_SHIFTS) & np.uint64(1)
+    votes = np.where(bits == 1, weights[:, None], -weights[:, None]).sum(axis=0)
+    return sum(1 << bit for bit in np.flatnonzero(votes > 0).tolist())
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class NearDuplicateIndex:
+    """
+    An index of fingerprints that finds fingerprints within max_distance bits.
+
+    The fingerprints are split into max_distance + 1 bands; two fingerprints that
+    differ in at most max_distance bits share at least one band exactly, so only
+    the fingerprints sharing a band with the query have to be compared.
+    """
+
+    def __init__(self, max_distance: int = 7) -> None:
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = FINGERPRINT_BITS // self.bands
+        self._buckets: Dict[Tuple[int, int], List[Tuple[int, int, Any]]] = {}
+        self._size = 0
+
+    def _band_keys(self, fingerprint: int) -> List[Tuple[int, int]]:
+        mask = (1 << self.band_bits) - 1
+        return [
+            (band, (fingerprint >> (band * self.band_bits)) & mask)
+            for band in range(self.bands)
+        ]
+
+    def find(self, fingerprint: int) -> Any | None:
+        """
+        Returns the value of the earliest added near-duplicate of the fingerprint,
+        or None if there is none.
+        """
+        best: Tuple[int, int, Any] | None = None
+        for band_key in self._band_keys(fingerprint):
+            for candidate in self._buckets.get(band_key, []):
+                if hamming_distance(candidate[1], fingerprint) > self.max_distance:
+                    continue
+                if best is None or candidate[0] < best[0]:
+                    best = candidate
+        return best[2] if best is not None else None
+
+    def add(self, fingerprint: int, value: Any) -> None:
+        """
+        Adds the fingerprint to the index, associated with the value.
+        """
+        entry = (self._size, fingerprint, value)
+        self._size += 1
+        for band_key in self._band_keys(fingerprint):
+            self._buckets.setdefault(band_key, []).append(entry)
@@ -0,0 +1,177 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Session event fan-out for the Universal Deep Research Backend (UDR-B).
+
+Research runs execute as background tasks that publish their event messages to
+an in-memory, per-session event bus instead of writing them to a single HTTP
+response. Any number of subscribers can follow a session: a subscriber first
+replays the events already written to the session's events file and then tails
+the live events of the run, so a client that disconnects can reconnect without
+interrupting (or repeating) the run.
+
+Events are numbered by their position in the events file of the session, which
+is also what subscribers pass to resume from a given event.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+from typing import AsyncGenerator, Dict, List, Set
+
+import items
+
+
+def count_events(events_path: str) -> int:
+    """
+    Returns the number of events written to the events file.
+    """
+    items.flush_artifact_writer(events_path)
+    if not os.path.exists(events_path):
+        return 0
+    entries = items.load_index(events_path)
+    return len(entries if entries is not None else items.scan_index(events_path))
+
+
+async def replay_events(
+    session_key: str, events_path: str, start: int, stop: int | None = None
+) -> AsyncGenerator[str, None]:
+    """
+    Replays the events [start, stop) of the events file as event messages.
+    """
+    items.flush_artifact_writer(events_path)
+    for event in itertools.islice(items.iter_items(events_path), start, stop):
+        yield json.dumps({"event": event, "session_key": session_key}) + "\n"
+
+
+class SessionEventBus:
+    """
+    Fans out the event messages of the run of a session to its subscribers.
+
+    Messages are published after their event has been registered in the events
+    file, so that the events preceding a subscription can be replayed from the
+    file and only the later ones have to be delivered through the bus.
+    """
+
+    def __init__(self, session_key: str, events_path: str, start_index: int) -> None:
+        self.session_key = session_key
+        self.events_path = events_path
+        # index of the first event of the run in the events file
+        self.start_index = start_index
+        # index of the next event to be published
+        self.next_index = start_index
+        self.finished = False
+        self._subscribers: List[asyncio.Queue] = []
+
+    def publish(self, message: str) -> None:
+        self.next_index += 1
+        for queue in self._subscribers:
+            queue.put_nowait(message)
+
+    def finish(self) -> None:
+        self.finished = True
+        for queue in self._subscribers:
+            queue.put_nowait(None)
+        self._subscribers = []
+
+    async def subscribe(self, from_index: int = 0) -> AsyncGenerator[str, None]:
+        """
+        Yields the event messages of the session from the given event index on:
+        first the ones already published (replayed from the events file), then
+        the live ones, until the run finishes.
+
+        Args:
+            from_index: Index of the first event to yield
+
+        Yields:
+            str: The event messages, one JSON line each
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        live_index: int = self.next_index
+        if self.finished:
+            queue.put_nowait(None)
+        else:
+            self._subscribers.append(queue)
+        try:
+            if from_index < live_index:
+                async for message in replay_events(
+                    self.session_key, self.events_path, from_index, live_index
+                ):
+                    yield message
+            skipped: int = max(0, from_index - live_index)
+            while (message := await queue.get()) is not None:
+                if skipped:
+                    skipped -= 1
+                    continue
+                yield message
+        finally:
+            if queue in self._subscribers:
+                self._subscribers.remove(queue)
+
+
+_buses: Dict[str, SessionEventBus] = {}
+_run_tasks: Set[asyncio.Task] = set()
+
+
+def get_event_bus(session_key: str) -> SessionEventBus | None:
+    """
+    Returns the event bus of the session if it has a run in progress.
+    """
+    return _buses.get(session_key)
+
+
+def start_session_run(
+    session_key: str, events_path: str, messages: AsyncGenerator[str, None]
+) -> SessionEventBus:
+    """
+    Runs the session in a background task that publishes the messages yielded by
+    the given generator to a new event bus of the session. The run continues
+    when subscribers disconnect.
+
+    Args:
+        session_key: The session the run belongs to
+        events_path: Path to the events file of the session
+        messages: Generator running the session and yielding its event messages,
+                  after registering each event in the events file
+
+    Returns:
+        SessionEventBus: The event bus of the run
+
+    Raises:
+        RuntimeError: If the session already has a run in progress
+
+    Example:
+        bus = start_session_run(key, f"instances/{key}.events.jsonl", messages)
+        return StreamingResponse(bus.subscribe(bus.start_index))
+    """
+    if session_key in _buses:
+        raise RuntimeError(f"Session {session_key} already has a run in progress")
+
+    bus = SessionEventBus(session_key, events_path, count_events(events_path))
+    _buses[session_key] = bus
+
+    async def run() -> None:
+        try:
+            async for message in messages:
+                bus.publish(message)
+        finally:
+            bus.finish()
+            _buses.pop(session_key, None)
+
+    task: asyncio.Task = asyncio.create_task(run())
+    _run_tasks.add(task)
+    task.add_done_callback(_run_tasks.discard)
+    return bus
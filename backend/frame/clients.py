@@ -12,6 +12,10 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import hashlib
+import json
+from typing import Any
+
 from .trace import Trace
 
 
@@ -35,23 +39,67 @@ class Client:
 
     def trace_message(self, message: dict) -> str:
         if self.trace is not None:
-            self.trace(f"<<{message['role']}>>")
-            self.trace(message["content"])
+            with self.trace.lock:
+                self.trace(f"<<{message['role']}>>")
+                self.trace(message["content"])
 
     def trace_query(
         self, pre_prompt: str, prompt: str, completion_config: dict = {}
     ) -> str:
         if self.trace is not None:
-            self.trace.write_separator()
-            self.trace("<<PRE-PROMPT>>")
-            self.trace(pre_prompt)
-            self.trace("<<PROMPT>>")
-            self.trace(prompt)
+            with self.trace.lock:
+                self.trace.write_separator()
+                self.trace("<<PRE-PROMPT>>")
+                self.trace(pre_prompt)
+                self.trace("<<PROMPT>>")
+                self.trace(prompt)
 
     def trace_response(self, response: str) -> str:
         if self.trace is not None:
-            self.trace("<<RESPONSE>>")
-            self.trace(response)
+            with self.trace.lock:
+                self.trace("<<RESPONSE>>")
+                self.trace(response)
+
+    # the query of a call is traced together with its response (or the error of the call), once the call is over,
+    # so that the entries of calls made concurrently (e.g. by the errands of a message) are not interleaved
+    def trace_exchange(
+        self,
+        pre_prompt: str,
+        prompt: str,
+        response: str | None = None,
+        error: BaseException | None = None,
+    ) -> None:
+        if self.trace is not None:
+            with self.trace.lock:
+                self.trace_query(pre_prompt, prompt)
+                if error is not None:
+                    self.trace_error(error)
+                else:
+                    self.trace_response(response)
+
+    def trace_messages(
+        self,
+        messages: list[dict],
+        response: dict | None = None,
+        trace_input_messages: bool = True,
+        error: BaseException | None = None,
+    ) -> None:
+        if self.trace is not None:
+            with self.trace.lock:
+                if trace_input_messages:
+                    self.trace.write_separator()
+                    for message in messages:
+                        self.trace_message(message)
+                if error is not None:
+                    self.trace_error(error)
+                else:
+                    self.trace_message(response)
+
+    def trace_error(self, error: BaseException) -> None:
+        if self.trace is not None:
+            with self.trace.lock:
+                self.trace("<<ERROR>>")
+                self.trace(f"{type(error).__name__}: {error}")
 
 
 class HuggingFaceClient(Client):
@@ -108,34 +156,40 @@ class HuggingFaceClient(Client):
         self.generator = pipeline("text-generation", **merged_configuration)
 
     def run(self, pre_prompt: str, prompt: str, completion_config: dict = {}) -> str:
-        super().run(pre_prompt, prompt, completion_config)
         messages = [
             {"role": "system", "content": pre_prompt},
             {"role": "user", "content": prompt},
         ]
 
-        completion = self.generator(
-            messages,
-            **completion_config,
-            pad_token_id=self.generator.tokenizer.eos_token_id,
-        )
+        try:
+            completion = self.generator(
+                messages,
+                **completion_config,
+                pad_token_id=self.generator.tokenizer.eos_token_id,
+            )
+        except BaseException as error:
+            self.trace_exchange(pre_prompt, prompt, error=error)
+            raise
 
         ret = completion[0]["generated_text"][-1]["content"]
-        self.trace_response(ret)
+        self.trace_exchange(pre_prompt, prompt, ret)
         return ret
 
     def run_messages(
         self, messages, trace_input_messages: bool = True, completion_config={}
     ) -> list[dict]:
-        super().run_messages(messages, trace_input_messages, completion_config)
-        completion = self.generator(
-            messages,
-            **completion_config,
-            pad_token_id=self.generator.tokenizer.eos_token_id,
-        )
+        try:
+            completion = self.generator(
+                messages,
+                **completion_config,
+                pad_token_id=self.generator.tokenizer.eos_token_id,
+            )
+        except BaseException as error:
+            self.trace_messages(messages, None, trace_input_messages, error=error)
+            raise
 
         ret = completion[0]["generated_text"]
-        self.trace_message(ret[-1])
+        self.trace_messages(messages, ret[-1], trace_input_messages)
         return ret
 
 
@@ -147,6 +201,8 @@ class OpenAIClient(Client):
         seed: int = 42,
         api_key: str | None = None,
         trace: Trace = None,
+        http_client: Any = None,
+        cache: Any = None,
     ) -> None:
         super().__init__(trace=trace)
 
@@ -162,12 +218,17 @@ class OpenAIClient(Client):
             api_key = os.getenv("NGC_API_KEY")
         self.api_key = api_key
         self.seed = seed
+        # optional completion cache; any object with get(key) and put(key, value)
+        self.cache = cache
 
         from openai import OpenAI
 
-        self.client = OpenAI(base_url=self.base_url, api_key=self.api_key)
+        # http_client allows sharing a (pooled) httpx client between instances
+        self.client = OpenAI(
+            base_url=self.base_url, api_key=self.api_key, http_client=http_client
+        )
 
-    def _invoke(self, messages: list[dict], completion_config: dict = {}) -> str:
+    def _merge_settings(self, completion_config: dict = {}) -> dict:
         default_settings = {
             "model": self.model,
             "top_p": 1,
@@ -176,12 +237,30 @@ class OpenAIClient(Client):
             "stream": True,
             "seed": self.seed,
         }
+        return {**default_settings, **completion_config}
 
-        merged_settings = {**default_settings, **completion_config}
+    def _prepare_messages(self, messages: list[dict]) -> list[dict]:
         # go through the messages; if the role="ipython" rename it to "function"
         for message in messages:
             if message["role"] == "ipython":
                 message["role"] = "function"
+        return messages
+
+    def _make_cache_key(self, messages: list[dict], merged_settings: dict) -> str:
+        serialized = json.dumps(
+            [self.base_url, merged_settings, messages], sort_keys=True, default=str
+        )
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def _invoke(self, messages: list[dict], completion_config: dict = {}) -> str:
+        merged_settings = self._merge_settings(completion_config)
+        messages = self._prepare_messages(messages)
+        if self.cache is not None:
+            cache_key = self._make_cache_key(messages, merged_settings)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         completion = self.client.chat.completions.create(
             messages=messages, **merged_settings
         )
@@ -191,31 +270,38 @@ class OpenAIClient(Client):
             if chunk.choices[0].delta.content is not None:
                 ret += chunk.choices[0].delta.content
 
+        if self.cache is not None:
+            self.cache.put(cache_key, ret)
         return ret
 
     def run(self, pre_prompt: str, prompt: str, completion_config: dict = {}) -> str:
-        super().run(pre_prompt, prompt, completion_config)
-
-        ret = self._invoke(
-            messages=[
-                {"role": "system", "content": pre_prompt},
-                {"role": "user", "content": prompt},
-            ],
-            completion_config=completion_config,
-        )
+        try:
+            ret = self._invoke(
+                messages=[
+                    {"role": "system", "content": pre_prompt},
+                    {"role": "user", "content": prompt},
+                ],
+                completion_config=completion_config,
+            )
+        except BaseException as error:
+            self.trace_exchange(pre_prompt, prompt, error=error)
+            raise
 
-        self.trace_response(ret)
+        self.trace_exchange(pre_prompt, prompt, ret)
         return ret
 
     def run_messages(
         self, messages, trace_input_messages: bool = True, completion_config={}
     ) -> list[dict]:
-        super().run_messages(messages, trace_input_messages, completion_config)
-
-        ret_str: str = self._invoke(
-            messages=messages, completion_config=completion_config
-        )
+        try:
+            ret_str: str = self._invoke(
+                messages=messages, completion_config=completion_config
+            )
+        except BaseException as error:
+            self.trace_messages(messages, None, trace_input_messages, error=error)
+            raise
         ret_msg: dict = {"role": "assistant", "content": ret_str}
 
-        self.trace_message(ret_msg)
+        self.trace_messages(messages, ret_msg, trace_input_messages)
         return [*messages, ret_msg]
+
@@ -13,15 +13,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import ast
-from dataclasses import dataclass
+import hashlib
+import json
+import threading
+import types
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
 from datetime import datetime
-from typing import Any, Generator
+from typing import Any, Callable, Generator
 
 from frame.clients import *
 from frame.errands4 import Errand, default_errand_profile
 from frame.routines import *
 from frame.tidings import *
 
+# parsed and compiled sources are shared by all frames, keyed by the SHA-256 digest of the source
+MAX_COMPILED_SOURCES = 1024
+_compiled_sources: OrderedDict[str, "CompiledSource"] = OrderedDict()
+_compiled_sources_lock = threading.Lock()
+
 
 @dataclass
 class FrameConfigV4:
@@ -29,6 +40,8 @@ class FrameConfigV4:
     force_long_context: bool = False
     max_iterations: int = 1024
     interaction_level: str = "none"  # one of "none", "system", "lm"
+    # errands of a message that do not depend on each other run concurrently, up to this many at a time
+    max_concurrent_errands: int = 4
 
     def update(self, **kwargs) -> None:
         for key, value in kwargs.items():
@@ -40,12 +53,69 @@ class FrameConfigV4:
             "long_context_cutoff": self.long_context_cutoff,
             "force_long_context": self.force_long_context,
             "max_iterations": self.max_iterations,
+            "interaction_level": self.interaction_level,
+            "max_concurrent_errands": self.max_concurrent_errands,
         }
 
     def from_dict(self, config: dict) -> None:
         self.update(**config)
 
 
+@dataclass
+class ErrandNode:
+    """
+    An errand run while compiling a message, described by its inputs and outputs.
+
+    The errand is run with the named values in inputs as its arguments, and its completion is turned into the named
+    values in outputs by parse (by default, the completion is the only output). See FrameV4.run_errand_graph.
+    """
+
+    designation: str
+    inputs: list[str]
+    outputs: list[str]
+    parse: Callable[[str], dict[str, Any]] | None = None
+
+
+class CompiledSource:
+    """
+    The parsed AST of a piece of Python source code, and its code object (compiled from the AST on first use).
+
+    Instances are shared through compile_source, so the AST must not be modified.
+    """
+
+    def __init__(self, source: str, filename: str = "<string>") -> None:
+        self.source = source
+        self.filename = filename
+        self.tree: ast.Module = ast.parse(source, filename=filename)
+        self._code_object = None
+
+    @property
+    def code_object(self) -> Any:
+        if self._code_object is None:
+            self._code_object = compile(self.tree, self.filename, "exec")
+        return self._code_object
+
+
+def compile_source(source: str) -> CompiledSource:
+    """
+    Returns the CompiledSource of the given source code, parsing it only if it has not been parsed recently (by any
+    frame). Raises SyntaxError if the source cannot be parsed.
+    """
+    digest = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    with _compiled_sources_lock:
+        compiled = _compiled_sources.get(digest)
+        if compiled is not None:
+            _compiled_sources.move_to_end(digest)
+            return compiled
+
+    compiled = CompiledSource(source)
+    with _compiled_sources_lock:
+        _compiled_sources[digest] = compiled
+        while len(_compiled_sources) > MAX_COMPILED_SOURCES:
+            _compiled_sources.popitem(last=False)
+    return compiled
+
+
 class SkillV4:
     name: str
     source_message: str
@@ -67,6 +137,19 @@ class SkillV4:
         self.docstring = docstring
         self.code = code
         self.source_message = source_message
+        self._compiled: CompiledSource | None = None
+
+    @property
+    def compiled(self) -> CompiledSource | None:
+        """
+        The parsed and compiled code of the skill (see compile_source), or None if the skill has no source code (e.g.
+        a skill without code, or the language_model skill, whose code is the code object of a bound function).
+        """
+        if not isinstance(self.code, str):
+            return None
+        if self._compiled is None or self._compiled.source != self.code:
+            self._compiled = compile_source(self.code)
+        return self._compiled
 
     def to_dict(self) -> dict:
         return {
@@ -114,7 +197,33 @@ class FrameV4:
         errand_profile: dict[str, type[Errand]] | None = None,
         compilation_trace: bool | str | Trace | None = None,
         execution_trace: bool | str | Trace | None = None,
+        compilation_cache: Any = None,
+    ) -> None:
+        self._init_state(
+            client_profile=client_profile,
+            instance_id=instance_id,
+            config=config,
+            errand_profile=errand_profile,
+            compilation_trace=compilation_trace,
+            execution_trace=execution_trace,
+            compilation_cache=compilation_cache,
+        )
+        self.new_instance()
+
+    def _init_state(
+        self,
+        client_profile: dict[str, Client] | Client,
+        instance_id: str | None,
+        config: FrameConfigV4 | None,
+        errand_profile: dict[str, type[Errand]] | None,
+        compilation_trace: bool | str | Trace | None,
+        execution_trace: bool | str | Trace | None,
+        compilation_cache: Any,
     ) -> None:
+        """
+        Sets up the configuration, clients, errands and traces of the frame (everything but its skills, tidings and
+        globals, which are set up by new_instance or copied by fork).
+        """
         self.instance_id = (
             datetime.now().strftime("%Y%m%d_%H-%M-%S")
             if instance_id is None
@@ -143,8 +252,8 @@ class FrameV4:
         self.execution_trace = self.make_trace_from_arg(
             path=f"./logs/{self.instance_id}_execution.log", trace_arg=execution_trace
         )
-
-        self.new_instance()
+        # optional cache of compiled routines; any object with get(key) and put(key, value)
+        self.compilation_cache = compilation_cache
 
     def get_chat_context_dict(self) -> dict:
         """
@@ -173,6 +282,21 @@ class FrameV4:
         exec("import math", {}, self.globals)
         exec("from typing import *", {}, self.globals)
         exec("from tavily import TavilyClient", {}, self.globals)
+        self.bind_language_model()
+
+        self.execution_trace.write_separator()
+        self.execution_trace(
+            f"Creating new instance with id {self.instance_id} at {datetime.now()}"
+        )
+        self.execution_trace(
+            f"New instance created; skills, tidings, and globals erased"
+        )
+        self.execution_trace.write_separator()
+
+    def bind_language_model(self) -> None:
+        """
+        Defines the language_model skill (and global) calling the language model client of the frame.
+        """
         client = self.find_client_in_profile("language_model")
 
         def language_model(prompt: str, pre_prompt: str = None) -> str:
@@ -206,14 +330,79 @@ class FrameV4:
             )
         self.globals["language_model"] = language_model
 
-        self.execution_trace.write_separator()
-        self.execution_trace(
-            f"Creating new instance with id {self.instance_id} at {datetime.now()}"
+    def fork(
+        self,
+        client_profile: dict[str, Client] | Client | None = None,
+        instance_id: str | None = None,
+        config: FrameConfigV4 | None = None,
+        compilation_trace: bool | str | Trace | None = None,
+        execution_trace: bool | str | Trace | None = None,
+        compilation_cache: Any = None,
+    ) -> "FrameV4":
+        """
+        Returns a new frame that starts from the state of this one (e.g. a template frame that has already processed
+        the preamble messages of a strategy), without new_instance and without processing any message again.
+
+        The skills are shared with this frame (they are not modified once created). The globals are copied: functions
+        defined by messages of this frame are rebound to the globals of the fork, so that they resolve language_model
+        and the other skills of the fork, and top-level lists, dicts and sets are copied, so that the fork and this
+        frame do not modify each other's state. Other values (modules, classes, ...) are shared.
+
+        Args:
+            client_profile: The clients of the fork (the clients of this frame by default)
+            instance_id: The instance id of the fork (a timestamp by default)
+            config: The configuration of the fork (a copy of the configuration of this frame by default)
+            compilation_trace: The compilation trace of the fork, as in __init__
+            execution_trace: The execution trace of the fork, as in __init__
+            compilation_cache: The compilation cache of the fork, as in __init__
+
+        Returns:
+            FrameV4: The forked frame
+        """
+        fork: FrameV4 = FrameV4.__new__(FrameV4)
+        fork._init_state(
+            client_profile=(
+                {**self.client_profile} if client_profile is None else client_profile
+            ),
+            instance_id=instance_id,
+            config=replace(self.config) if config is None else config,
+            errand_profile=self.errand_profile,
+            compilation_trace=compilation_trace,
+            execution_trace=execution_trace,
+            compilation_cache=compilation_cache,
         )
-        self.execution_trace(
-            f"New instance created; skills, tidings, and globals erased"
+
+        fork.skills = {**self.skills}
+        fork.tidings = {**self.tidings}
+        fork.last_mid = self.last_mid
+        fork.globals = {}
+        for name, value in self.globals.items():
+            if (
+                isinstance(value, types.FunctionType)
+                and value.__globals__ is self.globals
+            ):
+                rebound = types.FunctionType(
+                    value.__code__,
+                    fork.globals,
+                    value.__name__,
+                    value.__defaults__,
+                    value.__closure__,
+                )
+                rebound.__kwdefaults__ = value.__kwdefaults__
+                rebound.__dict__.update(value.__dict__)
+                rebound.__doc__ = value.__doc__
+                value = rebound
+            elif isinstance(value, (list, dict, set)):
+                value = value.copy()
+            fork.globals[name] = value
+        fork.bind_language_model()
+
+        fork.execution_trace.write_separator()
+        fork.execution_trace(
+            f"Forking instance {fork.instance_id} from instance {self.instance_id} at {datetime.now()}"
         )
-        self.execution_trace.write_separator()
+        fork.execution_trace.write_separator()
+        return fork
 
     # HIGH-LEVEL OUTPUT GENERATION CODE
     def generate(
@@ -262,7 +451,7 @@ class FrameV4:
         generate_not_return: bool = False,
     ) -> Any | Generator[dict, None, None]:
         """
-        message_type is one of "routine", "routine_skill", "query", "query_skill", "code", "code_skill", "data", "auto" (also representable as None)
+        message_type is one of "routine", "routine_skill", "query", "query_skill", "code", "code_skill", "code_skill_verbatim", "data", "auto" (also representable as None)
         """
         if message.strip() == "":
             raise ValueError("Empty message provided for instruction processing")
@@ -275,6 +464,7 @@ class FrameV4:
             "query_skill",
             "code",
             "code_skill",
+            "code_skill_verbatim",
             "data",
             "auto",
             "generating_routine",
@@ -300,6 +490,8 @@ class FrameV4:
             skills = self.process_message_code_skill(
                 mid, message
             )  # no tidings, skills are supposed to be pure functions
+        elif message_type == "code_skill_verbatim":
+            skills = self.process_message_code_skill_verbatim(mid, message)
         elif message_type == "routine":
             skills, invocation_code, variable_descriptions = (
                 self.process_message_routine(mid, message, self.tidings)
@@ -326,7 +518,9 @@ class FrameV4:
 
         skill_capture_context = {}
         for skill in skills:
-            exec(f"{skill.code}", self.globals, skill_capture_context)
+            compiled = skill.compiled
+            if compiled is not None:
+                exec(compiled.code_object, self.globals, skill_capture_context)
             self.skills[skill.name] = skill
         for context_var, context_value in skill_capture_context.items():
             if not context_var in self.globals:
@@ -337,8 +531,9 @@ class FrameV4:
         }
         __output = None
         if invocation_code is not None:
+            invocation = compile_source(invocation_code).code_object
             if message_type != "generating_routine":
-                exec(invocation_code, self.globals, execution_context)
+                exec(invocation, self.globals, execution_context)
                 if "__output" in execution_context:
                     __output = execution_context["__output"]
                 if "__vars" in execution_context:
@@ -356,7 +551,7 @@ class FrameV4:
                             ),
                         )
             else:
-                exec(invocation_code, self.globals, execution_context)
+                exec(invocation, self.globals, execution_context)
                 __generator = execution_context["__generator"]
                 __final: dict[str, Any] = {}
                 for notification in __generator:
@@ -411,83 +606,39 @@ class FrameV4:
         """
         Processes a code message and returns the corresponding skill(s), invocation code, and variable descriptions.
         """
-        code_processing_errand: Errand = self.find_errand_in_profile(
-            "message_code_processing"
-        )()
-        code_processing_client = self.find_client_in_profile("message_code_processing")
-
         # serialize tidings for prompt injection
         serialized_tidings = "\n".join(
             [f"{k}: {v.content}  # {v.description}" for k, v in tidings.items()]
         )
-        code: str = code_processing_errand.run(
-            runner=code_processing_client,
-            args={"message": message, "tidings": serialized_tidings},
-        )
-        code = self.sanitize_code(code)
 
-        # replace the first occurence of code with f"message_{mid}_code"
-        code = code.replace("code", f"message_{mid}_code", 1)
-        docstring_addendum = f"\n\nThis function was generated to fulfill the intent of the user message with message id {mid}."
-
-        func_defs = self.extract_function_definitions(code)
-        skills = []
-        variable_descriptions: dict[str, str] | None = None
-        if func_defs:
-            func = func_defs[0]
-            func_code = func["code"].replace(
-                func["docstring"], func["docstring"] + docstring_addendum, 1
-            )
-            skills.append(
-                SkillV4(
-                    name=func["python_name"],
-                    source_message=message,
-                    python_name=func["python_name"],
-                    docstring=func["docstring"] + docstring_addendum,
-                    code=func_code,
-                )
-            )
-
-            # TODO: perhaps, in the future, let the user know that other functions are present but ignored
-
-            message_code_call_errand: Errand = self.find_errand_in_profile(
-                "message_code_call"
-            )()
-            message_code_call_client = self.find_client_in_profile("message_code_call")
-            invocation_code = message_code_call_errand.run(
-                runner=message_code_call_client,
-                args={
-                    "message": message,
-                    "code": skills[0].code,
-                    "tidings": serialized_tidings,
-                },
-            )
-
-            # Use MessageCodeVariablesErrand to get variable descriptions
-            message_code_variables_errand: Errand = self.find_errand_in_profile(
-                "message_code_variables"
-            )()
-            message_code_variables_client = self.find_client_in_profile(
-                "message_code_variables"
-            )
-            variable_descriptions_raw = message_code_variables_errand.run(
-                runner=message_code_variables_client,
-                args={
-                    "message": message,
-                    "code": skills[0].code,
-                    "tidings": serialized_tidings,
-                },
-            )
-            # Parse the output into a dict
-            variable_descriptions = {}
-            for line in variable_descriptions_raw.strip().splitlines():
-                if "#" in line:
-                    var, desc = line.split("#", 1)
-                    variable_descriptions[var.strip()] = desc.strip()
-
-            return skills, invocation_code, variable_descriptions
-        else:
+        # the invocation code and the variable descriptions both only depend on the generated code
+        values = self.run_errand_graph(
+            [
+                ErrandNode(
+                    "message_code_processing",
+                    inputs=["message", "tidings"],
+                    outputs=["skill", "code"],
+                    parse=lambda completion: self.make_message_skill(
+                        mid, message, completion, "code"
+                    ),
+                ),
+                ErrandNode(
+                    "message_code_call",
+                    inputs=["message", "code", "tidings"],
+                    outputs=["invocation_code"],
+                ),
+                ErrandNode(
+                    "message_code_variables",
+                    inputs=["message", "code", "tidings"],
+                    outputs=["variable_descriptions"],
+                    parse=self.parse_variable_descriptions,
+                ),
+            ],
+            {"message": message, "tidings": serialized_tidings},
+        )
+        if values["skill"] is None:
             return [], None, None
+        return [values["skill"]], values["invocation_code"], values["variable_descriptions"]
 
     def process_message_code_skill(self, mid: int, message: str) -> list[SkillV4]:
         """
@@ -525,6 +676,45 @@ class FrameV4:
                 )
         return skills
 
+    def process_message_code_skill_verbatim(
+        self, mid: int, message: str
+    ) -> list[SkillV4]:
+        """
+        Processes a code_skill_verbatim message, i.e. Python source code whose top-level functions are registered as
+        skills as they are, without the code skill processing errand. Other top-level statements are ignored, as for
+        code_skill messages.
+
+        Raises SyntaxError if the message is not valid Python.
+        """
+        # parse eagerly, so that invalid code is reported rather than yielding no skills
+        compile_source(message)
+
+        skills = []
+        for func in self.extract_function_definitions(message):
+            skills.append(
+                SkillV4(
+                    name=func["python_name"],
+                    source_message=message,
+                    python_name=func["python_name"],
+                    docstring=func["docstring"] or "",
+                    code=func["code"],
+                )
+            )
+        return skills
+
+    def register_skills_from_source(self, source: str, mid: int | None = None) -> None:
+        """
+        Registers the top-level functions of the given Python source code as skills, by processing it as a
+        code_skill_verbatim message with the given message id (the one following the last message by default).
+        """
+        for _ in self.process_message(
+            mid=self.last_mid + 1 if mid is None else mid,
+            message=source,
+            message_type="code_skill_verbatim",
+            generate_not_return=True,
+        ):
+            pass
+
     def process_message_routine(
         self,
         mid: int,
@@ -534,18 +724,12 @@ class FrameV4:
     ) -> tuple[list[SkillV4], str | None, dict[str, str] | None]:
         """
         Processes a routine message and returns the corresponding skill(s), invocation code, and variable descriptions.
-        """
-        routine_processing_errand: Errand = (
-            self.find_errand_in_profile("message_routine_processing")()
-            if not is_generating_routine
-            else self.find_errand_in_profile("message_generating_routine_processing")()
-        )
-        routine_processing_client = (
-            self.find_client_in_profile("message_routine_processing")
-            if not is_generating_routine
-            else self.find_client_in_profile("message_generating_routine_processing")
-        )
 
+        If a compilation cache is set, the compilation result is cached by the message, the docstrings of the
+        available skills, the names and descriptions of the tidings, the errand prompts and the models of the errand
+        clients, so that compiling an unchanged routine does not repeat the errands. The values of the tidings are not
+        part of the key, since the compiled routine refers to the tidings by name.
+        """
         # Prepare skills and tidings for prompt injection
         serialized_skills = "\n\n".join(
             [f"function {k}\n---\n{v.docstring}" for k, v in self.skills.items()]
@@ -553,83 +737,187 @@ class FrameV4:
         serialized_tidings = "\n".join(
             [f"{k} = {v.content}  # {v.description}" for k, v in tidings.items()]
         )
-        code: str = routine_processing_errand.run(
-            runner=routine_processing_client,
-            args={
+
+        # the invocation code and the variable descriptions both only depend on the generated code
+        errand_graph: list[ErrandNode] = [
+            ErrandNode(
+                (
+                    "message_routine_processing"
+                    if not is_generating_routine
+                    else "message_generating_routine_processing"
+                ),
+                inputs=["message", "skills", "tidings"],
+                outputs=["skill", "code"],
+                parse=lambda completion: self.make_message_skill(
+                    mid, message, completion, "routine_code"
+                ),
+            ),
+            ErrandNode(
+                (
+                    "message_routine_call"
+                    if not is_generating_routine
+                    else "message_generating_routine_call"
+                ),
+                inputs=["message", "code", "tidings"],
+                outputs=["invocation_code"],
+            ),
+            ErrandNode(
+                "message_routine_variables",
+                inputs=["message", "code", "tidings"],
+                outputs=["variable_descriptions"],
+                parse=self.parse_variable_descriptions,
+            ),
+        ]
+
+        cache_key: str | None = None
+        if self.compilation_cache is not None:
+            cache_key = self.make_compilation_cache_key(
+                "routine",
+                is_generating_routine,
+                mid,
+                message,
+                serialized_skills,
+                sorted((k, v.description) for k, v in tidings.items()),
+                [
+                    (errand.pre_prompt, errand.prompt)
+                    for errand in (
+                        self.find_errand_in_profile(node.designation)()
+                        for node in errand_graph
+                    )
+                ],
+                [
+                    getattr(client, "model", type(client).__name__)
+                    for client in (
+                        self.find_client_in_profile(node.designation)
+                        for node in errand_graph
+                    )
+                ],
+            )
+            cached: dict | None = self.compilation_cache.get(cache_key)
+            if cached is not None:
+                self.compilation_trace(
+                    f"Routine of message {mid} loaded from the compilation cache"
+                )
+                return (
+                    [SkillV4(**skill) for skill in cached["skills"]],
+                    cached["invocation_code"],
+                    cached["variable_descriptions"],
+                )
+
+        values = self.run_errand_graph(
+            errand_graph,
+            {
                 "message": message,
                 "skills": serialized_skills,
                 "tidings": serialized_tidings,
             },
         )
-        code = self.sanitize_code(code)
+        if values["skill"] is None:
+            return [], None, None
 
-        # replace the first occurrence of code with f"message_{mid}_routine_code"
-        code = code.replace("code", f"message_{mid}_routine_code", 1)
+        skills: list[SkillV4] = [values["skill"]]
+        if cache_key is not None:
+            self.compilation_cache.put(
+                cache_key,
+                {
+                    "skills": [skill.to_dict() for skill in skills],
+                    "invocation_code": values["invocation_code"],
+                    "variable_descriptions": values["variable_descriptions"],
+                },
+            )
+        return skills, values["invocation_code"], values["variable_descriptions"]
+
+    def make_message_skill(
+        self, mid: int, message: str, completion: str, function_name: str
+    ) -> dict[str, Any]:
+        """
+        Turns the code generated for a code or routine message into a skill, named f"message_{mid}_{function_name}".
+
+        Returns the skill and its code (both None if the completion does not define a function).
+        """
+        code = self.sanitize_code(completion)
+
+        # replace the first occurrence of code with f"message_{mid}_{function_name}"
+        code = code.replace("code", f"message_{mid}_{function_name}", 1)
         docstring_addendum = f"\n\nThis function was generated to fulfill the intent of the user message with message id {mid}."
 
         func_defs = self.extract_function_definitions(code)
-        skills = []
-        variable_descriptions: dict[str, str] | None = None
-        if func_defs:
-            func = func_defs[0]
-            func_code = func["code"].replace(
-                func["docstring"], func["docstring"] + docstring_addendum, 1
-            )
-            skills.append(
-                SkillV4(
-                    name=func["python_name"],
-                    source_message=message,
-                    python_name=func["python_name"],
-                    docstring=func["docstring"] + docstring_addendum,
-                    code=func_code,
-                )
-            )
+        if not func_defs:
+            return {"skill": None, "code": None}
 
-            # Generate invocation code using MessageRoutineCallErrand
-            message_routine_call_errand: Errand = (
-                self.find_errand_in_profile("message_routine_call")()
-                if not is_generating_routine
-                else self.find_errand_in_profile("message_generating_routine_call")()
-            )
-            message_routine_call_client = (
-                self.find_client_in_profile("message_routine_call")
-                if not is_generating_routine
-                else self.find_client_in_profile("message_generating_routine_call")
-            )
-            invocation_code = message_routine_call_errand.run(
-                runner=message_routine_call_client,
-                args={
-                    "message": message,
-                    "code": skills[0].code,
-                    "tidings": serialized_tidings,
-                },
-            )
+        # TODO: perhaps, in the future, let the user know that other functions are present but ignored
+        func = func_defs[0]
+        func_code = func["code"].replace(
+            func["docstring"], func["docstring"] + docstring_addendum, 1
+        )
+        skill = SkillV4(
+            name=func["python_name"],
+            source_message=message,
+            python_name=func["python_name"],
+            docstring=func["docstring"] + docstring_addendum,
+            code=func_code,
+        )
+        return {"skill": skill, "code": skill.code}
 
-            # Generate variable descriptions using MessageRoutineVariablesErrand
-            message_routine_variables_errand: Errand = self.find_errand_in_profile(
-                "message_routine_variables"
-            )()
-            message_routine_variables_client = self.find_client_in_profile(
-                "message_routine_variables"
-            )
-            variable_descriptions_raw = message_routine_variables_errand.run(
-                runner=message_routine_variables_client,
-                args={
-                    "message": message,
-                    "code": skills[0].code,
-                    "tidings": serialized_tidings,
-                },
-            )
-            # Parse the output into a dict
-            variable_descriptions = {}
-            for line in variable_descriptions_raw.strip().splitlines():
-                if "#" in line:
-                    var, desc = line.split("#", 1)
-                    variable_descriptions[var.strip()] = desc.strip()
-
-            return skills, invocation_code, variable_descriptions
-        else:
-            return [], None, None
+    def parse_variable_descriptions(self, completion: str) -> dict[str, Any]:
+        """
+        Parses the output of a variables errand (lines of the form "variable # description") into a dict.
+        """
+        variable_descriptions: dict[str, str] = {}
+        for line in completion.strip().splitlines():
+            if "#" in line:
+                var, desc = line.split("#", 1)
+                variable_descriptions[var.strip()] = desc.strip()
+        return {"variable_descriptions": variable_descriptions}
+
+    def run_errand_graph(
+        self, nodes: list[ErrandNode], values: dict[str, Any]
+    ) -> dict[str, Any]:
+        """
+        Runs the errands of the graph, each as soon as all of its inputs are available (errands whose inputs become
+        available at the same time run concurrently), and returns the given values extended by the errand outputs.
+        An errand with an input of None is skipped; its outputs are None.
+        """
+        values = dict(values)
+        pending: list[ErrandNode] = list(nodes)
+        running: dict[Future, ErrandNode] = {}
+        # the pool belongs to this call, so that the errands of other frames (and sessions) never queue behind it
+        with ThreadPoolExecutor(
+            max_workers=self.config.max_concurrent_errands, thread_name_prefix="errand"
+        ) as executor:
+            while pending or running:
+                ready = [
+                    node
+                    for node in pending
+                    if all(name in values for name in node.inputs)
+                ]
+                for node in ready:
+                    pending.remove(node)
+                    if any(values[name] is None for name in node.inputs):
+                        values.update({name: None for name in node.outputs})
+                        continue
+                    args = {name: values[name] for name in node.inputs}
+                    running[executor.submit(self.run_errand_node, node, args)] = node
+                if not running:
+                    if pending and not ready:
+                        raise ValueError(
+                            f"Inputs of errands {[node.designation for node in pending]} are never produced"
+                        )
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    values.update(future.result())
+        return values
+
+    def run_errand_node(self, node: ErrandNode, args: dict[str, str]) -> dict[str, Any]:
+        errand: Errand = self.find_errand_in_profile(node.designation)()
+        client = self.find_client_in_profile(node.designation)
+        completion = errand.run(runner=client, args=args)
+        if node.parse is not None:
+            return node.parse(completion)
+        return {node.outputs[0]: completion}
 
     def process_message_data(self, mid: int, message: str) -> str:
         """
@@ -695,6 +983,10 @@ class FrameV4:
 
         self.compilation_trace.write_separator()
 
+    def make_compilation_cache_key(self, *parts: Any) -> str:
+        serialized = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
     def find_errand_in_profile(self, designation: str) -> type[Errand]:
         if designation in self.errand_profile:
             return self.errand_profile[designation]
@@ -720,7 +1012,7 @@ class FrameV4:
         """
         results = []
         try:
-            tree = ast.parse(code)
+            tree = compile_source(code).tree
         except Exception as e:
             return []
 
@@ -29,6 +29,12 @@ def perform_search(search_phrase: str):
     """
     from tavily import TavilyClient
 
-    client = TavilyClient(api_key="tvly-dev-XXXX")
+    from clients import get_shared_client
+
+    # reuse the client (and its connections) of the server across calls and sessions
+    api_key = "tvly-dev-XXXX"
+    client = get_shared_client(
+        "tavily", "tavily", api_key, lambda: TavilyClient(api_key=api_key)
+    )
     search_response = client.search(search_phrase, include_raw_content=True)
     return search_response["results"]
@@ -14,6 +14,7 @@
 # limitations under the License.
 import os
 import sys
+import threading
 from typing import Callable
 
 
@@ -28,17 +29,20 @@ class Trace:
         self.entries = []
         self.copy_into_stdout = copy_into_stdout
         self.hook = hook
+        # errands may run concurrently; hold the lock to keep a group of entries together
+        self.lock = threading.RLock()
 
         # set self.file to a new file if path is not None or to stdout if it is None
         self.file = open(path, "w") if path is not None else open(os.devnull, "w")
 
     def write(self, entry: str) -> None:
-        self.entries.append(entry)
-        print(entry, file=self.file, flush=True)
-        if self.copy_into_stdout:
-            print(entry, file=sys.stdout, flush=True)
-        if self.hook is not None:
-            self.hook(entry)
+        with self.lock:
+            self.entries.append(entry)
+            print(entry, file=self.file, flush=True)
+            if self.copy_into_stdout:
+                print(entry, file=sys.stdout, flush=True)
+            if self.hook is not None:
+                self.hook(entry)
 
     def close(self) -> None:
         self.file.close()
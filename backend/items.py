@@ -17,11 +17,89 @@ Data persistence utilities for the Universal Deep Research Backend (UDR-B).
 
 This module provides functions for storing and loading research artifacts,
 events, and other data in JSONL format for easy processing and analysis.
+
+Files written by an ArtifactWriter are accompanied by a sidecar index (see
+build_index_path) mapping item types to the byte offsets of their records, which
+lets an ArtifactStore read items of a given type without parsing the whole file.
+
+The raw page contents of the items written by an ArtifactWriter are stored once
+in a compressed, content-addressed blob store shared by the files of a directory
+(see blobs.py); the records only reference them, and load_items, ArtifactStore
+and find_item_by_type resolve the references, so they return the same items as
+for files written without the blob store.
 """
 
 import json
+import logging
 import os
-from typing import Any, Dict, List
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Set
+
+from blobs import BLOB_REFERENCE_KEY, BlobStore, build_blobs_directory
+from blobs import dehydrate_item, rehydrate_item
+from config import get_config
+
+# Get configuration
+config = get_config()
+
+logger = logging.getLogger(__name__)
+
+
+def build_index_path(filepath: str) -> str:
+    return f"{filepath}.idx"
+
+
+_blob_stores: Dict[str, BlobStore] = {}
+_blob_stores_lock = threading.Lock()
+
+
+def get_blob_store(filepath: str) -> BlobStore:
+    """
+    Returns the process-wide blob store of the directory of the specified file,
+    creating it if needed.
+    """
+    directory = build_blobs_directory(filepath)
+    with _blob_stores_lock:
+        if directory not in _blob_stores:
+            _blob_stores[directory] = BlobStore(
+                directory, compression=config.artifacts.blob_compression
+            )
+        return _blob_stores[directory]
+
+
+_TYPE_PREFIX = '{"type": '
+_UNKNOWN_TYPE = object()
+_decoder = json.JSONDecoder()
+
+
+def _peek_item_type(line: str) -> Any:
+    """
+    Reads the type of a record from its prefix, without decoding the record.
+
+    Returns:
+        The type of the record, or _UNKNOWN_TYPE if the record does not start
+        with its type (as the records written by this module do)
+    """
+    if not line.startswith(_TYPE_PREFIX):
+        return _UNKNOWN_TYPE
+    try:
+        item_type, _ = _decoder.raw_decode(line, len(_TYPE_PREFIX))
+    except json.JSONDecodeError:
+        return _UNKNOWN_TYPE
+    if item_type is not None and not isinstance(item_type, str):
+        return _UNKNOWN_TYPE
+    return item_type
+
+
+def parse_record(filepath: str, line: str) -> Dict[str, Any]:
+    """
+    Parses a record of the specified file, resolving its blob references.
+    """
+    item = json.loads(line)
+    if BLOB_REFERENCE_KEY in line:
+        rehydrate_item(item, get_blob_store(filepath))
+    return item
 
 
 def store_items(items: List[Dict[str, Any]], filepath: str) -> None:
@@ -42,6 +120,10 @@ def store_items(items: List[Dict[str, Any]], filepath: str) -> None:
     # Create directory if it doesn't exist
     os.makedirs(os.path.dirname(filepath), exist_ok=True)
 
+    # The file is rewritten; an index of its previous contents would be stale
+    if os.path.exists(build_index_path(filepath)):
+        os.remove(build_index_path(filepath))
+
     with open(filepath, "w", encoding="utf-8") as f:
         for item in items:
             # Convert dictionary to JSON string and write with newline
@@ -64,16 +146,50 @@ def load_items(filepath: str) -> List[Dict[str, Any]]:
         for item in items:
             print(item["type"], item["message"])
     """
+    return list(iter_items(filepath))
+
+
+def iter_items(
+    filepath: str, item_type: str | Callable[[str | None], bool] | None = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily loads the items from a file where each line is a JSON string.
+
+    Only one item is held in memory at a time. With an item_type, only the items
+    of that type (or whose type satisfies the predicate) are yielded, and the
+    records of other types are skipped by their type prefix without decoding.
+
+    Args:
+        filepath: Path to the file containing the items
+        item_type: Type of the items to load, or a predicate on the item type
+
+    Yields:
+        Items loaded from the file, in the order of the file
+
+    Example:
+        for event in iter_items("events.jsonl", lambda t: t.startswith("report_")):
+            print(event["description"])
+    """
     if not os.path.exists(filepath):
-        return []
+        return
+
+    matches: Callable[[str | None], bool] | None = item_type
+    if isinstance(item_type, str):
+
+        def matches(line_type: str | None) -> bool:
+            return line_type == item_type
 
-    items = []
     with open(filepath, "r", encoding="utf-8") as f:
         for line in f:
-            if line.strip():  # Skip empty lines
-                item = json.loads(line)
-                items.append(item)
-    return items
+            if not line.strip():  # Skip empty lines
+                continue
+            if matches is not None:
+                line_type = _peek_item_type(line)
+                if line_type is not _UNKNOWN_TYPE and not matches(line_type):
+                    continue
+            item = parse_record(filepath, line)
+            if matches is None or matches(item.get("type")):
+                yield item
 
 
 def register_item(filepath: str, item: Dict[str, Any]) -> None:
@@ -100,10 +216,435 @@ def register_item(filepath: str, item: Dict[str, Any]) -> None:
         f.write(json_str + "\n")
 
 
+class ArtifactWriter:
+    """
+    Appends items to a JSONL file through a buffered, open file handle.
+
+    Items are serialized when they are registered, but only written once the
+    buffer exceeds max_buffer_bytes or flush_interval seconds have passed since
+    the last write, when flush() is called (e.g. at the end of a phase), and
+    when the writer is closed. With background=True, the buffer is written by a
+    background thread shared by all writers (see _BackgroundFlusher), so that
+    callers on the event loop never wait for disk I/O (except on an explicit
+    flush() or close()).
+
+    A write that fails leaves its items in the buffer, so that they are written
+    by the next attempt. Failed background writes are logged and retried; flush()
+    and close() raise the error if writing still fails.
+
+    Along with the items, the type, byte offset and length of every record are
+    appended to the sidecar index of the file (see ArtifactStore).
+
+    With a blob_store, the raw page contents of the items are written to the
+    blob store (before the records referencing them) instead of the file.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        max_buffer_bytes: int = 262144,
+        flush_interval: float = 1.0,
+        background: bool = False,
+        blob_store: BlobStore | None = None,
+    ) -> None:
+        self.filepath = filepath
+        self.blob_store = blob_store
+        self.max_buffer_bytes = max_buffer_bytes
+        self.flush_interval = flush_interval
+        self.background = background
+
+        self._buffer: List[tuple[str | None, bytes]] = []
+        self._blobs: List[tuple[str, str]] = []
+        self._buffer_size = 0
+        self._last_write = time.monotonic()
+        self._buffer_lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._file = None
+        self._index_file = None
+        self._closed = False
+        # the error of the last background write, if it failed
+        self._error: Exception | None = None
+
+        if background:
+            _background_flusher.add(self)
+
+    def register(self, item: Dict[str, Any]) -> None:
+        """
+        Appends a single item to the file (see register_item).
+        """
+        blobs: List[tuple[str, str]] = []
+        if self.blob_store is not None:
+            item, blobs = dehydrate_item(item)
+        line = (json.dumps(item, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._buffer_lock:
+            self._buffer.append((item.get("type"), line))
+            self._blobs.extend(blobs)
+            self._buffer_size += len(line)
+            due = self._is_due()
+        if self.background and not self._closed:
+            if due:
+                _background_flusher.wake()
+        elif due or self._closed:
+            self._write()
+
+    def flush(self) -> None:
+        """
+        Writes all buffered items to the file.
+        """
+        self._write()
+        self._error = None
+
+    def close(self) -> None:
+        """
+        Writes all buffered items and closes the file.
+        """
+        self._closed = True
+        if self.background:
+            _background_flusher.remove(self)
+        self._write()
+        self._error = None
+
+    def _is_due(self) -> bool:
+        return (
+            self._buffer_size >= self.max_buffer_bytes
+            or time.monotonic() - self._last_write >= self.flush_interval
+        )
+
+    def _write_in_background(self) -> None:
+        with self._buffer_lock:
+            due = self._is_due()
+        if not due:
+            return
+        try:
+            self._write()
+        except Exception as error:
+            # log a run of failures once; the items stay buffered for the next attempt
+            if self._error is None:
+                logger.exception(
+                    "Writing artifacts to %s failed; retrying", self.filepath
+                )
+            self._error = error
+        else:
+            self._error = None
+
+    def _write(self) -> None:
+        with self._file_lock:
+            self._write_buffer()
+
+    def _write_buffer(self) -> None:
+        with self._buffer_lock:
+            lines = self._buffer
+            self._buffer = []
+            blobs = self._blobs
+            self._blobs = []
+            self._buffer_size = 0
+            self._last_write = time.monotonic()
+        try:
+            # the blob store is content-addressed, so blobs written by a failed
+            # attempt are simply written again
+            for digest, text in blobs:
+                self.blob_store.put(text, digest)
+            if lines:
+                self._append(lines)
+        except BaseException:
+            with self._buffer_lock:
+                self._buffer[:0] = lines
+                self._blobs[:0] = blobs
+                self._buffer_size += sum(len(line) for _, line in lines)
+            raise
+        if self._closed and self._file is not None:
+            self._file.close()
+            self._file = None
+            self._index_file.close()
+            self._index_file = None
+
+    def _append(self, lines: List[tuple[str | None, bytes]]) -> None:
+        if self._file is None:
+            # Create directory if it doesn't exist
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+            # the file may have been written by other means (or by an
+            # interrupted process); index its records before appending
+            if os.path.exists(self.filepath) and load_index(self.filepath) is None:
+                repair_artifacts(self.filepath)
+            self._file = open(self.filepath, "ab")
+            self._index_file = open(build_index_path(self.filepath), "ab")
+        offset = start = self._file.tell()
+        index_start = self._index_file.tell()
+        index_entries: List[str] = []
+        for item_type, line in lines:
+            index_entries.append(
+                json.dumps(
+                    {"type": item_type, "offset": offset, "length": len(line)},
+                    ensure_ascii=False,
+                )
+                + "\n"
+            )
+            offset += len(line)
+        try:
+            self._file.write(b"".join(line for _, line in lines))
+            self._file.flush()
+            self._index_file.write("".join(index_entries).encode("utf-8"))
+            self._index_file.flush()
+        except BaseException:
+            # drop what was partially written, so that the retry does not append
+            # after a truncated record; the file is reopened (and repaired, if
+            # truncating fails as well) by the next attempt
+            for f, path, position in (
+                (self._file, self.filepath, start),
+                (self._index_file, build_index_path(self.filepath), index_start),
+            ):
+                try:
+                    f.close()
+                except OSError:
+                    pass
+                try:
+                    os.truncate(path, position)
+                except OSError:
+                    pass
+            self._file = None
+            self._index_file = None
+            raise
+
+
+class _BackgroundFlusher:
+    """
+    Writes the buffers of the background ArtifactWriters from a single thread
+    shared by all of them, as they become due.
+    """
+
+    def __init__(self) -> None:
+        self._writers: Set[ArtifactWriter] = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add(self, writer: ArtifactWriter) -> None:
+        with self._lock:
+            self._writers.add(writer)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="artifact-flusher", daemon=True
+                )
+                self._thread.start()
+
+    def remove(self, writer: ArtifactWriter) -> None:
+        with self._lock:
+            self._writers.discard(writer)
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                interval = min(
+                    (writer.flush_interval for writer in self._writers), default=1.0
+                )
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            with self._lock:
+                writers = list(self._writers)
+            for writer in writers:
+                writer._write_in_background()
+
+
+_background_flusher = _BackgroundFlusher()
+
+
+_artifact_writers: Dict[str, ArtifactWriter] = {}
+_artifact_writers_lock = threading.Lock()
+
+
+def get_artifact_writer(filepath: str) -> ArtifactWriter:
+    """
+    Returns the process-wide writer of the specified file, creating it if needed.
+
+    Args:
+        filepath: Path to the file the writer appends to
+
+    Returns:
+        ArtifactWriter: The writer of the file
+
+    Example:
+        artifacts = get_artifact_writer("instances/key.research_artifacts.jsonl")
+        artifacts.register({"type": "topics", "topics": topics})
+    """
+    with _artifact_writers_lock:
+        if filepath not in _artifact_writers:
+            _artifact_writers[filepath] = ArtifactWriter(
+                filepath,
+                max_buffer_bytes=config.artifacts.buffer_bytes,
+                flush_interval=config.artifacts.flush_interval,
+                background=config.artifacts.background_writes,
+                blob_store=(
+                    get_blob_store(filepath) if config.artifacts.blobs_enabled else None
+                ),
+            )
+        return _artifact_writers[filepath]
+
+
+def close_artifact_writer(filepath: str) -> None:
+    """
+    Closes the process-wide writer of the specified file, if there is one, so
+    that everything registered through it is written to the file.
+    """
+    with _artifact_writers_lock:
+        writer = _artifact_writers.pop(filepath, None)
+    if writer is not None:
+        writer.close()
+
+
+def load_index(filepath: str) -> List[Dict[str, Any]] | None:
+    """
+    Loads the sidecar index of the specified file, or returns None if there is
+    none or it does not cover the whole file.
+    """
+    index_path = build_index_path(filepath)
+    if not os.path.exists(filepath) or not os.path.exists(index_path):
+        return None
+    with open(index_path, "r", encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    covered_size = 0
+    for entry in entries:
+        if entry["offset"] != covered_size:
+            return None
+        covered_size += entry["length"]
+    return entries if covered_size == os.path.getsize(filepath) else None
+
+
+def scan_index(filepath: str) -> List[Dict[str, Any]]:
+    """
+    Builds the index of the specified file (see load_index) by scanning it. The
+    type of a record is read from its prefix where possible.
+    """
+    entries: List[Dict[str, Any]] = []
+    offset = 0
+    with open(filepath, "rb") as f:
+        for line in f:
+            if line.strip():  # Skip empty lines
+                text = line.decode("utf-8")
+                item_type = _peek_item_type(text)
+                if item_type is _UNKNOWN_TYPE:
+                    item_type = json.loads(text).get("type")
+                entries.append(
+                    {"type": item_type, "offset": offset, "length": len(line)}
+                )
+            offset += len(line)
+    return entries
+
+
+def repair_artifacts(filepath: str) -> None:
+    """
+    Prepares a file written by an interrupted process for appending: drops its
+    last record if it was only partially written, and rebuilds its sidecar index
+    if the index does not cover the whole file.
+    """
+    if not os.path.exists(filepath):
+        return
+
+    with open(filepath, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            chunk_start = max(0, position - 65536)
+            f.seek(chunk_start)
+            chunk = f.read(position - chunk_start)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                position = chunk_start + newline + 1
+                break
+            position = chunk_start
+        if position != end:
+            f.truncate(position)
+
+    if load_index(filepath) is None:
+        entries = scan_index(filepath)
+        with open(build_index_path(filepath), "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def flush_artifact_writer(filepath: str) -> None:
+    """
+    Writes out the items buffered by the process-wide writer of the specified
+    file, if there is one, so that readers of the file see all of them.
+    """
+    with _artifact_writers_lock:
+        writer = _artifact_writers.get(filepath)
+    if writer is not None:
+        writer.flush()
+
+
+class ArtifactStore:
+    """
+    Read access by type to the items of a JSONL file that is queried many times
+    (e.g. the research artifacts of a session during reporting).
+
+    The index mapping item types to the byte offsets of their records is loaded
+    once, from the sidecar index written by ArtifactWriter, or by scanning the
+    file if the sidecar is missing or does not cover the whole file (or passed in,
+    if the caller has already loaded it). Items are then read by seeking
+    directly to their records, and cached once parsed.
+    """
+
+    def __init__(
+        self, filepath: str, index: List[Dict[str, Any]] | None = None
+    ) -> None:
+        self.filepath = filepath
+        self._offsets: Dict[str | None, List[tuple[int, int]]] = {}
+        self._items: Dict[int, Dict[str, Any]] = {}
+        if index is None and os.path.exists(filepath):
+            index = self._load_index()
+        for entry in index or []:
+            self._offsets.setdefault(entry["type"], []).append(
+                (entry["offset"], entry["length"])
+            )
+
+    def _load_index(self) -> List[Dict[str, Any]]:
+        entries = load_index(self.filepath)
+        return entries if entries is not None else scan_index(self.filepath)
+
+    def _read(self, offset: int, length: int) -> Dict[str, Any]:
+        if offset not in self._items:
+            with open(self.filepath, "rb") as f:
+                f.seek(offset)
+                self._items[offset] = parse_record(
+                    self.filepath, f.read(length).decode("utf-8")
+                )
+        return self._items[offset]
+
+    def types(self) -> List[str | None]:
+        """
+        Returns the types of the items in the file, in order of first occurrence.
+        """
+        return list(self._offsets)
+
+    def find(self, item_type: str) -> Dict[str, Any] | None:
+        """
+        Returns the first item of the given type, or None if there is none.
+        """
+        offsets = self._offsets.get(item_type)
+        return self._read(*offsets[0]) if offsets else None
+
+    def find_all(self, item_type: str) -> List[Dict[str, Any]]:
+        """
+        Returns all items of the given type, in the order of the file.
+        """
+        return [
+            self._read(offset, length)
+            for offset, length in self._offsets.get(item_type, [])
+        ]
+
+
 def find_item_by_type(filepath: str, item_type: str) -> Dict[str, Any]:
     """
     Finds an item by its type in the specified file.
 
+    The record is looked up through the sidecar index of the file if it is up to
+    date, and by streaming the file up to the first record of the type otherwise.
+    For repeated lookups in the same file, use an ArtifactStore directly so that
+    its index is loaded only once.
+
     Args:
         filepath: Path to the file containing the items
         item_type: Type of the item to find
@@ -111,5 +652,7 @@ def find_item_by_type(filepath: str, item_type: str) -> Dict[str, Any]:
     Returns:
         Item found in the file
     """
-    items = load_items(filepath)
-    return next((item for item in items if item["type"] == item_type), None)
+    index = load_index(filepath)
+    if index is not None:
+        return ArtifactStore(filepath, index=index).find(item_type)
+    return next(iter_items(filepath, item_type), None)
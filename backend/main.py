@@ -20,26 +20,33 @@ offering intelligent research and reporting capabilities through streaming APIs.
 """
 
 import asyncio
+import hashlib
 import json
 import os
 import random
+import traceback
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Any, AsyncGenerator, Dict, Optional
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional
 
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from uvicorn.config import LOGGING_CONFIG
 
 import items
+from cache import get_cache_stats, get_completion_cache, get_routine_cache
+from clients import close_shared_clients, get_shared_http_client
 
 # Import configuration
 from config import get_config
+from event_bus import get_event_bus, replay_events, start_session_run
 from frame.clients import Client, HuggingFaceClient, OpenAIClient
 from frame.harness4 import FrameConfigV4, FrameV4
 from frame.trace import Trace
+from scan_research import build_reporting_artifacts_path, build_research_artifacts_path
 from scan_research import do_reporting as real_reporting
 from scan_research import do_research as real_research
 from scan_research import generate_session_key
@@ -49,10 +56,19 @@ from scan_research_dry import do_research as dry_research
 # Get configuration
 config = get_config()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    yield
+    # close the connection pools shared by the sessions
+    await close_shared_clients()
+
+
 app = FastAPI(
     title="Universal Deep Research Backend API",
     description="Intelligent research and reporting service using LLMs and web search",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure logging
@@ -91,6 +107,14 @@ async def root():
     }
 
 
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """
+    Returns hit/miss counters and sizes of the persistent caches of this worker.
+    """
+    return {"caches": get_cache_stats()}
+
+
 def build_events_path(session_key: str) -> str:
     return f"instances/{session_key}.events.jsonl"
 
@@ -104,11 +128,139 @@ def make_message(
         event = {**event, "timestamp": datetime.now().isoformat()}
 
     if session_key:
-        items.register_item(build_events_path(session_key), event)
+        items.get_artifact_writer(build_events_path(session_key)).register(event)
 
     return json.dumps({"event": event, "session_key": session_key}) + "\n"
 
 
+def close_session_writers(session_key: str) -> None:
+    """
+    Writes out the buffered events and artifacts of the session.
+    """
+    for path in [
+        build_events_path(session_key),
+        build_research_artifacts_path(session_key),
+        build_reporting_artifacts_path(session_key),
+    ]:
+        items.close_artifact_writer(path)
+
+
+def make_event_stream_response(
+    messages: AsyncGenerator[str, None],
+) -> StreamingResponse:
+    return StreamingResponse(
+        messages,
+        media_type="application/x-ndjson",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "Content-Encoding": "none",
+        },
+    )
+
+
+def stream_session_run(
+    session_key: str, messages: AsyncGenerator[str, None]
+) -> StreamingResponse:
+    """
+    Starts the run of a session in the background and streams its events.
+
+    The run is not tied to the response: if the client disconnects, the run
+    continues, and its events can be followed again (from any event) through
+    GET /api/sessions/{session_key}/events.
+
+    Args:
+        session_key: Session identifier
+        messages: Generator running the session and yielding its event messages
+
+    Returns:
+        StreamingResponse: The events of the run, as JSON lines
+
+    Raises:
+        HTTPException: 409 if the session already has a run in progress
+    """
+    try:
+        bus = start_session_run(
+            session_key,
+            build_events_path(session_key),
+            report_run_failure(messages, session_key),
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return make_event_stream_response(bus.subscribe(bus.start_index))
+
+
+async def report_run_failure(
+    messages: AsyncGenerator[str, None], session_key: str
+) -> AsyncGenerator[str, None]:
+    """
+    Passes the event messages of a session run through, ending the run with an
+    error event if it fails, so that its subscribers learn about the failure.
+    """
+    try:
+        async for message in messages:
+            yield message
+    except Exception as e:
+        traceback.print_exc()
+        yield make_message(
+            {"type": "error", "description": f"The research failed: {e}"},
+            session_key,
+        )
+        close_session_writers(session_key)
+
+
+@app.get("/api/sessions/{session_key}/events")
+async def stream_session_events(
+    session_key: str, from_index: int = Query(0, alias="from", ge=0)
+):
+    """
+    Stream the events of a session, starting from the given event.
+
+    The events already recorded for the session are replayed from its events
+    file; if the session has a run in progress, its live events follow until
+    the run finishes. Reconnecting clients pass the number of events they have
+    already received as `from`.
+
+    Args:
+        session_key (str): Session identifier
+        from_index (int): Index of the first event to stream (query parameter
+            `from`, default: 0)
+
+    Returns:
+        StreamingResponse: The events of the session, as JSON lines
+
+    Raises:
+        HTTPException: 404 if the session is unknown
+
+    Example:
+        ```bash
+        curl "http://localhost:8000/api/sessions/20241201T120000Z-abc12345/events?from=42"
+        ```
+    """
+    bus = get_event_bus(session_key)
+    if bus is not None:
+        return make_event_stream_response(bus.subscribe(from_index))
+
+    events_path: str = build_events_path(session_key)
+    if not os.path.exists(events_path):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return make_event_stream_response(
+        replay_events(session_key, events_path, from_index)
+    )
+
+
+async def iterate_in_thread(
+    generator: Generator[Any, None, None],
+) -> AsyncGenerator[Any, None]:
+    """
+    Iterates a blocking generator in worker threads so that the event loop (and
+    with it every other stream served by this worker) stays responsive.
+    """
+    exhausted = object()
+    while (item := await asyncio.to_thread(next, generator, exhausted)) is not exhausted:
+        yield item
+
+
 @app.post("/api/research")
 async def start_research(request: ResearchRequest):
     """
@@ -126,7 +278,8 @@ async def start_research(request: ResearchRequest):
         request (ResearchRequest): The research request containing:
             - dry (bool): Use mock data for testing (default: False)
             - session_key (str, optional): Existing session to continue
-            - start_from (str): "research" or "reporting" phase
+            - start_from (str): "research" or "reporting" phase, or "resume" to
+              resume an interrupted research phase from its artifacts
             - prompt (str): Research query (required for research phase)
             - mock_directory (str): Directory for mock data
     
@@ -147,10 +300,10 @@ async def start_research(request: ResearchRequest):
         ```
     """
     # Validate request parameters
-    if request.start_from not in ["research", "reporting"]:
+    if request.start_from not in ["research", "reporting", "resume"]:
         raise HTTPException(
             status_code=400,
-            detail="start_from must be either 'research' or 'reporting'",
+            detail="start_from must be either 'research', 'reporting' or 'resume'",
         )
 
     if request.start_from == "reporting" and not request.session_key:
@@ -159,6 +312,12 @@ async def start_research(request: ResearchRequest):
             detail="session_key is required when starting from reporting phase",
         )
 
+    if request.start_from == "resume" and not request.session_key:
+        raise HTTPException(
+            status_code=400,
+            detail="session_key is required when resuming a research",
+        )
+
     if request.start_from == "research" and not request.prompt:
         raise HTTPException(
             status_code=400,
@@ -170,7 +329,11 @@ async def start_research(request: ResearchRequest):
 
     # Choose implementation
     research_impl = (
-        (lambda session_key, prompt: dry_research(session_key, prompt, mock_dir))
+        (
+            lambda session_key, prompt, resume=False: dry_research(
+                session_key, prompt, mock_dir
+            )
+        )
         if request.dry
         else real_research
     )
@@ -185,22 +348,19 @@ async def start_research(request: ResearchRequest):
 
     # Prepare generators
     research_gen = (
-        research_impl(session_key, request.prompt)
-        if request.start_from == "research"
+        research_impl(
+            session_key, request.prompt, resume=request.start_from == "resume"
+        )
+        if request.start_from != "reporting"
         else None
     )
     reporting_gen = reporting_impl(session_key)
 
-    return StreamingResponse(
+    return stream_session_run(
+        session_key,
         stream_research_events(
-            research_gen, reporting_gen, request.start_from == "research", session_key
+            research_gen, reporting_gen, request.start_from != "reporting", session_key
         ),
-        media_type="application/x-ndjson",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Content-Encoding": "none",
-        },
     )
 
 
@@ -260,6 +420,8 @@ async def stream_research_events(
             session_key,
         )
         raise
+    finally:
+        close_session_writers(session_key)
 
 
 @app.post("/api/research2")
@@ -328,34 +490,126 @@ async def start_research2(request: ResearchRequest):
         )
         reporting_gen = reporting_impl(session_key)
 
-        return StreamingResponse(
+        return stream_session_run(
+            session_key,
             stream_research_events(
                 research_gen,
                 reporting_gen,
                 request.start_from == "research",
                 session_key,
             ),
-            media_type="application/x-ndjson",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "Content-Encoding": "none",
-            },
         )
 
-    return StreamingResponse(
+    return stream_session_run(
+        session_key,
         stream_research2_events(
             session_key, request.prompt, request.strategy_id, request.strategy_content
         ),
-        media_type="application/x-ndjson",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Content-Encoding": "none",
-        },
     )
 
 
+RESEARCH2_PREAMBLE_FILES: List[str] = [
+    "frame/prompts/udr_minimal_generating/0.code_skill.py",
+]
+
+_frame_templates: Dict[str, FrameV4] = {}
+_frame_template_lock = asyncio.Lock()
+
+
+def make_research2_client(trace: Trace) -> Client:
+    return OpenAIClient(
+        base_url="https://integrate.api.nvidia.com/v1",
+        model="nvdev/meta/llama-3.1-70b-instruct",
+        trace=trace,
+        http_client=get_shared_http_client(),
+        cache=get_completion_cache(),
+    )
+
+
+def make_research2_frame_config() -> FrameConfigV4:
+    return FrameConfigV4(
+        long_context_cutoff=config.frame.long_context_cutoff,
+        force_long_context=config.frame.force_long_context,
+        max_iterations=config.frame.max_iterations,
+        interaction_level=config.frame.interaction_level,
+        max_concurrent_errands=config.frame.max_concurrent_errands,
+    )
+
+
+def load_preamble_messages(preamble_files: List[str]) -> List[Dict[str, Any]]:
+    """
+    Reads the preamble files of a strategy into FrameV4 messages; the message type
+    is given by the file name (e.g. 0.code_skill.py is a code_skill message).
+    The code_skill preamble files are valid Python already, so they are
+    registered verbatim rather than processed by the language model.
+    """
+    messages: List[Dict[str, Any]] = []
+    for path in preamble_files:
+        type = path.split(".")[-2]
+        if type == "code_skill":
+            type = "code_skill_verbatim"
+        with open(path, "r") as f:
+            messages.append(
+                {
+                    "mid": len(messages),
+                    "role": "user",
+                    "content": f.read(),
+                    "type": type,
+                }
+            )
+    return messages
+
+
+async def get_frame_template(preamble_messages: List[Dict[str, Any]]) -> FrameV4:
+    """
+    Returns a FrameV4 that has processed the given preamble messages, for the
+    research2 runs to fork (see FrameV4.fork) instead of creating a new frame and
+    processing the preamble again.
+
+    The template of a preamble is built by the first run that needs it and kept
+    for the lifetime of the process; a changed preamble gets a new template.
+
+    Args:
+        preamble_messages: The preamble messages (see load_preamble_messages)
+
+    Returns:
+        FrameV4: The template frame
+    """
+    key: str = hashlib.sha256(
+        json.dumps(preamble_messages, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    async with _frame_template_lock:
+        if key not in _frame_templates:
+            timestamp: str = datetime.now().strftime("%Y%m%d_%H-%M-%S")
+            trace = Trace(
+                f"{config.logging.log_dir}/comms_template_{timestamp}.log",
+                copy_into_stdout=config.logging.copy_into_stdout,
+            )
+            template = FrameV4(
+                client_profile=make_research2_client(trace),
+                config=make_research2_frame_config(),
+                errand_profile={},
+                compilation_trace=True,
+                execution_trace="file_and_stdout",
+                compilation_cache=get_routine_cache(),
+            )
+
+            def process_preamble() -> None:
+                for message in preamble_messages:
+                    for _ in template.process_message(
+                        mid=message["mid"],
+                        message=message["content"],
+                        message_type=message["type"],
+                        generate_not_return=True,
+                    ):
+                        pass
+
+            # FrameV4 calls the language model synchronously; run it off the event loop
+            await asyncio.to_thread(process_preamble)
+            _frame_templates[key] = template
+        return _frame_templates[key]
+
+
 async def stream_research2_events(
     session_key: str, prompt: str, strategy_id: str, strategy_content: str
 ) -> AsyncGenerator[str, None]:
@@ -380,40 +634,31 @@ async def stream_research2_events(
             comm_trace_filename, copy_into_stdout=config.logging.copy_into_stdout
         )
 
-        client: Client = OpenAIClient(
-            base_url="https://integrate.api.nvidia.com/v1",
-            model="nvdev/meta/llama-3.1-70b-instruct",
-            trace=comm_trace,
-        )
-
-        frame_config = FrameConfigV4(
-            long_context_cutoff=config.frame.long_context_cutoff,
-            force_long_context=config.frame.force_long_context,
-            max_iterations=config.frame.max_iterations,
-            interaction_level=config.frame.interaction_level,
-        )
-        harness = FrameV4(
-            client_profile=client,
-            errand_profile={},
-            compilation_trace=True,
-            execution_trace="file_and_stdout",
-        )
-
-        messages = []
-        preamble_files = [
-            "frame/prompts/udr_minimal_generating/0.code_skill.py",
-        ]
-        for path in preamble_files:
-            type = path.split(".")[-2]
-            with open(path, "r") as f:
-                messages.append(
-                    {
-                        "mid": len(messages),
-                        "role": "user",
-                        "content": f.read(),
-                        "type": type,
-                    }
-                )
+        client: Client = make_research2_client(comm_trace)
+
+        frame_config = make_research2_frame_config()
+        messages = load_preamble_messages(RESEARCH2_PREAMBLE_FILES)
+        if config.frame.templates_enabled:
+            # Start from a frame that has already processed the preamble
+            template: FrameV4 = await get_frame_template(messages)
+            harness = template.fork(
+                client_profile=client,
+                config=frame_config,
+                compilation_trace=True,
+                execution_trace="file_and_stdout",
+                compilation_cache=get_routine_cache(),
+            )
+            processed: int = len(messages)
+        else:
+            harness = FrameV4(
+                client_profile=client,
+                config=frame_config,
+                errand_profile={},
+                compilation_trace=True,
+                execution_trace="file_and_stdout",
+                compilation_cache=get_routine_cache(),
+            )
+            processed = 0
 
         messages.append(
             {
@@ -446,9 +691,15 @@ async def stream_research2_events(
                 },
                 session_key,
             )
-            for notification in harness.generate_with_notifications(
-                messages=messages_so_far,
-                frame_config=frame_config,
+            if i < processed:
+                # already processed by the template frame; only report the progress
+                continue
+            # FrameV4 calls the language model synchronously; run it off the event loop
+            async for notification in iterate_in_thread(
+                harness.generate_with_notifications(
+                    messages=messages_so_far,
+                    frame_config=frame_config,
+                )
             ):
                 yield make_message(notification, session_key)
 
@@ -469,3 +720,5 @@ async def stream_research2_events(
             session_key,
         )
         raise
+    finally:
+        close_session_writers(session_key)
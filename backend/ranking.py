@@ -0,0 +1,105 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Lexical ranking utilities for the Universal Deep Research Backend (UDR-B).
+
+This module scores paragraphs against a query with Okapi BM25, so that
+obviously irrelevant text (navigation, footers, etc.) can be dropped locally
+before paragraphs are sent to a language model.
+"""
+
+import re
+from collections import Counter
+from typing import List
+
+import numpy as np
+
+_TERM_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits the text into lower-cased word terms.
+    """
+    return _TERM_PATTERN.findall(text.lower())
+
+
+def bm25_scores(
+    paragraphs: List[str], query: str, k1: float = 1.5, b: float = 0.75
+) -> np.ndarray:
+    """
+    Scores each paragraph against the query with Okapi BM25.
+
+    The paragraphs form the document collection, i.e. the inverse document
+    frequencies are computed over the given paragraphs.
+
+    Args:
+        paragraphs: The paragraphs to score
+        query: The query to score the paragraphs against
+        k1: Term frequency saturation parameter
+        b: Length normalization parameter
+
+    Returns:
+        np.ndarray: One score per paragraph
+
+    Example:
+        bm25_scores(["Gold prices rose.", "Cookie settings"], "gold prices 1970")
+    """
+    query_terms: List[str] = sorted(set(tokenize(query)))
+    if not paragraphs or not query_terms:
+        return np.zeros(len(paragraphs))
+
+    term_ids = {term: i for i, term in enumerate(query_terms)}
+    term_frequencies = np.zeros((len(paragraphs), len(query_terms)))
+    lengths = np.zeros(len(paragraphs))
+    for row, paragraph in enumerate(paragraphs):
+        terms = tokenize(paragraph)
+        lengths[row] = len(terms)
+        for term, count in Counter(terms).items():
+            if term in term_ids:
+                term_frequencies[row, term_ids[term]] = count
+
+    document_frequencies = np.count_nonzero(term_frequencies, axis=0)
+    idf = np.log(
+        1.0
+        + (len(paragraphs) - document_frequencies + 0.5)
+        / (document_frequencies + 0.5)
+    )
+    average_length = max(lengths.mean(), 1.0)
+    normalization = k1 * (1.0 - b + b * lengths / average_length)
+    saturated = (
+        term_frequencies * (k1 + 1.0) / (term_frequencies + normalization[:, None])
+    )
+    return saturated @ idf
+
+
+def select_top_paragraphs(paragraphs: List[str], query: str, top_k: int) -> List[str]:
+    """
+    Keeps the top_k paragraphs best matching the query, in their original order.
+
+    Args:
+        paragraphs: The paragraphs to select from
+        query: The query to rank the paragraphs by
+        top_k: The number of paragraphs to keep
+
+    Returns:
+        List[str]: The selected paragraphs
+    """
+    if len(paragraphs) <= top_k:
+        return paragraphs
+    scores = bm25_scores(paragraphs, query)
+    # stable sort keeps earlier paragraphs first among equally scored ones
+    selected = np.sort(np.argsort(-scores, kind="stable")[:top_k])
+    return [paragraphs[i] for i in selected]
@@ -0,0 +1,271 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Report format validation utilities for the Universal Deep Research Backend (UDR-B).
+
+This module checks a Markdown report draft locally for the problems the
+formatting pass is meant to correct (a code fence wrapping the whole report,
+unsupported ==== rules, broken heading structure, malformed or out-of-range
+[[index]] citations, unclosed code fences), fixes the ones that can be fixed
+mechanically, and splits the report into sections, so that only the sections
+with remaining problems have to be reformatted by a language model.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Set, Tuple
+
+CITATION_PATTERN = re.compile(r"\[\[\s*(\d+(?:\s*,\s*\d+)*)\s*\]\]")
+_FENCE_PATTERN = re.compile(r"^\s*(```|~~~)")
+_WRAPPING_FENCE_PATTERN = re.compile(r"^\s*```[\w-]*\s*\n(.*)\n\s*```\s*$", re.DOTALL)
+_DOUBLE_RULE_PATTERN = re.compile(r"^\s*={3,}\s*$")
+_HEADING_PATTERN = re.compile(r"^(#{1,6})(?:\s+(.*?))?(?:\s+#+)?\s*$")
+# hashes directly followed by text: "#Heading", but also "#hashtag" or "#1 priority"
+_SUSPECT_HEADING_PATTERN = re.compile(r"^#{1,6}[^#\s]")
+_CITATION = r"\[\[\s*\d+(?:\s*,\s*\d+)*\s*\]\]"
+# adjacent citations, e.g. "[[0]] and [[3]]" or "[[0]], [[3]]"
+_CITATION_RUN_PATTERN = re.compile(
+    rf"[ \t]*{_CITATION}(?:\s*(?:,|;|&|\band\b|\bor\b)?\s*{_CITATION})*"
+)
+
+
+@dataclass
+class FormatIssue:
+    """A formatting problem found in a report."""
+
+    kind: str
+    description: str
+    line: int
+    fixable: bool
+
+
+def extract_citations(text: str) -> Set[int]:
+    """
+    Returns the source indices cited in the text in the form [[index]] or
+    [[index1,index2,...]].
+    """
+    return {
+        int(index)
+        for match in CITATION_PATTERN.finditer(text)
+        for index in match.group(1).split(",")
+    }
+
+
+def citations_preserved(original: str, reformatted: str) -> bool:
+    """
+    Returns whether the reformatted text still cites every source the original
+    text cites.
+    """
+    return extract_citations(original) <= extract_citations(reformatted)
+
+
+def _check_report(report: str, source_count: int) -> Tuple[str, List[FormatIssue]]:
+    issues: List[FormatIssue] = []
+
+    wrapping_fence = _WRAPPING_FENCE_PATTERN.match(report)
+    if wrapping_fence is not None:
+        issues.append(
+            FormatIssue("code_fence", "The report is wrapped in a code fence.", 1, True)
+        )
+        report = wrapping_fence.group(1)
+
+    if not report.strip():
+        issues.append(FormatIssue("empty", "The report is empty.", 1, False))
+        return report, issues
+
+    def fix_citation_run(match: re.Match) -> str:
+        # a run of adjacent citations is replaced as a whole, so that removing a
+        # citation of unknown sources does not leave its separator behind
+        indices: List[int] = [
+            int(index)
+            for citation in CITATION_PATTERN.finditer(match.group(0))
+            for index in citation.group(1).split(",")
+        ]
+        known_indices: List[int] = [
+            index for index in dict.fromkeys(indices) if index < source_count
+        ]
+        if len(known_indices) == len(indices):
+            return match.group(0)
+        if not known_indices:
+            return ""
+        run: str = match.group(0)
+        leading_whitespace: str = run[: len(run) - len(run.lstrip())]
+        return f"{leading_whitespace}[[{','.join(map(str, known_indices))}]]"
+
+    lines: List[str] = []
+    in_fence = False
+    fence_line = 0
+    previous_level = 0
+    for number, line in enumerate(report.split("\n"), start=1):
+        if _FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+            fence_line = number
+            lines.append(line)
+            continue
+        if in_fence:
+            lines.append(line)
+            continue
+
+        if _DOUBLE_RULE_PATTERN.match(line):
+            issues.append(
+                FormatIssue(
+                    "double_rule", "==== rules are not supported.", number, True
+                )
+            )
+            previous_line: str = lines[-1] if lines else ""
+            if previous_line.strip() and not _HEADING_PATTERN.match(previous_line):
+                # the rule underlines a (setext) title; keep it as a heading
+                lines[-1] = f"# {previous_line.strip()}"
+                previous_level = 1
+                continue
+            line = "---"
+
+        if _SUSPECT_HEADING_PATTERN.match(line):
+            # not rewritten: the line may be a heading without a space after the
+            # hashes, or text that starts with a hash
+            issues.append(
+                FormatIssue(
+                    "suspect_heading",
+                    "A line starts with '#' directly followed by text; it is not "
+                    "a heading unless a space follows the '#'.",
+                    number,
+                    False,
+                )
+            )
+
+        heading = _HEADING_PATTERN.match(line)
+        if heading is not None:
+            level, title = len(heading.group(1)), heading.group(2)
+            if not title:
+                issues.append(
+                    FormatIssue("heading", "The heading is empty.", number, True)
+                )
+                continue
+            if previous_level and level > previous_level + 1:
+                issues.append(
+                    FormatIssue(
+                        "heading",
+                        f"The heading skips from level {previous_level} to {level}.",
+                        number,
+                        True,
+                    )
+                )
+                level = previous_level + 1
+            previous_level = level
+            line = f"{'#' * level} {title}"
+
+        for match in CITATION_PATTERN.finditer(line):
+            out_of_range = [
+                index
+                for index in match.group(1).split(",")
+                if int(index) >= source_count
+            ]
+            if out_of_range:
+                issues.append(
+                    FormatIssue(
+                        "citation",
+                        f"Citation {match.group(0)} refers to unknown sources.",
+                        number,
+                        True,
+                    )
+                )
+        uncited_line: str = CITATION_PATTERN.sub("", line)
+        if "[[" in uncited_line or "]]" in uncited_line:
+            issues.append(
+                FormatIssue(
+                    "citation",
+                    "A citation is not of the form [[index]].",
+                    number,
+                    False,
+                )
+            )
+        fixed_line: str = _CITATION_RUN_PATTERN.sub(fix_citation_run, line)
+        if fixed_line != line:
+            fixed_line = re.sub(r"(?<=\S) {2,}(?=\S)", " ", fixed_line).rstrip()
+            if not line[:1].isspace():
+                fixed_line = fixed_line.lstrip()
+        lines.append(fixed_line)
+
+    if in_fence:
+        issues.append(
+            FormatIssue(
+                "unclosed_fence", "A code fence is not closed.", fence_line, False
+            )
+        )
+    return "\n".join(lines), issues
+
+
+def validate_report(report: str, source_count: int) -> List[FormatIssue]:
+    """
+    Checks the report for formatting problems.
+
+    Args:
+        report: The Markdown report to check
+        source_count: The number of sources the report may cite ([[0]] to
+                      [[source_count - 1]])
+
+    Returns:
+        List[FormatIssue]: The problems found, in the order of the report
+
+    Example:
+        issues = validate_report("```\\n# Report [[3]]\\n```", source_count=2)
+    """
+    return _check_report(report, source_count)[1]
+
+
+def fix_report(report: str, source_count: int) -> str:
+    """
+    Fixes the problems of the report that can be fixed locally: unwraps a code
+    fence wrapping the whole report, replaces ==== rules, re-levels headings,
+    drops empty headings and drops citations of unknown sources (along with the
+    separator joining them to an adjacent citation). Lines that only look like
+    headings ("#hashtag") are reported by validate_report but kept as they are.
+    """
+    return _check_report(report, source_count)[0]
+
+
+def needs_reformat(issues: List[FormatIssue]) -> bool:
+    return any(not issue.fixable for issue in issues)
+
+
+def split_sections(report: str) -> List[str]:
+    """
+    Splits the report before each heading of its highest heading level (outside
+    of code fences), or of the next level if the highest level is only used by
+    the title. Text before the first such heading forms its own section.
+    """
+    lines: List[str] = report.split("\n")
+    heading_levels: List[int | None] = []
+    in_fence = False
+    for line in lines:
+        if _FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        heading = None if in_fence else _HEADING_PATTERN.match(line)
+        heading_levels.append(len(heading.group(1)) if heading else None)
+
+    levels: List[int] = sorted({level for level in heading_levels if level})
+    top_level: int | None = levels[0] if levels else None
+    if heading_levels.count(top_level) == 1 and len(levels) > 1:
+        top_level = levels[1]
+    sections: List[List[str]] = [[]]
+    for line, level in zip(lines, heading_levels):
+        if level is not None and level == top_level and sections[-1]:
+            sections.append([])
+        sections[-1].append(line)
+    return ["\n".join(section) for section in sections]
+
+
+def join_sections(sections: List[str]) -> str:
+    return "\n".join(sections)
@@ -23,21 +23,47 @@ This module provides the main research functionality including:
 """
 
 import asyncio
+import hashlib
 import random
-from typing import Any, AsyncGenerator, Dict, List
+import re
+import time
+from dataclasses import asdict
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 from tavily import TavilyClient
 
 import items
+from cache import (
+    SearchCache,
+    SqliteCache,
+    get_search_cache,
+    get_segments_cache,
+    make_cache_key,
+)
+from checkpoints import ResearchCheckpoint
+from chunking import split_into_windows, split_paragraphs
 from clients import (
-    create_lm_client,
-    create_tavily_client,
-    get_completion,
+    DEFAULT_MODEL,
+    get_async_lm_client,
+    get_completion_async,
+    get_tavily_client,
     is_output_positive,
 )
 from config import get_config
+from dedup import NearDuplicateIndex, hamming_distance, simhash
+from ranking import select_top_paragraphs
+from report_format import (
+    FormatIssue,
+    citations_preserved,
+    fix_report,
+    join_sections,
+    needs_reformat,
+    split_sections,
+    validate_report,
+)
 from sessions import generate_session_key
+from sources import SourceRegistry
 
 # Get configuration
 config = get_config()
@@ -45,6 +71,22 @@ config = get_config()
 # Use configuration values
 MAX_TOPICS: int = config.research.max_topics
 MAX_SEARCH_PHRASES: int = config.research.max_search_phrases
+EXTRACTION_WINDOW_TOKENS: int = config.research.extraction_window_tokens
+MAX_DOCUMENT_TOKENS: int = config.research.max_document_tokens
+PREFILTER_TOP_K: int = config.research.prefilter_top_k
+DEDUP_ENABLED: bool = config.research.dedup_enabled
+DEDUP_MAX_DISTANCE: int = config.research.dedup_max_distance
+MAX_CONCURRENT_TOPICS: int = config.research.max_concurrent_topics
+MAX_CONCURRENT_SEARCHES: int = config.research.max_concurrent_searches
+MAX_CONCURRENT_EXTRACTIONS: int = config.research.max_concurrent_extractions
+REPORT_MODE: str = config.reporting.report_mode
+SECTION_MAX_TOKENS: int = config.reporting.section_max_tokens
+TOPIC_MAX_TOKENS: int = config.reporting.topic_max_tokens
+MAX_CONCURRENT_SECTIONS: int = config.reporting.max_concurrent_sections
+FORMAT_PASS: str = config.reporting.format_pass
+STREAM_REPORT: bool = config.reporting.stream_report
+REPORT_DELTA_INTERVAL: float = config.reporting.report_delta_interval
+REPORT_DELTA_MAX_CHARS: int = config.reporting.report_delta_max_chars
 
 
 def build_research_artifacts_path(session_key: str) -> str:
@@ -55,6 +97,26 @@ def build_reporting_artifacts_path(session_key: str) -> str:
     return f"instances/{session_key}.reporting_artifacts.jsonl"
 
 
+_SEGMENT_PATTERN = re.compile(r"\[\[([\d,\s]+)\]\] (.*)", re.DOTALL)
+
+
+def format_segment(search_result_url_indices: List[int], segment: str) -> str:
+    """
+    Prefixes the segment with the [[index]] citation of its source(s).
+    """
+    return f"[[{','.join(map(str, search_result_url_indices))}]] {segment}"
+
+
+def parse_segment(labeled_segment: str) -> tuple[List[int], str]:
+    """
+    Splits a segment labeled by format_segment into its source indices and text.
+    """
+    match = _SEGMENT_PATTERN.fullmatch(labeled_segment)
+    if match is None:
+        return [], labeled_segment
+    return [int(index) for index in match.group(1).split(",")], match.group(2)
+
+
 def make_event(
     type: str,
     description: str,
@@ -62,6 +124,10 @@ def make_event(
     deltaSearchCount: int = 0,
     deltaQueryCount: int = 0,
     report: str | None = None,
+    topicId: int | None = None,
+    searchPhraseId: int | None = None,
+    stage: str | None = None,
+    delta: str | None = None,
 ) -> Dict[str, Any]:
     return {
         "type": type,
@@ -70,11 +136,15 @@ def make_event(
         "deltaSearchCount": deltaSearchCount,
         "deltaQueryCount": deltaQueryCount,
         **({"report": report} if report is not None else {}),
+        **({"topicId": topicId} if topicId is not None else {}),
+        **({"searchPhraseId": searchPhraseId} if searchPhraseId is not None else {}),
+        **({"stage": stage} if stage is not None else {}),
+        **({"delta": delta} if delta is not None else {}),
     }
 
 
 async def do_research(
-    session_key: str, prompt: str
+    session_key: str, prompt: str | None, resume: bool = False
 ) -> AsyncGenerator[Dict[str, Any], None]:
     """
     Performs research based on the provided query and yields events as they occur.
@@ -93,12 +163,17 @@ async def do_research(
     - topic_exploration_started: Starting research on each topic
     - search_started: Initiating a search for each search phrase
     - search_result_processing_started: Processing the search results
+    - search_result_processing_completed: Processing of a single search result finished
     - aggregation_started: Beginning the aggregation of relevant segments
     - research_completed: Completion of the research phase
 
     Args:
         session_key (str): A unique identifier for the research session.
         prompt (str): The research query to process.
+        resume (bool): Whether to resume an interrupted research session. The
+            steps recorded in the research artifacts of the session (including
+            its prompt, which takes precedence over the given one) are reused
+            instead of being performed again.
 
     Yields:
         Dict containing:
@@ -108,24 +183,60 @@ async def do_research(
         - deltaSearchCount (int, optional): The number of search queries performed.
         - deltaQueryCount (int, optional): The number of queries performed.
         - report (str, optional): The report produced.
+        - topicId (int, optional): Index of the topic the event belongs to.
+        - searchPhraseId (int, optional): Index of the search phrase within its topic.
+
+    Topics, search phrases and search results are processed by a ResearchPipeline,
+    so events of different topics and phrases may interleave; the topicId and
+    searchPhraseId fields identify which part of the research an event belongs to.
     """
 
     research_artifacts_path: str = build_research_artifacts_path(session_key)
-    items.register_item(research_artifacts_path, {"type": "prompt", "prompt": prompt})
+    checkpoint: ResearchCheckpoint = (
+        ResearchCheckpoint.load(research_artifacts_path)
+        if resume
+        else ResearchCheckpoint()
+    )
+    prompt = checkpoint.prompt or prompt
+    if not prompt:
+        yield make_event(
+            "error",
+            "There is no research to resume in this session. Please start a new research with a prompt.",
+        )
+        return
+
+    artifacts: items.ArtifactWriter = items.get_artifact_writer(
+        research_artifacts_path
+    )
+    if checkpoint.prompt is None:
+        artifacts.register({"type": "prompt", "prompt": prompt})
 
-    client = create_lm_client()
-    tavily_client = create_tavily_client()
+    client = get_async_lm_client()
+    tavily_client = get_tavily_client()
 
     yield make_event(
         "prompt_received",
-        f"Received research request: '{prompt}'",
+        (
+            f"Resuming research request: '{prompt}'"
+            if resume
+            else f"Received research request: '{prompt}'"
+        ),
     )
 
-    prompt_valid: bool = check_if_prompt_is_valid(client, prompt)
-    items.register_item(
-        research_artifacts_path, {"type": "prompt_validity", "valid": prompt_valid}
-    )
+    if checkpoint.completed:
+        items.close_artifact_writer(research_artifacts_path)
+        yield make_event(
+            "research_completed",
+            "Research phase completed.",
+        )
+        return
+
+    prompt_valid: bool | None = checkpoint.prompt_valid
+    if prompt_valid is None:
+        prompt_valid = await check_if_prompt_is_valid(client, prompt)
+        artifacts.register({"type": "prompt_validity", "valid": prompt_valid})
     if not prompt_valid:
+        items.close_artifact_writer(research_artifacts_path)
         yield make_event(
             "error",
             "It would appear that the prompt is not a valid document research prompt. Please try again with a valid prompt.",
@@ -139,140 +250,68 @@ async def do_research(
         "hidden": False,
     }
 
-    task_prompt, format_prompt = perform_prompt_decomposition(client, prompt)
-    items.register_item(
-        research_artifacts_path, {"type": "task_prompt", "task_prompt": task_prompt}
-    )
-    items.register_item(
-        research_artifacts_path,
-        {"type": "format_prompt", "format_prompt": format_prompt},
+    decomposition_reused: bool = (
+        checkpoint.task_prompt is not None and checkpoint.format_prompt is not None
     )
+    if decomposition_reused:
+        task_prompt, format_prompt = checkpoint.task_prompt, checkpoint.format_prompt
+    else:
+        task_prompt, format_prompt = await perform_prompt_decomposition(
+            client, prompt
+        )
+        artifacts.register({"type": "task_prompt", "task_prompt": task_prompt})
+        artifacts.register(
+            {"type": "format_prompt", "format_prompt": format_prompt},
+        )
 
     yield make_event(
         "prompt_analysis_completed",
         f"Prompt analysis completed. Will analyze the following task assignment: '{task_prompt}'.",
-        deltaQueryCount=1,
+        deltaQueryCount=0 if decomposition_reused else 1,
     )
 
-    topics: List[str] = generate_topics(client, task_prompt)
-    items.register_item(research_artifacts_path, {"type": "topics", "topics": topics})
+    topics: List[str] | None = checkpoint.topics
+    topics_reused: bool = topics is not None
+    if not topics_reused:
+        topics = await generate_topics(client, task_prompt)
+        artifacts.register({"type": "topics", "topics": topics})
     yield make_event(
         "task_analysis_completed",
         f"Task analysis completed. Will be researching {len(topics)}+ topics.",
-        deltaQueryCount=1,
+        deltaQueryCount=0 if topics_reused else 1,
     )
 
-    topic_relevant_segments: dict[str, List[str]] = {}
-    search_result_urls: List[str] = []
-    all_results: List[Dict[str, Any]] = []
-    for topic in topics:
-        yield make_event(
-            "topic_exploration_started",
-            f"Researching '{topic}'",
-        )
-
-        search_phrases: List[str] = produce_search_phrases(client, prompt, topic)
-        items.register_item(
-            research_artifacts_path,
-            {
-                "type": "topic_search_phrases",
-                "topic": topic,
-                "search_phrases": search_phrases,
-            },
-        )
-
-        yield make_event(
-            "topic_exploration_completed",
-            f"Will invoke {len(search_phrases)} search phrases to research '{topic}'.",
-            deltaQueryCount=1,
-        )
-
-        topic_relevant_segments[topic] = []
-        for search_phrase in search_phrases:
-            yield make_event(
-                "search_started",
-                f"Searching for '{search_phrase}'",
-            )
-
-            search_results: List[Dict[str, Any]] = perform_search(
-                tavily_client, search_phrase, research_artifacts_path
-            )
-            items.register_item(
-                research_artifacts_path,
-                {
-                    "type": "topic_search_results",
-                    "topic": topic,
-                    "search_phrase": search_phrase,
-                    "results": search_results,
-                },
-            )
-            original_search_result_urls: List[str] = [
-                result["url"]
-                for result in search_results
-                if result["url"] not in search_result_urls
-            ]
-            search_result_urls.extend(original_search_result_urls)
-            original_search_results = [
-                result
-                for result in search_results
-                if result["url"] in original_search_result_urls
-            ]
-            all_results.extend(original_search_results)
-
-            yield make_event(
-                "search_result_processing_started",
-                f"Processing {len(original_search_result_urls)} search results.",
-                deltaSearchCount=1,
-            )
-
-            for search_result in original_search_results:
-                search_result_content: str = search_result["raw_content"]
-                search_result_url: str = search_result["url"]
-                search_result_url_index: int = search_result_urls.index(
-                    search_result_url
-                )
-                relevant_segments: List[str] = find_relevant_segments(
-                    client,
-                    prompt,
-                    topic,
-                    search_result_content,
-                    search_result_url_index,
-                )
-                topic_relevant_segments[topic].extend(relevant_segments)
-                items.register_item(
-                    research_artifacts_path,
-                    {
-                        "type": "topic_search_result_relevant_segments",
-                        "topic": topic,
-                        "search_phrase": search_phrase,
-                        "search_result": search_result,
-                        "relevant_segments": relevant_segments,
-                    },
-                )
-
-                yield make_event(
-                    "search_result_processing_completed",
-                    f"Processed search result {search_result_url_index}.",
-                    hidden=True,
-                    deltaQueryCount=1,
-                )
+    events: asyncio.Queue = asyncio.Queue()
+    pipeline = ResearchPipeline(
+        client, tavily_client, prompt, artifacts, events, checkpoint
+    )
+    pipeline_task: asyncio.Task = asyncio.create_task(pipeline.run(topics))
+    pipeline_task.add_done_callback(lambda _: events.put_nowait(None))
+    try:
+        while (event := await events.get()) is not None:
+            yield event
+        topic_relevant_segments, sources = pipeline_task.result()
+    finally:
+        pipeline_task.cancel()
 
     yield make_event(
         "aggregation_started",
         "Aggregating relevant information for all topics.",
     )
 
-    items.register_item(
-        research_artifacts_path,
+    artifacts.register(
         {
             "type": "topic_relevant_segments",
             "topic_relevant_segments": topic_relevant_segments,
-            "search_result_urls": search_result_urls,
+            "search_result_urls": sources.urls,
         },
     )
-    items.register_item(
-        research_artifacts_path, {"type": "all_results", "all_results": all_results}
+    artifacts.register(
+        {"type": "all_results", "all_results": sources.results},
     )
+    artifacts.register(sources.to_item())
+    # the research artifacts are complete; write them for the reporting phase
+    items.close_artifact_writer(research_artifacts_path)
 
     # sleep for 0.5s
     await asyncio.sleep(0.5)
@@ -288,12 +327,17 @@ async def do_reporting(session_key: str) -> AsyncGenerator[Dict[str, Any], None]
     Generates a report based on the research findings and yields events as they occur.
 
     This function handles the reporting phase, including:
-    - Report construction
+    - Report construction (in one pass, or as per-topic section drafts assembled
+      into the report, see REPORT_MODE)
     - Formatting and organization
     - Final delivery
 
     Events yielded:
     - report_building: Initial report construction
+    - report_section_drafted: A section draft completed (map-reduce mode only)
+    - report_delta (hidden): A chunk of the report text as it is generated; the
+      chunks of stage "format" make up a reformatted report that replaces the
+      text streamed in stage "report"
     - report_formatting: Formatting and structuring the report
     - report_done: Report completion and delivery
 
@@ -305,26 +349,22 @@ async def do_reporting(session_key: str) -> AsyncGenerator[Dict[str, Any], None]
         - deltaSearchCount (int, optional): The number of search queries performed
         - deltaQueryCount (int, optional): The number of queries performed
         - report (str, optional): The report produced
+        - stage (str, optional): The reporting stage a report_delta belongs to
+        - delta (str, optional): The report text chunk of a report_delta
     """
 
-    client = create_lm_client()
+    client = get_async_lm_client()
 
-    research_artifacts_path: str = build_research_artifacts_path(session_key)
-    task_prompt: str = items.find_item_by_type(research_artifacts_path, "task_prompt")[
-        "task_prompt"
-    ]
-    format_prompt: str = items.find_item_by_type(
-        research_artifacts_path, "format_prompt"
-    )["format_prompt"]
-    topic_relevant_segments: dict[str, List[str]] = items.find_item_by_type(
-        research_artifacts_path, "topic_relevant_segments"
+    # the research artifacts are indexed once and then queried by type
+    research_artifacts = items.ArtifactStore(
+        build_research_artifacts_path(session_key)
+    )
+    task_prompt: str = research_artifacts.find("task_prompt")["task_prompt"]
+    format_prompt: str = research_artifacts.find("format_prompt")["format_prompt"]
+    topic_relevant_segments: dict[str, List[str]] = research_artifacts.find(
+        "topic_relevant_segments"
     )["topic_relevant_segments"]
-    search_result_urls: List[str] = items.find_item_by_type(
-        research_artifacts_path, "topic_relevant_segments"
-    )["search_result_urls"]
-    all_results: List[Dict[str, Any]] = items.find_item_by_type(
-        research_artifacts_path, "all_results"
-    )["all_results"]
+    sources: SourceRegistry = load_source_registry(research_artifacts)
 
     yield make_event(
         "report_building",
@@ -332,35 +372,143 @@ async def do_reporting(session_key: str) -> AsyncGenerator[Dict[str, Any], None]
     )
 
     reporting_artifacts_path: str = build_reporting_artifacts_path(session_key)
-    report: str = produce_report(
-        client, task_prompt, format_prompt, topic_relevant_segments
+    reporting_artifacts: items.ArtifactWriter = items.get_artifact_writer(
+        reporting_artifacts_path
+    )
+    sections: List[tuple[str, List[str]]] = split_into_sections(
+        topic_relevant_segments
     )
-    items.register_item(reporting_artifacts_path, {"type": "report", "report": report})
+    if select_report_mode(sections) == "map_reduce":
+        # map: one section draft per topic (part), drafted in parallel
+        section_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SECTIONS)
+
+        async def draft_section(topic: str, segments: List[str]) -> str:
+            async with section_semaphore:
+                return await produce_topic_section(
+                    client, task_prompt, format_prompt, topic, segments
+                )
+
+        section_tasks: List[asyncio.Task] = [
+            asyncio.create_task(draft_section(topic, segments))
+            for topic, segments in sections
+        ]
+        try:
+            async for section_task in asyncio.as_completed(section_tasks):
+                topic: str = sections[section_tasks.index(section_task)][0]
+                section_task.result()
+                yield make_event(
+                    "report_section_drafted",
+                    f"Drafted a section on '{topic}'.",
+                    deltaQueryCount=1,
+                )
+        finally:
+            for section_task in section_tasks:
+                section_task.cancel()
+        section_drafts: List[tuple[str, str]] = [
+            (topic, section_task.result())
+            for (topic, _), section_task in zip(sections, section_tasks)
+        ]
+        reporting_artifacts.register(
+            {"type": "section_drafts", "section_drafts": section_drafts},
+        )
+
+        # reduce: assemble the drafts into the report under the format prompt
+        report_stream = ReportDeltaStream(
+            "report",
+            lambda on_delta: assemble_report(
+                client, task_prompt, format_prompt, section_drafts, on_delta
+            ),
+        )
+    else:
+        report_stream = ReportDeltaStream(
+            "report",
+            lambda on_delta: produce_report(
+                client, task_prompt, format_prompt, topic_relevant_segments, on_delta
+            ),
+        )
+    async for event in report_stream:
+        yield event
+    report: str = report_stream.result
+    reporting_artifacts.register({"type": "report", "report": report})
 
     # Step 3: Ensure that the report is consistent and formatted correctly in Markdown
-    yield make_event(
-        "report_processing",
-        "Formatting the report...",
-        deltaQueryCount=1,
-    )
-    consistent_report: str = ensure_format_is_respected(
-        client, task_prompt, format_prompt, report
-    )
+    if FORMAT_PASS == "always":
+        yield make_event(
+            "report_processing",
+            "Formatting the report...",
+            deltaQueryCount=1,
+        )
+        format_stream = ReportDeltaStream(
+            "format",
+            lambda on_delta: ensure_format_is_respected(
+                client, task_prompt, format_prompt, report, on_delta
+            ),
+        )
+        async for event in format_stream:
+            yield event
+        consistent_report: str = format_stream.result
+    else:
+        # the report is fixed locally where possible; only the sections with
+        # problems that cannot be fixed locally are reformatted by the model
+        source_count: int = len(sources)
+        report_sections: List[str] = split_sections(fix_report(report, source_count))
+        section_issues: dict[int, List[FormatIssue]] = {}
+        if FORMAT_PASS == "auto":
+            for section_index, section in enumerate(report_sections):
+                issues: List[FormatIssue] = validate_report(section, source_count)
+                if section.strip() and needs_reformat(issues):
+                    section_issues[section_index] = issues
+
+        yield make_event(
+            "report_processing",
+            "Formatting the report...",
+            deltaQueryCount=len(section_issues),
+        )
+        reformatted_sections: List[str] = await asyncio.gather(
+            *(
+                reformat_report_section(
+                    client,
+                    task_prompt,
+                    format_prompt,
+                    report_sections[section_index],
+                    issues,
+                )
+                for section_index, issues in section_issues.items()
+            )
+        )
+        for section_index, reformatted_section in zip(
+            section_issues, reformatted_sections
+        ):
+            reformatted_section = fix_report(reformatted_section, source_count)
+            # keep the section as drafted if the model dropped citations or left
+            # problems that could not be fixed
+            if not citations_preserved(
+                report_sections[section_index], reformatted_section
+            ):
+                continue
+            if not needs_reformat(validate_report(reformatted_section, source_count)):
+                report_sections[section_index] = reformatted_section
+        reporting_artifacts.register(
+            {
+                "type": "format_validation",
+                "section_issues": {
+                    section_index: [asdict(issue) for issue in issues]
+                    for section_index, issues in section_issues.items()
+                },
+            },
+        )
+        consistent_report = join_sections(report_sections)
     consistent_report += "\n\n"
     consistent_report += "---\n"
-    for search_result_url_index, search_result_url in enumerate(search_result_urls):
-        result = next(
-            (result for result in all_results if result["url"] == search_result_url),
-            None,
-        )
+    for search_result_url_index, result in enumerate(sources.results):
         consistent_report += f" - [[{search_result_url_index}]] [{result['title']}][{search_result_url_index}]\n"
     consistent_report += "\n\n"
-    for search_result_url_index, search_result_url in enumerate(search_result_urls):
+    for search_result_url_index, search_result_url in enumerate(sources.urls):
         consistent_report += f"[{search_result_url_index}]: {search_result_url}\n"
-    items.register_item(
-        reporting_artifacts_path,
+    reporting_artifacts.register(
         {"type": "consistent_report", "consistent_report": consistent_report},
     )
+    items.close_artifact_writer(reporting_artifacts_path)
 
     yield make_event(
         "report_done",
@@ -370,8 +518,474 @@ async def do_reporting(session_key: str) -> AsyncGenerator[Dict[str, Any], None]
     )
 
 
+def load_source_registry(research_artifacts: items.ArtifactStore) -> SourceRegistry:
+    """
+    Loads the source registry of a session from its research artifacts, falling
+    back to the search results for sessions without a source_registry artifact.
+    """
+    source_registry_item: Dict[str, Any] | None = research_artifacts.find(
+        "source_registry"
+    )
+    if source_registry_item is not None:
+        return SourceRegistry.from_item(source_registry_item)
+    return SourceRegistry.from_results(
+        research_artifacts.find("topic_relevant_segments")["search_result_urls"],
+        research_artifacts.find("all_results")["all_results"],
+    )
+
+
+def split_into_sections(
+    topic_relevant_segments: dict[str, List[str]],
+) -> List[tuple[str, List[str]]]:
+    """
+    Splits the segments of each topic into parts of at most SECTION_MAX_TOKENS
+    tokens, keeping at most TOPIC_MAX_TOKENS tokens of segments per topic.
+    Topics without segments are left out.
+    """
+    return [
+        (topic, split_paragraphs(window))
+        for topic, segments in topic_relevant_segments.items()
+        for window in split_into_windows(
+            "\n".join(segments), SECTION_MAX_TOKENS, TOPIC_MAX_TOKENS
+        )
+    ]
+
+
+def select_report_mode(sections: List[tuple[str, List[str]]]) -> str:
+    """
+    Resolves the "auto" REPORT_MODE: the report is map-reduced if there is more
+    than one section to draft, i.e. several topics or more segments than fit one
+    section.
+    """
+    if REPORT_MODE != "auto":
+        return REPORT_MODE
+    return "map_reduce" if len(sections) > 1 else "single"
+
+
+class ReportDeltaStream:
+    """
+    Runs a reporting errand and yields the chunks of its completion as hidden
+    report_delta events while the completion is being generated.
+
+    Chunks are batched into one event per REPORT_DELTA_INTERVAL seconds or
+    REPORT_DELTA_MAX_CHARS characters, whichever comes first, to keep the
+    per-event overhead of the event stream low. The return value of the errand
+    is available as result once the iteration completes.
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        errand: Callable[[Callable[[str], None] | None], Awaitable[str]],
+    ) -> None:
+        self.stage = stage
+        self.errand = errand
+        self.result: str | None = None
+
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._chunks: List[str] = []
+        self._size = 0
+        self._flushed_at = time.monotonic()
+
+    def on_delta(self, chunk: str) -> None:
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+        if (
+            self._size >= REPORT_DELTA_MAX_CHARS
+            or time.monotonic() - self._flushed_at >= REPORT_DELTA_INTERVAL
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        if self._chunks:
+            self._events.put_nowait(
+                make_event(
+                    "report_delta",
+                    "",
+                    hidden=True,
+                    stage=self.stage,
+                    delta="".join(self._chunks),
+                )
+            )
+            self._chunks = []
+            self._size = 0
+        self._flushed_at = time.monotonic()
+
+    async def run(self) -> str:
+        try:
+            return await self.errand(self.on_delta)
+        finally:
+            self.flush()
+
+    async def __aiter__(self) -> AsyncGenerator[Dict[str, Any], None]:
+        if not STREAM_REPORT:
+            self.result = await self.errand(None)
+            return
+
+        errand_task: asyncio.Task = asyncio.create_task(self.run())
+        errand_task.add_done_callback(lambda _: self._events.put_nowait(None))
+        try:
+            while (event := await self._events.get()) is not None:
+                yield event
+            self.result = errand_task.result()
+        finally:
+            errand_task.cancel()
+
+
+# RESEARCH PIPELINE
+def unwrap_exception_group(error: BaseException) -> BaseException:
+    """
+    Returns the first exception of a (possibly nested) exception group, or the
+    exception itself if it is not a group.
+    """
+    while isinstance(error, BaseExceptionGroup) and error.exceptions:
+        error = error.exceptions[0]
+    return error
+
+
+class ResearchPipeline:
+    """
+    Runs the per-topic part of the research phase as overlapping stages.
+
+    Search phrase generation (per topic), searching (per search phrase) and relevant
+    segment extraction (per search result) run as asyncio tasks, each stage bounded by
+    its own semaphore, so that e.g. the results of the first search phrase are being
+    processed while the search phrases of the next topic are still being generated.
+
+    Stage outputs are consumed in topic/search phrase order, which keeps the
+    assignment of source indices (and therefore the [[index]] citations and the
+    aggregated segments) independent of the order in which the stages finish.
+    Events are put on the given queue as the stages progress.
+
+    If enabled, paragraphs of a search result that near-duplicate a paragraph of an
+    earlier dispatched result of the same topic are dropped before extraction, and
+    near-duplicate relevant segments of a topic are merged into one segment citing
+    all of their sources. Topics are deduplicated independently, since a paragraph
+    is only judged relevant (or not) to the topic it was extracted for.
+
+    Search phrases, search results and relevant segments recorded in the given
+    checkpoint (of an interrupted run) are reused instead of being produced again;
+    the reused relevant segments are relabeled with the source indices of this run.
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        tavily_client: TavilyClient,
+        prompt: str,
+        artifacts: items.ArtifactWriter,
+        events: asyncio.Queue,
+        checkpoint: ResearchCheckpoint | None = None,
+    ) -> None:
+        self.client = client
+        self.tavily_client = tavily_client
+        self.prompt = prompt
+        self.artifacts = artifacts
+        self.events = events
+        self.checkpoint = checkpoint or ResearchCheckpoint()
+
+        self.topic_semaphore = asyncio.Semaphore(MAX_CONCURRENT_TOPICS)
+        self.search_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+        self.extraction_semaphore = asyncio.Semaphore(MAX_CONCURRENT_EXTRACTIONS)
+
+        self.sources = SourceRegistry()
+
+        # per topic: the paragraphs dispatched for extraction, and source index ->
+        # (fingerprint, source index) of the paragraphs of other sources that were
+        # dropped as near-duplicates of the source's paragraphs
+        self.paragraph_indexes: Dict[str, NearDuplicateIndex] = {}
+        self.paragraph_aliases: Dict[str, Dict[int, List[tuple[int, int]]]] = {}
+
+    async def run(
+        self, topics: List[str]
+    ) -> tuple[dict[str, List[str]], SourceRegistry]:
+        """
+        Researches all topics and returns the relevant segments per topic and the
+        registry of the sources they cite.
+        """
+        extraction_tasks: dict[str, List[asyncio.Task]] = {
+            topic: [] for topic in topics
+        }
+        try:
+            async with asyncio.TaskGroup() as stages:
+                await self.run_stages(stages, topics, extraction_tasks)
+        except ExceptionGroup as group:
+            # surface the error of the failed stage instead of the group wrapping it
+            raise unwrap_exception_group(group) from group
+
+        topic_relevant_segments: dict[str, List[str]] = {
+            topic: [segment for task in tasks for segment in task.result()]
+            for topic, tasks in extraction_tasks.items()
+        }
+        if DEDUP_ENABLED:
+            topic_relevant_segments = self.merge_near_duplicate_segments(
+                topic_relevant_segments
+            )
+        return topic_relevant_segments, self.sources
+
+    async def run_stages(
+        self,
+        stages: asyncio.TaskGroup,
+        topics: List[str],
+        extraction_tasks: dict[str, List[asyncio.Task]],
+    ) -> None:
+        """
+        Starts the stages of all topics in the task group, adding the extraction
+        tasks of each topic to extraction_tasks in search result order.
+        """
+        topic_tasks: List[asyncio.Task] = [
+            stages.create_task(self.explore_topic(stages, topic_id, topic))
+            for topic_id, topic in enumerate(topics)
+        ]
+        for topic_id, (topic, topic_task) in enumerate(zip(topics, topic_tasks)):
+            search_tasks: List[asyncio.Task] = await topic_task
+            for search_phrase_id, search_task in enumerate(search_tasks):
+                search_phrase, search_results = await search_task
+                original_search_results: List[Dict[str, Any]] = [
+                    result
+                    for result in search_results
+                    if self.sources.register(result)
+                ]
+
+                await self.events.put(
+                    make_event(
+                        "search_result_processing_started",
+                        f"Processing {len(original_search_results)} search results.",
+                        deltaSearchCount=1,
+                        topicId=topic_id,
+                        searchPhraseId=search_phrase_id,
+                    )
+                )
+                for result in original_search_results:
+                    search_result_url_index = self.sources.index_of(result["url"])
+                    raw_content: str = self.drop_near_duplicate_paragraphs(
+                        topic, result["raw_content"], search_result_url_index
+                    )
+                    extraction_tasks[topic].append(
+                        stages.create_task(
+                            self.process_search_result(
+                                topic_id,
+                                topic,
+                                search_phrase_id,
+                                search_phrase,
+                                result,
+                                search_result_url_index,
+                                raw_content,
+                            )
+                        )
+                    )
+
+    def drop_near_duplicate_paragraphs(
+        self, topic: str, raw_content: str, search_result_url_index: int
+    ) -> str:
+        """
+        Removes the paragraphs that near-duplicate a paragraph of an earlier
+        dispatched search result of the topic (or an earlier paragraph of the same
+        result).
+        """
+        if not DEDUP_ENABLED:
+            return raw_content
+
+        paragraph_index: NearDuplicateIndex = self.paragraph_indexes.setdefault(
+            topic, NearDuplicateIndex(DEDUP_MAX_DISTANCE)
+        )
+        paragraph_aliases = self.paragraph_aliases.setdefault(topic, {})
+        paragraphs: List[str] = []
+        for paragraph in split_paragraphs(raw_content):
+            fingerprint: int | None = simhash(paragraph)
+            if fingerprint is None:
+                paragraphs.append(paragraph)
+                continue
+            owner: int | None = paragraph_index.find(fingerprint)
+            if owner is None:
+                paragraph_index.add(fingerprint, search_result_url_index)
+                paragraphs.append(paragraph)
+            elif owner != search_result_url_index:
+                paragraph_aliases.setdefault(owner, []).append(
+                    (fingerprint, search_result_url_index)
+                )
+        return "\n".join(paragraphs)
+
+    def merge_near_duplicate_segments(
+        self, topic_relevant_segments: dict[str, List[str]]
+    ) -> dict[str, List[str]]:
+        """
+        Collapses the near-duplicate segments of each topic into their first
+        occurrence in the topic, which then cites the sources of all of the copies,
+        including the sources whose copy of the paragraph was dropped before
+        extraction. Copies in different topics are kept, so that every topic keeps
+        its segments.
+        """
+        merged_segments: dict[str, List[tuple[List[int], str]]] = {
+            topic: [] for topic in topic_relevant_segments
+        }
+        for topic, segments in topic_relevant_segments.items():
+            segment_index = NearDuplicateIndex(DEDUP_MAX_DISTANCE)
+            paragraph_aliases = self.paragraph_aliases.get(topic, {})
+            for labeled_segment in segments:
+                indices, segment = parse_segment(labeled_segment)
+                fingerprint: int | None = simhash(segment)
+                if fingerprint is None:
+                    merged_segments[topic].append((indices, segment))
+                    continue
+                for index in list(indices):
+                    indices.extend(
+                        alias
+                        for alias_fingerprint, alias in paragraph_aliases.get(
+                            index, []
+                        )
+                        if hamming_distance(alias_fingerprint, fingerprint)
+                        <= DEDUP_MAX_DISTANCE
+                    )
+                original: tuple[List[int], str] | None = segment_index.find(
+                    fingerprint
+                )
+                if original is not None:
+                    original[0].extend(indices)
+                    continue
+                merged_segment = (indices, segment)
+                segment_index.add(fingerprint, merged_segment)
+                merged_segments[topic].append(merged_segment)
+
+        return {
+            topic: [
+                format_segment(sorted(set(indices)), segment)
+                for indices, segment in segments
+            ]
+            for topic, segments in merged_segments.items()
+        }
+
+    async def explore_topic(
+        self, stages: asyncio.TaskGroup, topic_id: int, topic: str
+    ) -> List[asyncio.Task]:
+        async with self.topic_semaphore:
+            await self.events.put(
+                make_event(
+                    "topic_exploration_started",
+                    f"Researching '{topic}'",
+                    topicId=topic_id,
+                )
+            )
+
+            search_phrases: List[str] | None = self.checkpoint.search_phrases.get(
+                topic
+            )
+            reused: bool = search_phrases is not None
+            if not reused:
+                search_phrases = await produce_search_phrases(
+                    self.client, self.prompt, topic
+                )
+                self.artifacts.register(
+                    {
+                        "type": "topic_search_phrases",
+                        "topic": topic,
+                        "search_phrases": search_phrases,
+                    },
+                )
+
+            await self.events.put(
+                make_event(
+                    "topic_exploration_completed",
+                    f"Will invoke {len(search_phrases)} search phrases to research '{topic}'.",
+                    deltaQueryCount=0 if reused else 1,
+                    topicId=topic_id,
+                )
+            )
+
+        return [
+            stages.create_task(
+                self.search(topic_id, topic, search_phrase_id, search_phrase)
+            )
+            for search_phrase_id, search_phrase in enumerate(search_phrases)
+        ]
+
+    async def search(
+        self, topic_id: int, topic: str, search_phrase_id: int, search_phrase: str
+    ) -> tuple[str, List[Dict[str, Any]]]:
+        async with self.search_semaphore:
+            await self.events.put(
+                make_event(
+                    "search_started",
+                    f"Searching for '{search_phrase}'",
+                    topicId=topic_id,
+                    searchPhraseId=search_phrase_id,
+                )
+            )
+
+            search_results: List[Dict[str, Any]] | None = (
+                self.checkpoint.search_results.get((topic, search_phrase))
+            )
+            if search_results is None:
+                # the Tavily client is synchronous; keep it off the event loop
+                search_results = await asyncio.to_thread(
+                    perform_search,
+                    self.tavily_client,
+                    search_phrase,
+                    self.artifacts,
+                )
+                self.artifacts.register(
+                    {
+                        "type": "topic_search_results",
+                        "topic": topic,
+                        "search_phrase": search_phrase,
+                        "results": search_results,
+                    },
+                )
+        return search_phrase, search_results
+
+    async def process_search_result(
+        self,
+        topic_id: int,
+        topic: str,
+        search_phrase_id: int,
+        search_phrase: str,
+        search_result: Dict[str, Any],
+        search_result_url_index: int,
+        raw_content: str,
+    ) -> List[str]:
+        recorded_segments: List[str] | None = self.checkpoint.relevant_segments.get(
+            (topic, search_phrase, search_result["url"])
+        )
+        if recorded_segments is not None:
+            relevant_segments: List[str] = [
+                format_segment([search_result_url_index], parse_segment(segment)[1])
+                for segment in recorded_segments
+            ]
+        else:
+            relevant_segments = await find_relevant_segments(
+                self.client,
+                self.prompt,
+                topic,
+                search_result["raw_content"],
+                search_result_url_index,
+                self.extraction_semaphore,
+                deduplicated_search_result=raw_content,
+            )
+            self.artifacts.register(
+                {
+                    "type": "topic_search_result_relevant_segments",
+                    "topic": topic,
+                    "search_phrase": search_phrase,
+                    "search_result": search_result,
+                    "relevant_segments": relevant_segments,
+                },
+            )
+
+        await self.events.put(
+            make_event(
+                "search_result_processing_completed",
+                f"Processed search result {search_result_url_index}.",
+                hidden=True,
+                deltaQueryCount=0 if recorded_segments is not None else 1,
+                topicId=topic_id,
+                searchPhraseId=search_phrase_id,
+            )
+        )
+        return relevant_segments
+
+
 # ERRANDS
-def check_if_prompt_is_valid(client: OpenAI, prompt: str) -> bool:
+async def check_if_prompt_is_valid(client: AsyncOpenAI, prompt: str) -> bool:
     messages = [
         {
             "role": "system",
@@ -382,10 +996,12 @@ def check_if_prompt_is_valid(client: OpenAI, prompt: str) -> bool:
             "content": f"Is the following prompt a valid information research prompt? Respond with 'yes' or 'no'. Do not output any other text.\n\n{prompt}\n\n Reminders: Find out if the above-given prompt is a valid information research prompt. Do not output any other text.",
         },
     ]
-    return is_output_positive(get_completion(client, messages))
+    return is_output_positive(await get_completion_async(client, messages))
 
 
-def perform_prompt_decomposition(client: OpenAI, prompt: str) -> List[str]:
+async def perform_prompt_decomposition(
+    client: AsyncOpenAI, prompt: str
+) -> List[str]:
     messages = [
         {
             "role": "system",
@@ -396,7 +1012,7 @@ def perform_prompt_decomposition(client: OpenAI, prompt: str) -> List[str]:
             "content": f"Decompose the PROMPT into a task to be performed and a format in which the report should be produced. If there is no formatting constraint, output 'No formatting constraint' in the second prompt. Do not output any other text.\n\nEXAMPLE PROMPT:\nWrite a three-chapter report on the differences between the US and European economy health in 2024. The first chapter should be about the US economy health, the second chapter should be about the European economy health, and the third chapter should be about the differences between the two.\n\nEXAMPLE OUTPUT:\nWrite a report on the differences between the US and European economy health in 2024.\n\nThe report should be in the form of a three-chapter report. The first chapter should be about the US economy health, the second chapter should be about the European economy health, and the third chapter should be about the differences between the two.\n\nPROMPT: {prompt}\n\nReminders: The output should be two prompts separated by a double-newline. The first prompt is the task to be performed, and the second prompt is the format in which the report should be produced. If there is no formatting constraint, output 'No formatting constraint' in the second prompt. Do not output any other text.",
         },
     ]
-    decomposition = get_completion(client, messages).split("\n\n")
+    decomposition = (await get_completion_async(client, messages)).split("\n\n")
     if len(decomposition) != 2:
         raise ValueError(
             f"Failed to perform prompt decomposition; decomposition: {decomposition}"
@@ -404,7 +1020,7 @@ def perform_prompt_decomposition(client: OpenAI, prompt: str) -> List[str]:
     return decomposition
 
 
-def generate_topics(client: OpenAI, prompt: str) -> List[str]:
+async def generate_topics(client: AsyncOpenAI, prompt: str) -> List[str]:
     messages = [
         {
             "role": "system",
@@ -415,7 +1031,7 @@ def generate_topics(client: OpenAI, prompt: str) -> List[str]:
             "content": f"Decompose the following prompt into a list of topics to research:\n\nPrompt: {prompt}\n\nReminders: The output should be a list of strings separated by newlines, each representing a topic to research. The topics should be in English and should be specific and focused. Do not output any other text. Output at most {MAX_TOPICS} topics.",
         },
     ]
-    completion: str = get_completion(client, messages)
+    completion: str = await get_completion_async(client, messages)
     completion_lines: List[str] = completion.split("\n")
     ret = [line.strip() for line in completion_lines if line.strip()]
     if len(ret) > MAX_TOPICS:
@@ -423,7 +1039,9 @@ def generate_topics(client: OpenAI, prompt: str) -> List[str]:
     return ret
 
 
-def produce_search_phrases(client: OpenAI, prompt: str, topic: str) -> List[str]:
+async def produce_search_phrases(
+    client: AsyncOpenAI, prompt: str, topic: str
+) -> List[str]:
     messages = [
         {
             "role": "system",
@@ -434,7 +1052,7 @@ def produce_search_phrases(client: OpenAI, prompt: str, topic: str) -> List[str]
             "content": f"Produce a list of search phrases for the following topic:\n\nPrompt (added for context): {prompt}\n\nTopic: {topic}\n\nReminders: The output should be a list of search phrases for the given topic separated by newlines. The search phrases should be in English and should be specific and focused. Output at most {MAX_SEARCH_PHRASES} search phrases. Do not output any other text.",
         },
     ]
-    completion: str = get_completion(client, messages)
+    completion: str = await get_completion_async(client, messages)
     completion_lines: List[str] = completion.split("\n")
     ret = [line.strip() for line in completion_lines if line.strip()]
     if len(ret) > MAX_SEARCH_PHRASES:
@@ -443,17 +1061,23 @@ def produce_search_phrases(client: OpenAI, prompt: str, topic: str) -> List[str]
 
 
 def perform_search(
-    client: TavilyClient, search_phrase: str, research_artifacts_path: str
+    client: TavilyClient, search_phrase: str, artifacts: items.ArtifactWriter
 ) -> List[Dict[str, Any]]:
-    search_response: Dict[str, Any] = client.search(
-        search_phrase, include_raw_content=True
+    search_cache: SearchCache | None = get_search_cache()
+    search_response: Dict[str, Any] | None = (
+        search_cache.get(search_phrase) if search_cache is not None else None
     )
-    items.register_item(
-        research_artifacts_path,
+    cached: bool = search_response is not None
+    if not cached:
+        search_response = client.search(search_phrase, include_raw_content=True)
+        if search_cache is not None:
+            search_cache.put(search_phrase, search_response)
+    artifacts.register(
         {
             "type": "search_response_raw",
             "search_phrase": search_phrase,
             "response": search_response,
+            "cached": cached,
         },
     )
     filtered_results: List[Dict[str, Any]] = [
@@ -461,8 +1085,7 @@ def perform_search(
         for result in search_response["results"]
         if result["raw_content"] is not None and result["raw_content"].strip() != ""
     ]
-    items.register_item(
-        research_artifacts_path,
+    artifacts.register(
         {
             "type": "search_response_filtered",
             "search_phrase": search_phrase,
@@ -472,14 +1095,95 @@ def perform_search(
     return filtered_results
 
 
-def find_relevant_segments(
-    client: OpenAI,
+async def find_relevant_segments(
+    client: AsyncOpenAI,
     prompt: str,
     topic: str,
     search_result: str,
     search_result_url_index: int,
+    extraction_semaphore: asyncio.Semaphore,
+    deduplicated_search_result: str | None = None,
 ) -> List[str]:
-    messages = [
+    """
+    Extracts the segments of the search result relevant to the topic, labeled
+    with the source index.
+
+    If given, the paragraphs are extracted from deduplicated_search_result (the
+    search result without the paragraphs already dispatched for another result).
+    The extracted paragraphs are memoized per content: a memoized extraction of
+    the complete search result is preferred, so that dropped paragraphs do not
+    prevent reusing the extraction of another topic or session.
+    """
+    extracted_content: str = (
+        search_result
+        if deduplicated_search_result is None
+        else deduplicated_search_result
+    )
+
+    def make_segments_cache_key(content: str) -> str:
+        return make_cache_key(
+            "relevant_segments",
+            DEFAULT_MODEL,
+            hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            # the extraction messages without a search result: the prompt, the
+            # topic and the instructions, so that changed instructions miss
+            make_extraction_messages(prompt, topic, ""),
+            EXTRACTION_WINDOW_TOKENS,
+            MAX_DOCUMENT_TOKENS,
+            PREFILTER_TOP_K,
+        )
+
+    # the extracted paragraphs are memoized without their citation index, so that
+    # the same source found under another index (topic, session) can reuse them
+    segments_cache: SqliteCache | None = get_segments_cache()
+    paragraphs: List[str] | None = None
+    if segments_cache is not None:
+        for content in dict.fromkeys([search_result, extracted_content]):
+            # the cache blocks on SQLite; keep it off the event loop
+            paragraphs = await asyncio.to_thread(
+                segments_cache.get, make_segments_cache_key(content)
+            )
+            if paragraphs is not None:
+                break
+    if paragraphs is None:
+        # only the paragraphs that best match the prompt and topic lexically are
+        # sent to the model; large pages are processed as token-budgeted windows
+        page_paragraphs: List[str] = split_paragraphs(extracted_content)
+        if PREFILTER_TOP_K > 0:
+            page_paragraphs = select_top_paragraphs(
+                page_paragraphs, f"{prompt}\n{topic}", PREFILTER_TOP_K
+            )
+        windows: List[str] = split_into_windows(
+            "\n".join(page_paragraphs), EXTRACTION_WINDOW_TOKENS, MAX_DOCUMENT_TOKENS
+        )
+
+        async def extract_window(window: str) -> List[str]:
+            # bound the extraction calls of all results, not the results
+            async with extraction_semaphore:
+                return await extract_relevant_paragraphs(client, prompt, topic, window)
+
+        window_paragraphs: List[List[str]] = await asyncio.gather(
+            *(extract_window(window) for window in windows)
+        )
+        paragraphs = [
+            paragraph for paragraphs in window_paragraphs for paragraph in paragraphs
+        ]
+        if segments_cache is not None:
+            await asyncio.to_thread(
+                segments_cache.put,
+                make_segments_cache_key(extracted_content),
+                paragraphs,
+            )
+
+    return [
+        format_segment([search_result_url_index], paragraph) for paragraph in paragraphs
+    ]
+
+
+def make_extraction_messages(
+    prompt: str, topic: str, search_result: str
+) -> List[Dict[str, str]]:
+    return [
         {
             "role": "system",
             "content": "You are a helpful assistant that finds relevant paragraphs in a given search result. The output should be a double-newline-separated list of relevant paragraphs. A paragraph can be a couple of sentences to dozens of sentences if they are really relevant. If there are no relevant paragraphs, just output an empty line or two and stop the generation. Do not output any other text.",
@@ -489,17 +1193,23 @@ def find_relevant_segments(
             "content": f"Find the sentences or paragraphs relevant to the following prompt in the following search result:\n\nSearch result: {search_result}\n\nPrompt (added for context): {prompt}\n\nTopic: {topic}\n\nReminders: The output should be a list of relevant paragraphs for the given topic separated by double-newlines. The relevant paragraphs should be in English and should be genuinely relevant to the prompt. Do not output any other text.",
         },
     ]
-    ret = get_completion(client, messages).split("\n")
+
+
+async def extract_relevant_paragraphs(
+    client: AsyncOpenAI, prompt: str, topic: str, search_result: str
+) -> List[str]:
+    messages = make_extraction_messages(prompt, topic, search_result)
+    ret = (await get_completion_async(client, messages)).split("\n")
     ret = [line.strip() for line in ret if line.strip()]
-    ret = [f"[[{search_result_url_index}]] {paragraph}" for paragraph in ret]
     return ret
 
 
-def produce_report(
-    client: OpenAI,
+async def produce_report(
+    client: AsyncOpenAI,
     prompt: str,
     format_prompt: str,
     topic_relevant_segments: dict[str, List[str]],
+    on_delta: Callable[[str], None] | None = None,
 ) -> str:
     topic_relevant_segments_str: str = "\n".join(
         [
@@ -517,11 +1227,80 @@ def produce_report(
             "content": f"Produce a report based on the following aggregated per-topic relevant paragraphs. Each paragraph contains an index of a source. Make sure to refer to this index in the form [[index]] every time you rely on the information from the source. Respect the format prompt. Do not output any other text.\n\nReport prompt: {prompt}\n\nTopic relevant paragraphs: {topic_relevant_segments_str}\n\nFormat prompt: {format_prompt}\n\nReminders: The output should be a report in Markdown format. The report should be formatted correctly according to the Format prompt in Markdown. Every single mention of an information stemming from one of the sources should be accompanied by the source index in the form [[index]] (or [[index1,index2,...]]) within or after the statement of the information. A list of the source URLs to correspond to the indices will be provided separately -- do not attempt to output it. Do not output any other text.",
         },
     ]
-    return get_completion(client, messages).strip()
+    return (await get_completion_async(client, messages, on_delta=on_delta)).strip()
 
 
-def ensure_format_is_respected(
-    client: OpenAI, prompt: str, format_prompt: str, report: str
+async def produce_topic_section(
+    client: AsyncOpenAI,
+    prompt: str,
+    format_prompt: str,
+    topic: str,
+    segments: List[str],
+) -> str:
+    segments_str: str = "\n".join(segments)
+    messages = [
+        {
+            "role": "system",
+            "content": "You are a helpful assistant that drafts one section of a report based on the relevant paragraphs found for one topic while citing sources. The output should be a section in Markdown format. Do not output any other text.",
+        },
+        {
+            "role": "user",
+            "content": f"Draft the section of the report covering the following topic based on the following relevant paragraphs. Each paragraph contains an index of a source. Make sure to refer to this index in the form [[index]] every time you rely on the information from the source. Do not output any other text.\n\nReport prompt: {prompt}\n\nTopic: {topic}\n\nRelevant paragraphs: {segments_str}\n\nFormat prompt (of the whole report, added for context): {format_prompt}\n\nReminders: The output should be a section in Markdown format covering only the given topic; it will be assembled with the sections on the other topics into the report. Every single mention of an information stemming from one of the sources should be accompanied by the source index in the form [[index]] (or [[index1,index2,...]]) within or after the statement of the information. Do not output any other text.",
+        },
+    ]
+    return (await get_completion_async(client, messages)).strip()
+
+
+async def assemble_report(
+    client: AsyncOpenAI,
+    prompt: str,
+    format_prompt: str,
+    section_drafts: List[tuple[str, str]],
+    on_delta: Callable[[str], None] | None = None,
+) -> str:
+    section_drafts_str: str = "\n\n".join(
+        [f"Topic: {topic}\n{draft}" for topic, draft in section_drafts]
+    )
+    messages = [
+        {
+            "role": "system",
+            "content": "You are a helpful assistant that assembles a report from per-topic section drafts while keeping the citations of sources. The output should be a report in Markdown format. The report should be self-consistent and formatted correctly in Markdown. Do not output any other text.",
+        },
+        {
+            "role": "user",
+            "content": f"Assemble a report from the following per-topic section drafts. The drafts refer to sources in the form [[index]]; keep these references with the information they support. Merge overlapping information, order and structure the content, and respect the format prompt. Do not output any other text.\n\nReport prompt: {prompt}\n\nSection drafts: {section_drafts_str}\n\nFormat prompt: {format_prompt}\n\nReminders: The output should be a report in Markdown format. The report should be formatted correctly according to the Format prompt in Markdown. Do not remove any references in the form [[index]] (or [[index1,index2,...]]) -- keep them in the text! A list of the source URLs to correspond to the indices will be provided separately -- do not attempt to output it. Do not output any other text.",
+        },
+    ]
+    return (await get_completion_async(client, messages, on_delta=on_delta)).strip()
+
+
+async def reformat_report_section(
+    client: AsyncOpenAI,
+    prompt: str,
+    format_prompt: str,
+    section: str,
+    issues: List[FormatIssue],
+) -> str:
+    issues_str: str = "\n".join(f"- {issue.description}" for issue in issues)
+    messages = [
+        {
+            "role": "system",
+            "content": "You are a helpful assistant that fixes the formatting of one section of a report. The output should be the section in Markdown format. Note that double horizontal rule (.e.g ==== etc.) are not supported in official Markdown. Do not output any other text.",
+        },
+        {
+            "role": "user",
+            "content": f"Fix the following formatting problems in the following section of a report. Do not change the content of the section. Do not output the Markdown output as code (i.e. enclosed in ```) -- just output the Markdown. Do not remove any references in the form [[index]] -- keep them in the text!\n\nProblems:\n{issues_str}\n\nSection: {section}\n\nFormat prompt (of the whole report, added for context): {format_prompt}\n\nReminders: The output should be only the given section, with its formatting problems fixed, in Markdown format. Do not output the Markdown output as code (i.e. enclosed in ```) -- just output the Markdown. Do not remove any references in the form [[index]] -- keep them in the text! Do not output any other text.",
+        },
+    ]
+    return (await get_completion_async(client, messages)).strip()
+
+
+async def ensure_format_is_respected(
+    client: AsyncOpenAI,
+    prompt: str,
+    format_prompt: str,
+    report: str,
+    on_delta: Callable[[str], None] | None = None,
 ) -> str:
     messages = [
         {
@@ -533,4 +1312,4 @@ def ensure_format_is_respected(
             "content": f"Ensure that the following report is properly formatted according to the format prompt. Do not output the Markdown output as code (i.e. enclosed in ```) -- just output the Markdown. Do not remove any references in the form [[index]] -- keep them in the text! The list of sources will be provided separately.\n\nReport: {report}\n\nFormat prompt: {format_prompt}\n\nReminders: The output should be a report in Markdown format. The report should be self-consistent and formatted correctly in Markdown. Do not output the Markdown output as code (i.e. enclosed in ```) -- just output the Markdown. Do not remove any references in the form [[index]] -- keep them in the text! The list of sources will be provided separately. Do not output any other text.",
         },
     ]
-    return get_completion(client, messages).strip()
+    return (await get_completion_async(client, messages, on_delta=on_delta)).strip()
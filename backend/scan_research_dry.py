@@ -13,12 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import asyncio
-import json
 import random
 from datetime import datetime
 from glob import glob
 from typing import Any, AsyncGenerator, Dict, List
 
+import items
+
 
 async def do_research(
     session_key: str,
@@ -49,17 +50,12 @@ async def do_research(
     # Use the first mock file found
     mock_file = mock_files[0]
 
-    # Read all events from the mock file
-    with open(mock_file, "r") as f:
-        events = [json.loads(line) for line in f if line.strip()]
-
-    # Filter for non-reporting events
-    research_events = [
-        event
-        for event in events
-        if not event.get("type", "").startswith("report_")
-        and event.get("type", "") != "completed"
-    ]
+    # Read the non-reporting events from the mock file as they are replayed
+    research_events = items.iter_items(
+        mock_file,
+        lambda event_type: not (event_type or "").startswith("report_")
+        and (event_type or "") != "completed",
+    )
 
     # Replay each event with a random delay
     for event in research_events:
@@ -97,14 +93,10 @@ async def do_reporting(
     # Use the first mock file found
     mock_file = mock_files[0]
 
-    # Read all events from the mock file
-    with open(mock_file, "r") as f:
-        events = [json.loads(line) for line in f if line.strip()]
-
-    # Filter for reporting events
-    reporting_events = [
-        event for event in events if event.get("type", "").startswith("report_")
-    ]
+    # Read the reporting events from the mock file as they are replayed
+    reporting_events = items.iter_items(
+        mock_file, lambda event_type: (event_type or "").startswith("report_")
+    )
 
     # Replay each event with a random delay
     for event in reporting_events:
@@ -0,0 +1,117 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Source bookkeeping for the Universal Deep Research Backend (UDR-B).
+
+This module assigns the [[index]] citation indices to the search results of a
+research session and provides constant-time lookups by URL and by index, shared
+by the research phase (which registers the sources) and the reporting phase
+(which lists them below the report).
+"""
+
+from typing import Any, Dict, List
+
+
+class SourceRegistry:
+    """
+    Registry of the sources (unique search result URLs) of a research session.
+
+    Sources are indexed in the order in which they are registered; the index of
+    a source is its [[index]] citation. Only the first search result registered
+    for a URL is kept.
+    """
+
+    def __init__(self) -> None:
+        self._indices: Dict[str, int] = {}
+        self._results: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._indices
+
+    def register(self, result: Dict[str, Any]) -> bool:
+        """
+        Registers the search result as a source unless its URL is already known.
+
+        Args:
+            result: The search result (with at least "url" and "title")
+
+        Returns:
+            bool: Whether the search result is a new source
+        """
+        if result["url"] in self._indices:
+            return False
+        self._indices[result["url"]] = len(self._results)
+        self._results.append(result)
+        return True
+
+    def index_of(self, url: str) -> int:
+        return self._indices[url]
+
+    def get(self, url: str) -> Dict[str, Any] | None:
+        index = self._indices.get(url)
+        return self._results[index] if index is not None else None
+
+    @property
+    def urls(self) -> List[str]:
+        """The source URLs; the position of a URL is its index."""
+        return list(self._indices)
+
+    @property
+    def results(self) -> List[Dict[str, Any]]:
+        """The search results of the sources, in index order."""
+        return list(self._results)
+
+    def to_item(self) -> Dict[str, Any]:
+        """
+        Returns the registry as a (compact) artifact item. Only the index, URL
+        and title of every source are stored; the full search results are stored
+        in the all_results artifact.
+        """
+        return {
+            "type": "source_registry",
+            "sources": [
+                {"index": index, "url": result["url"], "title": result["title"]}
+                for index, result in enumerate(self._results)
+            ],
+        }
+
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> "SourceRegistry":
+        """
+        Restores a registry from an artifact item created by to_item.
+        """
+        registry = cls()
+        for source in sorted(item["sources"], key=lambda source: source["index"]):
+            registry.register(source)
+        return registry
+
+    @classmethod
+    def from_results(
+        cls, search_result_urls: List[str], all_results: List[Dict[str, Any]]
+    ) -> "SourceRegistry":
+        """
+        Restores a registry from the search result URLs (in index order) and the
+        search results of a session that predates the source_registry artifact.
+        """
+        results_by_url: Dict[str, Dict[str, Any]] = {}
+        for result in all_results:
+            results_by_url.setdefault(result["url"], result)
+        registry = cls()
+        for url in search_result_urls:
+            registry.register(results_by_url[url])
+        return registry
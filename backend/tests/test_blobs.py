@@ -0,0 +1,105 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import gzip
+import os
+
+import pytest
+
+from blobs import BlobStore, build_blobs_directory, dehydrate_item, rehydrate_item
+from items import ArtifactWriter, load_items
+
+PAGE = "Gold prices rose sharply in 1970. " * 50
+
+
+@pytest.fixture
+def blob_store(tmp_path):
+    return BlobStore(str(tmp_path / "blobs"))
+
+
+def test_texts_round_trip_compressed(blob_store):
+    digest = blob_store.put(PAGE)
+
+    assert digest == BlobStore.digest(PAGE)
+    assert blob_store.contains(digest)
+    assert blob_store.get(digest) == PAGE
+    path = os.path.join(blob_store.directory, digest[:2], digest + ".gz")
+    with open(path, "rb") as f:
+        assert gzip.decompress(f.read()).decode("utf-8") == PAGE
+    assert os.path.getsize(path) < len(PAGE)
+
+
+def test_stored_texts_are_not_written_again(blob_store):
+    digest = blob_store.put(PAGE)
+    path = os.path.join(blob_store.directory, digest[:2], digest + ".gz")
+    os.utime(path, (0, 0))
+
+    assert blob_store.put(PAGE) == digest
+    assert os.path.getmtime(path) == 0
+
+
+def test_missing_blobs_raise(blob_store):
+    with pytest.raises(FileNotFoundError):
+        blob_store.get(BlobStore.digest("missing"))
+
+
+def test_unavailable_zstd_falls_back_to_gzip(tmp_path, monkeypatch):
+    monkeypatch.setattr("blobs._zstandard_available", lambda: False)
+    assert BlobStore(str(tmp_path), compression="zstd").compression == "gzip"
+
+
+def test_items_round_trip_through_dehydration(blob_store):
+    item = {
+        "type": "all_results",
+        "results": [
+            {"url": "https://a", "raw_content": PAGE, "content": "Gold"},
+            {"url": "https://b", "raw_content": PAGE},
+            {"url": "https://c", "raw_content": ""},
+        ],
+    }
+    dehydrated, blobs = dehydrate_item(item)
+
+    assert blobs == [(BlobStore.digest(PAGE), PAGE)]
+    assert dehydrated["results"][0] == {
+        "url": "https://a",
+        "raw_content_blob": BlobStore.digest(PAGE),
+        "content": "Gold",
+    }
+    assert dehydrated["results"][2] is item["results"][2]
+    assert item["results"][0]["raw_content"] == PAGE
+
+    for digest, text in blobs:
+        blob_store.put(text, digest)
+    assert rehydrate_item(dehydrated, blob_store) == item
+    assert list(dehydrated["results"][0]) == ["url", "raw_content", "content"]
+
+
+def test_items_without_raw_content_are_not_copied():
+    item = {"type": "topics", "topics": ["gold"]}
+    assert dehydrate_item(item) == (item, [])
+    assert dehydrate_item(item)[0] is item
+
+
+def test_artifact_files_store_pages_in_blobs(tmp_path):
+    filepath = str(tmp_path / "key.research_artifacts.jsonl")
+    writer = ArtifactWriter(
+        filepath, blob_store=BlobStore(build_blobs_directory(filepath))
+    )
+    item = {"type": "topic_search_results", "results": [{"raw_content": PAGE}]}
+    writer.register(item)
+    writer.close()
+
+    with open(filepath, encoding="utf-8") as f:
+        assert PAGE not in f.read()
+    assert load_items(filepath) == [item]
@@ -0,0 +1,167 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sqlite3
+
+import pytest
+
+import cache
+from cache import SearchCache, SqliteCache, make_cache_key
+
+
+class Clock:
+    """A clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "time", clock.time)
+    return clock
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache" / "cache.sqlite")
+
+
+def stored_sizes(path: str, namespace: str) -> tuple[int, int]:
+    """Returns the tracked size of the namespace and the actual sum of its entries."""
+    with sqlite3.connect(path) as connection:
+        tracked = connection.execute(
+            "SELECT size FROM namespace_sizes WHERE namespace = ?", (namespace,)
+        ).fetchone()[0]
+        actual = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries WHERE namespace = ?",
+            (namespace,),
+        ).fetchone()[0]
+    return tracked, actual
+
+
+def test_make_cache_key_ignores_key_order():
+    assert make_cache_key({"a": 1, "b": 2}) == make_cache_key({"b": 2, "a": 1})
+    assert make_cache_key("model", "a") != make_cache_key("model", "b")
+
+
+def test_values_round_trip_and_are_counted(path, clock):
+    store = SqliteCache(path, "completions", max_bytes=1 << 20)
+    assert store.get("key") is None
+    store.put("key", {"text": "Gold", "tokens": [1, 2]})
+
+    assert store.get("key") == {"text": "Gold", "tokens": [1, 2]}
+    stats = store.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_expired_values_are_missing(path, clock):
+    store = SqliteCache(path, "completions", max_bytes=1 << 20, ttl_seconds=60)
+    store.put("key", "value")
+
+    clock.now += 60
+    assert store.contains("key")
+    assert store.get("key") == "value"
+
+    clock.now += 1
+    assert not store.contains("key")
+    assert store.get("key") is None
+    assert store.stats()["entries"] == 0
+
+
+def test_least_recently_used_values_are_evicted(path, clock):
+    value = "x" * 98  # 100 bytes once serialized
+    store = SqliteCache(path, "completions", max_bytes=300)
+    for key in ["a", "b", "c"]:
+        store.put(key, value)
+        clock.now += 1
+    store.get("a")
+    clock.now += 1
+
+    store.put("d", value)
+
+    assert [store.contains(key) for key in "abcd"] == [True, False, True, True]
+    assert store.stats()["size_bytes"] == 300
+
+
+def test_namespace_sizes_follow_puts_replacements_and_evictions(path, clock):
+    store = SqliteCache(path, "completions", max_bytes=250)
+    other = SqliteCache(path, "routines", max_bytes=1 << 20)
+    for i in range(5):
+        store.put(f"key{i}", "x" * (10 * i))
+        store.put("key0", "replaced")
+        other.put(f"key{i}", "y")
+        clock.now += 1
+
+    tracked, actual = stored_sizes(path, "completions")
+    assert tracked == actual <= 250
+    assert stored_sizes(path, "routines") == (15, 15)
+
+
+def test_sizes_of_entries_written_before_tracking_are_counted(path, clock):
+    SqliteCache(path, "completions", max_bytes=1 << 20).put("key", "value")
+    with sqlite3.connect(path) as connection:
+        connection.execute("DELETE FROM namespace_sizes")
+
+    SqliteCache(path, "completions", max_bytes=1 << 20)
+    assert stored_sizes(path, "completions") == (7, 7)
+
+
+def make_search_cache(path: str) -> SearchCache:
+    return SearchCache(
+        SqliteCache(path, "search_responses", max_bytes=1 << 20),
+        SqliteCache(path, "search_pages", max_bytes=1 << 20),
+    )
+
+
+def make_response(*urls: str) -> dict:
+    return {
+        "query": "gold prices",
+        "results": [
+            {"url": url, "content": "Gold", "raw_content": f"Page of {url}"}
+            for url in urls
+        ],
+    }
+
+
+def test_search_responses_are_cached_by_normalized_phrase(path, clock):
+    search_cache = make_search_cache(path)
+    search_cache.put("Gold  Prices", make_response("https://a", "https://b"))
+
+    assert search_cache.get(" gold prices ") == make_response("https://a", "https://b")
+    assert search_cache.get("silver prices") is None
+
+
+def test_pages_are_stored_once(path, clock):
+    search_cache = make_search_cache(path)
+    search_cache.put("gold prices", make_response("https://a", "https://b"))
+    search_cache.put("gold price history", make_response("https://b", "https://c"))
+
+    assert search_cache.pages.stats()["entries"] == 3
+    response = search_cache.responses.get("gold price history")
+    assert all("raw_content" not in result for result in response["results"])
+
+
+def test_responses_whose_pages_were_evicted_are_missing(path, clock):
+    search_cache = make_search_cache(path)
+    search_cache.put("gold prices", make_response("https://a"))
+    page_key = make_cache_key("https://a", "Page of https://a")
+    with sqlite3.connect(path) as connection:
+        connection.execute("DELETE FROM entries WHERE key = ?", (page_key,))
+
+    assert search_cache.get("gold prices") is None
@@ -0,0 +1,95 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+
+from checkpoints import ResearchCheckpoint
+from items import ArtifactWriter, load_items
+
+SEARCH_RESULT = {"url": "https://example.com/gold", "content": "Gold prices"}
+
+ARTIFACTS = [
+    {"type": "prompt", "prompt": "Gold prices in 1970"},
+    {"type": "prompt_validity", "valid": True},
+    {"type": "task_prompt", "task_prompt": "Research gold prices"},
+    {"type": "format_prompt", "format_prompt": "A short report"},
+    {"type": "topics", "topics": ["gold"]},
+    {"type": "topic_search_phrases", "topic": "gold", "search_phrases": ["gold"]},
+    {
+        "type": "topic_search_results",
+        "topic": "gold",
+        "search_phrase": "gold",
+        "results": [SEARCH_RESULT],
+    },
+    {
+        "type": "topic_search_result_relevant_segments",
+        "topic": "gold",
+        "search_phrase": "gold",
+        "search_result": SEARCH_RESULT,
+        "relevant_segments": ["Gold prices rose [[0]]"],
+    },
+]
+
+
+@pytest.fixture
+def filepath(tmp_path):
+    return str(tmp_path / "key.research_artifacts.jsonl")
+
+
+def write_artifacts(filepath: str, artifacts: list[dict]) -> None:
+    writer = ArtifactWriter(filepath)
+    for artifact in artifacts:
+        writer.register(artifact)
+    writer.close()
+
+
+def test_missing_artifacts_give_an_empty_checkpoint(filepath):
+    assert ResearchCheckpoint.load(filepath) == ResearchCheckpoint()
+
+
+def test_checkpoint_records_the_completed_steps(filepath):
+    write_artifacts(filepath, ARTIFACTS)
+
+    checkpoint = ResearchCheckpoint.load(filepath)
+    assert checkpoint.prompt == "Gold prices in 1970"
+    assert checkpoint.prompt_valid is True
+    assert checkpoint.task_prompt == "Research gold prices"
+    assert checkpoint.format_prompt == "A short report"
+    assert checkpoint.topics == ["gold"]
+    assert checkpoint.search_phrases == {"gold": ["gold"]}
+    assert checkpoint.search_results == {("gold", "gold"): [SEARCH_RESULT]}
+    assert checkpoint.relevant_segments == {
+        ("gold", "gold", SEARCH_RESULT["url"]): ["Gold prices rose [[0]]"]
+    }
+    assert not checkpoint.completed
+
+
+def test_checkpoint_of_a_finished_session_is_completed(filepath):
+    write_artifacts(filepath, [*ARTIFACTS, {"type": "all_results", "results": []}])
+    assert ResearchCheckpoint.load(filepath).completed
+
+
+def test_interrupted_artifacts_can_be_resumed(filepath):
+    write_artifacts(filepath, ARTIFACTS[:5])
+    with open(filepath, "ab") as f:
+        f.write(b'{"type": "topic_search_phrases", "topic": "go')
+
+    checkpoint = ResearchCheckpoint.load(filepath)
+    assert checkpoint.topics == ["gold"]
+    assert checkpoint.search_phrases == {}
+
+    # the resumed run appends the missing steps to the repaired file
+    write_artifacts(filepath, ARTIFACTS[5:])
+    assert load_items(filepath) == ARTIFACTS
+    assert ResearchCheckpoint.load(filepath).relevant_segments
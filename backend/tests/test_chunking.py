@@ -0,0 +1,77 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+
+import chunking
+from chunking import count_tokens, split_into_windows, split_paragraphs
+
+
+@pytest.fixture(autouse=True)
+def estimated_token_counts(monkeypatch):
+    # count tokens with the local estimate rather than a configured tokenizer
+    monkeypatch.setattr(chunking.config.research, "tokenizer", "")
+
+
+def make_paragraph(index: int, words: int = 20) -> str:
+    return " ".join(f"p{index}w{i}" for i in range(words))
+
+
+def test_count_tokens_estimate():
+    assert count_tokens("Hello, world!") == 4
+    assert count_tokens("a" * 40) == 10
+
+
+def test_short_text_is_a_single_window():
+    text = "First paragraph.\n\n  Second paragraph.  \n"
+    assert split_into_windows(text, window_tokens=100) == [
+        "First paragraph.\nSecond paragraph."
+    ]
+
+
+def test_windows_are_packed_from_whole_paragraphs():
+    paragraphs = [make_paragraph(i) for i in range(10)]
+    window_tokens = 2 * count_tokens(paragraphs[0])
+    windows = split_into_windows("\n".join(paragraphs), window_tokens=window_tokens)
+
+    assert len(windows) == 5
+    assert "\n".join(windows) == "\n".join(paragraphs)
+    for window in windows:
+        assert sum(count_tokens(p) for p in split_paragraphs(window)) <= window_tokens
+
+
+def test_long_paragraph_is_split_into_word_aligned_pieces():
+    paragraph = make_paragraph(0, words=100)
+    windows = split_into_windows(paragraph, window_tokens=30)
+
+    assert len(windows) > 1
+    assert " ".join(windows).split() == paragraph.split()
+    for window in windows:
+        assert count_tokens(window) <= 30
+
+
+def test_text_is_truncated_after_max_tokens():
+    paragraphs = [make_paragraph(i) for i in range(10)]
+    paragraph_tokens = count_tokens(paragraphs[0])
+    windows = split_into_windows(
+        "\n".join(paragraphs),
+        window_tokens=2 * paragraph_tokens,
+        max_tokens=5 * paragraph_tokens + 1,
+    )
+
+    assert "\n".join(windows) == "\n".join(paragraphs[:5])
+
+
+def test_empty_text_has_no_windows():
+    assert split_into_windows("\n \n", window_tokens=10) == []
@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("tavily")
+
+import clients
+
+
+class SyncClient:
+    def __init__(self) -> None:
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class AsyncClient(SyncClient):
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    asyncio.run(clients.close_shared_clients())
+    yield
+    asyncio.run(clients.close_shared_clients())
+
+
+def test_clients_are_shared_per_kind_base_url_and_key():
+    first = clients.get_shared_client("http", "a", "key", SyncClient)
+
+    assert clients.get_shared_client("http", "a", "key", SyncClient) is first
+    assert clients.get_shared_client("http", "b", "key", SyncClient) is not first
+    assert clients.get_shared_client("http", "a", "new key", SyncClient) is not first
+
+
+def test_close_shared_clients_closes_every_registered_client():
+    old = clients.get_shared_client("async", "a", "old key", AsyncClient)
+    new = clients.get_shared_client("async", "a", "new key", AsyncClient)
+    http = clients.get_shared_client("http", "", "", SyncClient)
+
+    asyncio.run(clients.close_shared_clients())
+
+    assert old.closed and new.closed and http.closed
+    assert clients.get_shared_client("http", "", "", SyncClient) is not http
@@ -0,0 +1,59 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from dedup import NearDuplicateIndex, hamming_distance, simhash
+
+PARAGRAPH = (
+    "Gold prices rose sharply in 1970 after the end of the Bretton Woods system, "
+    "as investors sought a store of value amid rising inflation and a weakening "
+    "dollar, and central banks reconsidered the role of gold in their reserves."
+)
+
+
+def test_short_texts_are_not_fingerprinted():
+    assert simhash("Home | About | Contact") is None
+
+
+def test_fingerprint_ignores_case_punctuation_and_whitespace():
+    variant = PARAGRAPH.upper().replace(",", "").replace(" ", "  ")
+    assert simhash(variant) == simhash(PARAGRAPH)
+
+
+def test_near_duplicates_have_close_fingerprints():
+    syndicated = PARAGRAPH.replace("sharply", "strongly") + " Reuters"
+    unrelated = (
+        "The city council approved the new budget on Tuesday, allocating more "
+        "funds to public transport, road maintenance and the renovation of schools "
+        "in the northern districts of the city."
+    )
+    assert hamming_distance(simhash(PARAGRAPH), simhash(syndicated)) <= 7
+    assert hamming_distance(simhash(PARAGRAPH), simhash(unrelated)) > 7
+
+
+def test_index_finds_fingerprints_within_max_distance():
+    index = NearDuplicateIndex(max_distance=3)
+    index.add(0b1111, "a")
+
+    assert index.find(0b1111) == "a"
+    assert index.find(0b1111 ^ (1 << 63) ^ (1 << 40) ^ 1) == "a"
+    assert index.find(0b1111 ^ 0b1111) is None
+
+
+def test_index_returns_earliest_added_near_duplicate():
+    index = NearDuplicateIndex(max_distance=3)
+    index.add(0b0011, "first")
+    index.add(0b0001, "second")
+
+    assert index.find(0b0001) == "first"
+    assert index.find(0b1111 << 32) is None
@@ -0,0 +1,115 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import json
+
+import pytest
+
+import items
+from event_bus import get_event_bus, replay_events, start_session_run
+
+SESSION_KEY = "session"
+
+
+@pytest.fixture
+def events_path(tmp_path):
+    path = str(tmp_path / f"{SESSION_KEY}.events.jsonl")
+    yield path
+    items.close_artifact_writer(path)
+
+
+def make_message(event: dict) -> str:
+    return json.dumps({"event": event, "session_key": SESSION_KEY}) + "\n"
+
+
+async def run_events(events_path: str, names: list[str], gates: dict):
+    """Registers and yields the events, waiting on the gate of an event first."""
+    for name in names:
+        if name in gates:
+            await gates[name].wait()
+        event = {"type": "generic", "description": name}
+        items.get_artifact_writer(events_path).register(event)
+        yield make_message(event)
+
+
+def descriptions(messages: list[str]) -> list[str]:
+    return [json.loads(message)["event"]["description"] for message in messages]
+
+
+async def collect(subscription) -> list[str]:
+    return [message async for message in subscription]
+
+
+def test_subscribers_replay_past_events_and_follow_live_ones(events_path):
+    async def scenario():
+        gate = asyncio.Event()
+        bus = start_session_run(
+            SESSION_KEY, events_path, run_events(events_path, list("abcdef"), {"d": gate})
+        )
+        early = asyncio.create_task(collect(bus.subscribe(bus.start_index)))
+        while bus.next_index < 3:
+            await asyncio.sleep(0)
+
+        late = asyncio.create_task(collect(bus.subscribe(0)))
+        resumed = asyncio.create_task(collect(bus.subscribe(4)))
+        await asyncio.sleep(0)
+        gate.set()
+        return await early, await late, await resumed
+
+    early, late, resumed = asyncio.run(scenario())
+    assert descriptions(early) == list("abcdef")
+    assert descriptions(late) == list("abcdef")
+    assert descriptions(resumed) == list("ef")
+
+
+def test_sessions_run_one_at_a_time(events_path):
+    async def scenario():
+        gate = asyncio.Event()
+        bus = start_session_run(
+            SESSION_KEY, events_path, run_events(events_path, ["a"], {"a": gate})
+        )
+        assert get_event_bus(SESSION_KEY) is bus
+        with pytest.raises(RuntimeError):
+            start_session_run(SESSION_KEY, events_path, run_events(events_path, [], {}))
+
+        gate.set()
+        await collect(bus.subscribe())
+        await asyncio.sleep(0)
+        assert get_event_bus(SESSION_KEY) is None
+
+        # a later run of the session numbers its events after the existing ones
+        bus = start_session_run(
+            SESSION_KEY, events_path, run_events(events_path, ["b"], {})
+        )
+        assert bus.start_index == 1
+        return await collect(bus.subscribe(bus.start_index))
+
+    assert descriptions(asyncio.run(scenario())) == ["b"]
+
+
+def test_finished_runs_are_replayed_from_the_events_file(events_path):
+    async def scenario():
+        bus = start_session_run(
+            SESSION_KEY, events_path, run_events(events_path, list("abc"), {})
+        )
+        await collect(bus.subscribe())
+        return (
+            await collect(bus.subscribe(1)),
+            await collect(replay_events(SESSION_KEY, events_path, 0, 2)),
+        )
+
+    subscribed, replayed = asyncio.run(scenario())
+    assert descriptions(subscribed) == list("bc")
+    assert descriptions(replayed) == list("ab")
@@ -0,0 +1,97 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+
+import pytest
+
+from frame.clients import Client
+from frame.trace import Trace
+
+
+class EchoClient(Client):
+    """Answers the prompt in upper case, tracing the exchange like OpenAIClient."""
+
+    def run(self, pre_prompt: str, prompt: str, completion_config: dict = {}) -> str:
+        try:
+            if prompt == "fail":
+                raise TimeoutError("the request timed out")
+            ret = prompt.upper()
+        except BaseException as error:
+            self.trace_exchange(pre_prompt, prompt, error=error)
+            raise
+        self.trace_exchange(pre_prompt, prompt, ret)
+        return ret
+
+
+def test_failed_calls_are_traced_with_their_query():
+    trace = Trace()
+    with pytest.raises(TimeoutError):
+        EchoClient(trace).run("pre", "fail")
+
+    assert trace.entries[1:] == [
+        "<<PRE-PROMPT>>",
+        "pre",
+        "<<PROMPT>>",
+        "fail",
+        "<<ERROR>>",
+        "TimeoutError: the request timed out",
+    ]
+
+
+def test_concurrent_exchanges_are_not_interleaved():
+    trace = Trace()
+    client = EchoClient(trace)
+    threads = [
+        threading.Thread(target=client.run, args=("pre", f"q{i}")) for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    exchanges = [trace.entries[i : i + 7] for i in range(0, len(trace.entries), 7)]
+    assert len(exchanges) == 8
+    for exchange in exchanges:
+        prompt = exchange[4]
+        assert exchange[1:] == [
+            "<<PRE-PROMPT>>",
+            "pre",
+            "<<PROMPT>>",
+            prompt,
+            "<<RESPONSE>>",
+            prompt.upper(),
+        ]
+
+
+def test_failed_openai_calls_are_traced():
+    pytest.importorskip("openai")
+    from frame.clients import OpenAIClient
+
+    trace = Trace()
+    client = OpenAIClient(base_url="http://localhost", api_key="key", trace=trace)
+
+    def fail(messages, completion_config={}):
+        raise ConnectionError("connection refused")
+
+    client._invoke = fail
+    with pytest.raises(ConnectionError):
+        client.run_messages([{"role": "user", "content": "hello"}])
+
+    assert trace.entries[1:] == [
+        "<<user>>",
+        "hello",
+        "<<ERROR>>",
+        "ConnectionError: connection refused",
+    ]
@@ -0,0 +1,181 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("tavily")  # imported by every new frame instance
+
+from frame.clients import Client
+from frame.errands4 import Errand
+from frame.harness4 import ErrandNode, FrameConfigV4, FrameV4
+
+
+class RecordingClient(Client):
+    """Answers "<pre-prompt>:<prompt>", keeping track of the calls running at the same time."""
+
+    def __init__(self, tag: str = "", delay: float = 0.05) -> None:
+        super().__init__()
+        self.tag = tag
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def run(self, pre_prompt: str, prompt: str, completion_config: dict = {}) -> str:
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        if pre_prompt == "fail":
+            raise RuntimeError(prompt)
+        return f"{self.tag}{pre_prompt}:{prompt}"
+
+
+def make_errand(name: str, prompt: str) -> type[Errand]:
+    class NamedErrand(Errand):
+        def __init__(self) -> None:
+            super().__init__(name, prompt)
+
+    return NamedErrand
+
+
+ERRAND_PROFILE = {
+    "proc": make_errand("proc", "{message}"),
+    "call": make_errand("call", "{code}"),
+    "vars": make_errand("vars", "{code}"),
+    "fail": make_errand("fail", "{code}"),
+}
+
+NODES = [
+    ErrandNode("proc", inputs=["message"], outputs=["code"]),
+    ErrandNode("call", inputs=["code"], outputs=["invocation"]),
+    ErrandNode(
+        "vars",
+        inputs=["code"],
+        outputs=["variables"],
+        parse=lambda completion: {"variables": completion.upper()},
+    ),
+]
+
+
+def make_frame(client: Client, max_concurrent_errands: int = 4) -> FrameV4:
+    return FrameV4(
+        client,
+        config=FrameConfigV4(max_concurrent_errands=max_concurrent_errands),
+        errand_profile=ERRAND_PROFILE,
+    )
+
+
+def test_errand_graph_runs_each_errand_after_its_inputs():
+    frame = make_frame(RecordingClient())
+    values = frame.run_errand_graph(NODES, {"message": "m"})
+
+    assert values == {
+        "message": "m",
+        "code": "proc:m",
+        "invocation": "call:proc:m",
+        "variables": "VARS:PROC:M",
+    }
+
+
+def test_independent_errands_run_concurrently():
+    client = RecordingClient()
+    make_frame(client).run_errand_graph(NODES, {"message": "m"})
+    assert client.max_running == 2
+
+
+def test_errand_concurrency_follows_the_frame_config():
+    client = RecordingClient()
+    values = make_frame(client, max_concurrent_errands=1).run_errand_graph(
+        NODES, {"message": "m"}
+    )
+    assert client.max_running == 1
+    assert values["invocation"] == "call:proc:m"
+
+
+def test_errands_with_a_none_input_are_skipped():
+    client = RecordingClient()
+    nodes = [ErrandNode("call", inputs=["code"], outputs=["invocation", "extra"])]
+    values = make_frame(client).run_errand_graph(nodes, {"code": None})
+
+    assert values == {"code": None, "invocation": None, "extra": None}
+    assert client.max_running == 0
+
+
+def test_inputs_that_are_never_produced_are_reported():
+    nodes = [ErrandNode("call", inputs=["code"], outputs=["invocation"])]
+    with pytest.raises(ValueError, match="call"):
+        make_frame(RecordingClient()).run_errand_graph(nodes, {"message": "m"})
+
+
+def test_errand_errors_are_raised():
+    nodes = [*NODES[:1], ErrandNode("fail", inputs=["code"], outputs=["result"])]
+    with pytest.raises(RuntimeError, match="proc:m"):
+        make_frame(RecordingClient()).run_errand_graph(nodes, {"message": "m"})
+
+
+SKILLS_SOURCE = '''
+def remember(note: str) -> str:
+    """Remembers the note and asks the language model about it."""
+    __messages.append(note)
+    return language_model(note, "ask")
+'''
+
+
+def make_template() -> FrameV4:
+    template = FrameV4(
+        RecordingClient("template-", delay=0),
+        config=FrameConfigV4(interaction_level="system", max_concurrent_errands=2),
+    )
+    template.register_skills_from_source(SKILLS_SOURCE)
+    return template
+
+
+def test_fork_uses_its_own_clients_and_globals():
+    template = make_template()
+    fork = template.fork(client_profile=RecordingClient("fork-", delay=0))
+
+    assert fork.globals["remember"]("a") == "fork-ask:a"
+    assert template.globals["remember"]("b") == "template-ask:b"
+    assert fork.globals["__messages"] == ["a"]
+    assert template.globals["__messages"] == ["b"]
+
+
+def test_fork_shares_the_skills_of_the_template():
+    template = make_template()
+    fork = template.fork()
+
+    assert fork.skills["remember"] is template.skills["remember"]
+    assert fork.last_mid == template.last_mid
+    assert fork.errand_profile == template.errand_profile
+
+
+def test_fork_copies_the_whole_config():
+    template = make_template()
+    fork = template.fork()
+
+    assert fork.config == template.config
+    assert fork.config is not template.config
+    fork.config.max_iterations = 1
+    assert template.config.max_iterations == 1024
+
+
+def test_fork_uses_the_given_config():
+    config = FrameConfigV4(max_concurrent_errands=1)
+    assert make_template().fork(config=config).config is config
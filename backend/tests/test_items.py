@@ -0,0 +1,212 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import items
+from blobs import BlobStore, build_blobs_directory
+from items import (
+    ArtifactStore,
+    ArtifactWriter,
+    build_index_path,
+    find_item_by_type,
+    load_index,
+    load_items,
+    register_item,
+    repair_artifacts,
+)
+
+ITEMS = [
+    {"type": "topics", "topics": ["gold", "silver"]},
+    {"type": "search_results", "topic": "gold", "results": ["ü", "é"]},
+    {"type": "search_results", "topic": "silver", "results": []},
+    {"message": "an item without a type"},
+]
+
+
+@pytest.fixture
+def filepath(tmp_path):
+    return str(tmp_path / "session" / "key.research_artifacts.jsonl")
+
+
+def write_items(filepath: str, items: list[dict]) -> None:
+    writer = ArtifactWriter(filepath, max_buffer_bytes=1 << 20, flush_interval=3600)
+    for item in items:
+        writer.register(item)
+    writer.close()
+
+
+def test_writer_buffers_items_until_flushed(filepath):
+    writer = ArtifactWriter(filepath, max_buffer_bytes=1 << 20, flush_interval=3600)
+    writer.register(ITEMS[0])
+    assert load_items(filepath) == []
+
+    writer.flush()
+    assert load_items(filepath) == [ITEMS[0]]
+    writer.close()
+
+
+def test_writer_writes_a_sidecar_index_covering_the_file(filepath):
+    write_items(filepath, ITEMS)
+
+    entries = load_index(filepath)
+    assert [entry["type"] for entry in entries] == [
+        "topics",
+        "search_results",
+        "search_results",
+        None,
+    ]
+    with open(filepath, "rb") as f:
+        data = f.read()
+    assert sum(entry["length"] for entry in entries) == len(data)
+    for entry, item in zip(entries, ITEMS):
+        record = data[entry["offset"] : entry["offset"] + entry["length"]]
+        assert json.loads(record) == item
+
+
+def test_store_reads_items_by_type(filepath):
+    write_items(filepath, ITEMS)
+
+    store = ArtifactStore(filepath)
+    assert store.types() == ["topics", "search_results", None]
+    assert store.find("topics") == ITEMS[0]
+    assert store.find_all("search_results") == ITEMS[1:3]
+    assert store.find("report") is None
+    assert find_item_by_type(filepath, "search_results") == ITEMS[1]
+
+
+def test_find_item_by_type_loads_the_index_once(filepath, monkeypatch):
+    write_items(filepath, ITEMS)
+    loads = []
+    monkeypatch.setattr(
+        items, "load_index", lambda path: loads.append(path) or load_index(path)
+    )
+
+    assert find_item_by_type(filepath, "topics") == ITEMS[0]
+    assert loads == [filepath]
+
+
+def test_index_of_a_file_appended_by_other_means_is_stale(filepath):
+    write_items(filepath, ITEMS[:2])
+    register_item(filepath, ITEMS[2])
+
+    assert load_index(filepath) is None
+    assert ArtifactStore(filepath).find_all("search_results") == ITEMS[1:3]
+    assert find_item_by_type(filepath, "topics") == ITEMS[0]
+
+
+def test_writer_indexes_existing_records_before_appending(filepath):
+    register_item(filepath, ITEMS[0])
+    write_items(filepath, ITEMS[1:])
+
+    assert len(load_index(filepath)) == len(ITEMS)
+    assert ArtifactStore(filepath).find("topics") == ITEMS[0]
+
+
+def test_repair_drops_a_partially_written_record(filepath):
+    write_items(filepath, ITEMS[:2])
+    with open(filepath, "ab") as f:
+        f.write(b'{"type": "search_results", "topic": "sil')
+
+    repair_artifacts(filepath)
+
+    assert load_items(filepath) == ITEMS[:2]
+    assert len(load_index(filepath)) == 2
+
+
+def test_repair_rebuilds_a_stale_index(filepath):
+    write_items(filepath, ITEMS[:2])
+    register_item(filepath, ITEMS[2])
+
+    repair_artifacts(filepath)
+
+    assert [entry["type"] for entry in load_index(filepath)] == [
+        "topics",
+        "search_results",
+        "search_results",
+    ]
+
+
+def test_repair_of_a_missing_file_does_nothing(filepath):
+    repair_artifacts(filepath)
+    assert not os.path.exists(build_index_path(filepath))
+
+
+class FailingBlobStore(BlobStore):
+    """A blob store whose puts fail until it is repaired."""
+
+    failing = True
+
+    def put(self, text: str, digest: str | None = None) -> str:
+        if self.failing:
+            raise OSError("No space left on device")
+        return super().put(text, digest)
+
+
+def test_failed_writes_keep_their_items_buffered(filepath):
+    blob_store = FailingBlobStore(build_blobs_directory(filepath))
+    writer = ArtifactWriter(filepath, blob_store=blob_store)
+    writer.register({"type": "page", "raw_content": "Gold " * 100})
+
+    with pytest.raises(OSError):
+        writer.flush()
+    with pytest.raises(OSError):
+        writer.close()
+    assert load_items(filepath) == []
+
+    blob_store.failing = False
+    writer.register(ITEMS[0])
+    assert [record["type"] for record in load_items(filepath)] == ["page", "topics"]
+    assert load_items(filepath)[0]["raw_content"] == "Gold " * 100
+    assert len(load_index(filepath)) == 2
+
+
+def test_failed_background_writes_are_logged_and_retried(filepath, caplog):
+    blob_store = FailingBlobStore(build_blobs_directory(filepath))
+    writer = ArtifactWriter(
+        filepath, flush_interval=0.01, background=True, blob_store=blob_store
+    )
+    writer.register({"type": "page", "raw_content": "Gold " * 100})
+
+    deadline = time.monotonic() + 5
+    while writer._error is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert "Writing artifacts" in caplog.text
+    assert load_items(filepath) == []
+
+    blob_store.failing = False
+    while load_index(filepath) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.close()
+    assert [record["type"] for record in load_items(filepath)] == ["page"]
+
+
+def test_background_writers_share_one_thread(tmp_path):
+    writers = [
+        ArtifactWriter(str(tmp_path / f"{i}.jsonl"), flush_interval=0.01, background=True)
+        for i in range(3)
+    ]
+    for writer in writers:
+        writer.register(ITEMS[0])
+
+    flushers = [t for t in threading.enumerate() if t.name == "artifact-flusher"]
+    assert len(flushers) == 1
+    for writer in writers:
+        writer.close()
+        assert load_items(writer.filepath) == [ITEMS[0]]
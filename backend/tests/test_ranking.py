@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import numpy as np
+
+from ranking import bm25_scores, select_top_paragraphs, tokenize
+
+
+def test_tokenize():
+    assert tokenize("Gold prices, 1970!") == ["gold", "prices", "1970"]
+
+
+def test_matching_paragraphs_score_higher():
+    paragraphs = [
+        "Cookie settings and privacy policy",
+        "Gold prices rose sharply in 1970",
+        "Gold is a chemical element",
+    ]
+    scores = bm25_scores(paragraphs, "gold prices 1970")
+
+    assert scores[0] == 0
+    assert scores[1] > scores[2] > 0
+
+
+def test_scores_without_query_terms_are_zero():
+    assert np.array_equal(bm25_scores(["Some text"], "!!"), np.zeros(1))
+    assert len(bm25_scores([], "gold")) == 0
+
+
+def test_select_top_paragraphs_keeps_original_order():
+    paragraphs = [
+        "Gold prices in 1970",
+        "Navigation: home, about, contact",
+        "Subscribe to our newsletter",
+        "The price of gold rose after 1970",
+    ]
+    assert select_top_paragraphs(paragraphs, "gold price 1970", top_k=2) == [
+        paragraphs[0],
+        paragraphs[3],
+    ]
+
+
+def test_select_top_paragraphs_prefers_earlier_paragraphs_on_ties():
+    paragraphs = ["Footer", "Header", "Sidebar"]
+    assert select_top_paragraphs(paragraphs, "gold", top_k=2) == ["Footer", "Header"]
+
+
+def test_select_top_paragraphs_keeps_short_pages():
+    paragraphs = ["Footer", "Header"]
+    assert select_top_paragraphs(paragraphs, "gold", top_k=5) is paragraphs
@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from report_format import (
+    citations_preserved,
+    extract_citations,
+    fix_report,
+    needs_reformat,
+    split_sections,
+    validate_report,
+)
+
+
+def issue_kinds(report: str, source_count: int = 10) -> list[str]:
+    return [issue.kind for issue in validate_report(report, source_count)]
+
+
+def test_valid_report_has_no_issues():
+    report = "# Title\n\nText [[0]].\n\n## Section\n\nMore text [[1,2]]."
+    assert validate_report(report, source_count=3) == []
+    assert fix_report(report, source_count=3) == report
+
+
+def test_wrapping_code_fence_is_removed():
+    assert fix_report("```markdown\n# Title\n\nText.\n```", 1) == "# Title\n\nText."
+
+
+def test_double_rule_under_a_title_becomes_a_heading():
+    assert fix_report("Title\n=====\nText.", 1) == "# Title\nText."
+    assert fix_report("# Title\n\n=====\nText.", 1) == "# Title\n\n---\nText."
+
+
+def test_skipped_heading_levels_are_relevelled():
+    report = "# Title\n#### Deep\nText."
+    assert issue_kinds(report) == ["heading"]
+    assert fix_report(report, 1) == "# Title\n## Deep\nText."
+
+
+def test_hashtags_are_reported_but_kept():
+    report = "# Title\n#hashtag trending now"
+    assert issue_kinds(report) == ["suspect_heading"]
+    assert fix_report(report, 1) == report
+    assert needs_reformat(validate_report(report, 1))
+
+
+def test_citations_of_unknown_sources_are_removed_with_their_separators():
+    assert fix_report("Intro [[0]] and [[5]].", 1) == "Intro [[0]]."
+    assert fix_report("[[7]] Lead text.", 1) == "Lead text."
+    assert fix_report("A [[0, 9]], b [[9]], c.", 1) == "A [[0]], b, c."
+    assert issue_kinds("Intro [[0]] and [[5]].", 1) == ["citation"]
+
+
+def test_malformed_citations_and_unclosed_fences_need_reformatting():
+    assert not needs_reformat(validate_report("Text [[0]].", 1))
+    assert needs_reformat(validate_report("Text [[0].", 1))
+    assert needs_reformat(validate_report("```python\nprint(1)", 1))
+
+
+def test_citations_preserved():
+    assert extract_citations("A [[0]], b [[1, 2]].") == {0, 1, 2}
+    assert citations_preserved("A [[0]] b [[1]]", "b [[0,1]]")
+    assert not citations_preserved("A [[0]] b [[1]]", "A [[0]]")
+
+
+def test_split_sections_below_the_title():
+    report = "# Title\nIntro\n## One\nA\n## Two\n```\n## not a heading\n```"
+    assert split_sections(report) == [
+        "# Title\nIntro",
+        "## One\nA",
+        "## Two\n```\n## not a heading\n```",
+    ]
@@ -0,0 +1,77 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+
+pytest.importorskip("tavily")  # imported by every new frame instance
+
+from frame.clients import Client
+from frame.harness4 import FrameV4
+
+ROUTINE_CODE = '''
+def routine_code() -> None:
+    """Says hello."""
+    print("hello")
+'''
+
+
+class CountingClient(Client):
+    """Answers every prompt with the same routine code, counting the calls."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def run(self, pre_prompt: str, prompt: str, completion_config: dict = {}) -> str:
+        self.calls += 1
+        return ROUTINE_CODE
+
+
+class DictCache:
+    def __init__(self) -> None:
+        self.values = {}
+
+    def get(self, key: str):
+        return self.values.get(key)
+
+    def put(self, key: str, value) -> None:
+        self.values[key] = value
+
+
+def test_unchanged_routines_are_compiled_once():
+    client, cache = CountingClient(), DictCache()
+    first = FrameV4(client, compilation_cache=cache).process_message_routine(
+        1, "Say hello", {}
+    )
+    calls = client.calls
+    assert calls > 0 and len(cache.values) == 1
+
+    second = FrameV4(client, compilation_cache=cache).process_message_routine(
+        1, "Say hello", {}
+    )
+    assert client.calls == calls
+    assert [skill.to_dict() for skill in second[0]] == [
+        skill.to_dict() for skill in first[0]
+    ]
+    assert second[1:] == first[1:]
+
+
+def test_changed_routines_are_compiled_again():
+    client, cache = CountingClient(), DictCache()
+    FrameV4(client, compilation_cache=cache).process_message_routine(1, "Say hello", {})
+    calls = client.calls
+
+    FrameV4(client, compilation_cache=cache).process_message_routine(1, "Say bye", {})
+    assert client.calls == 2 * calls
+    assert len(cache.values) == 2
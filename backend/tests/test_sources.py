@@ -0,0 +1,60 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from sources import SourceRegistry
+
+
+def make_result(url: str, title: str = "Title") -> dict:
+    return {"url": url, "title": title, "content": f"Content of {url}"}
+
+
+def test_sources_are_indexed_in_registration_order():
+    registry = SourceRegistry()
+
+    assert registry.register(make_result("https://a"))
+    assert registry.register(make_result("https://b"))
+    assert not registry.register(make_result("https://a", "Another title"))
+
+    assert len(registry) == 2
+    assert registry.urls == ["https://a", "https://b"]
+    assert registry.index_of("https://b") == 1
+    assert registry.get("https://a")["title"] == "Title"
+    assert registry.get("https://c") is None
+    assert "https://a" in registry and "https://c" not in registry
+
+
+def test_registry_round_trips_through_its_artifact_item():
+    registry = SourceRegistry()
+    for url in ["https://b", "https://a", "https://c"]:
+        registry.register(make_result(url))
+
+    item = registry.to_item()
+    assert item["type"] == "source_registry"
+    assert item["sources"][1] == {"index": 1, "url": "https://a", "title": "Title"}
+
+    item["sources"].reverse()
+    restored = SourceRegistry.from_item(item)
+    assert restored.urls == registry.urls
+
+
+def test_registry_is_restored_from_the_results_of_older_sessions():
+    results = [
+        make_result("https://a"),
+        make_result("https://b"),
+        make_result("https://a", "Copy"),
+    ]
+    registry = SourceRegistry.from_results(["https://b", "https://a"], results)
+
+    assert registry.urls == ["https://b", "https://a"]
+    assert registry.get("https://a") is results[0]
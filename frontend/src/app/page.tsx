@@ -34,6 +34,8 @@ interface ApiEventData {
     deltaSearchCount?: number;
     deltaQueryCount?: number;
     hidden?: boolean;
+    stage?: string;
+    delta?: string;
   };
   session_key?: string;
 }
@@ -60,6 +62,8 @@ export default function Home() {
     events: []
   });
   const [reportContent, setReportContent] = useState<string>('');
+  // The report as it is being generated, built from report_delta events
+  const [draftReport, setDraftReport] = useState<{ stage: string; text: string }>({ stage: '', text: '' });
   const [editedStrategyId, setEditedStrategyId] = useState('');
   const [strategyContents, setStrategyContents] = useState<Record<string, string>>(initialStrategyContents);
 
@@ -103,6 +107,7 @@ export default function Home() {
 
       // Apply initial state update
       setState(initialStateUpdate);
+      setDraftReport({ stage: '', text: '' });
 
       const reader = response.body.getReader();
       const decoder = new TextDecoder();
@@ -153,11 +158,19 @@ export default function Home() {
                   ...prev,
                   ...eventHandlers.onReportBuilding?.(data, prev)
                 }) as ApplicationState);
+              } else if (data.event.type === 'report_delta') {
+                // Deltas of a later stage (e.g. "format") replace the text of the previous stage
+                const stage = data.event.stage || '';
+                const delta = data.event.delta || '';
+                setDraftReport(prev => (
+                  prev.stage === stage ? { stage, text: prev.text + delta } : { stage, text: delta }
+                ));
               } else if (data.event.type === 'report_done' && eventHandlers.onReportDone) {
                 // Save the report content if available
                 if (data.event.report) {
                   setReportContent(data.event.report);
                 }
+                setDraftReport({ stage: '', text: '' });
 
                 setState(prev => ({
                   ...prev,
@@ -381,6 +394,7 @@ export default function Home() {
 
   const handleClear = () => {
     setReportContent('');
+    setDraftReport({ stage: '', text: '' });
     setState({
       type: 'idle',
       sessionKey: "",
@@ -452,6 +466,11 @@ export default function Home() {
             onViewError={handleViewError}
           />
         </div>
+        {state.type === 'finalizing' && draftReport.text !== '' && (
+          <div className="w-[min(90%,70%)]">
+            <ReportViewer report={draftReport.text} isVisible={true} />
+          </div>
+        )}
         {state.type === 'done' && reportContent !== '' && (
           <div className="w-[min(90%,70%)]">
             <ReportViewer report={reportContent} isVisible={true} />